@@ -1,33 +1,42 @@
 # backend/agents/analyzer_agent.py
-import yfinance as yf
-from backend.db.supabase_client import supabase
-from datetime import date
-from typing import Dict, List
-
-
-def analyze_ticker(ticker: str) -> List[Dict]:
+import time
+import numpy as np
+import pandas as pd
+from backend.db.alerts_repo import AnomalySink
+from backend.db.spac_data_reader import load_window, load_spac_list
+from backend.lib.ohlcv_store import store, fetch_from_spac_data, to_records
+from backend.lib.volume_baselines import load_volume_baselines
+from backend.config import ANALYZER_MODE
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+RECENT_WINDOW_DAYS = 21  # calendar days of history read per ticker (covers today + last 5 sessions)
+LOOKBACK_ROWS = 6        # today + last 5 days
+
+
+def low_volume_alert(ticker: str, price: float, volume: int) -> Dict:
+    return {
+        "ticker": ticker,
+        "anomaly_type": "Volume",
+        #  always include price consistently
+        "description": f"{ticker} (${price:.2f}) had very low volume ({volume:,})"
+    }
+
+
+def spike_alert(ticker: str, volume: int, reasons: List[str]) -> Dict:
+    return {
+        "ticker": ticker,
+        "anomaly_type": "Volume",
+        "description": f"{ticker} volume {volume:,} is " + "; ".join(reasons)
+    }
+
+
+def evaluate_volume_rules(ticker: str, rows: List[Dict], avg10, avg90) -> List[Dict]:
     """
-    Analyze a single ticker for volume anomalies.
+    Apply the volume rules to one ticker's latest rows (newest first).
     Combines multiple triggers into one description per type
     so no duplicates like "ANNA ($4.36)" vs "ANNA had very low volume".
     """
-    stock = yf.Ticker(ticker)
-    info = stock.info or {}
-
-    # Yahoo averages
-    avg10 = info.get("averageDailyVolume10Day")
-    avg90 = info.get("averageDailyVolume3Month")
-
-    # Latest stored OHLCV from Supabase
-    rows = (
-        supabase.table("spac_data")
-        .select("trade_date, volume, close")
-        .eq("ticker", ticker)
-        .order("trade_date", desc=True)
-        .limit(6)  # today + last 5 days
-        .execute()
-        .data
-    )
     if not rows:
         return []
 
@@ -43,57 +52,132 @@ def analyze_ticker(ticker: str) -> List[Dict]:
 
     # ---- Rule 1: Very low volume (price ≥ $0.20) ----
     if today_price >= 0.20 and today_vol < 10_000:
-        alerts.append({
-            "ticker": ticker,
-            "anomaly_type": "Volume",
-            #  always include price consistently
-            "description": f"{ticker} (${today_price:.2f}) had very low volume ({today_vol:,})"
-        })
+        alerts.append(low_volume_alert(ticker, today_price, today_vol))
 
     # ---- Rule 2: Volume spikes (combine reasons into one alert) ----
     spike_reasons = []
     if avg10 and today_vol > 3 * avg10:
-        spike_reasons.append(f">3× Yahoo 10-day avg ({avg10:,.0f})")
+        spike_reasons.append(f">3× 10-day avg ({avg10:,.0f})")
     if avg90 and today_vol > 3 * avg90:
-        spike_reasons.append(f">3× Yahoo 90-day avg ({avg90:,.0f})")
+        spike_reasons.append(f">3× 90-day avg ({avg90:,.0f})")
     if local_avg and today_vol > 3 * local_avg:
         spike_reasons.append(f">3× local 5-day avg ({local_avg:,.0f})")
 
     if spike_reasons:
-        alerts.append({
-            "ticker": ticker,
-            "anomaly_type": "Volume",
-            "description": f"{ticker} volume {today_vol:,} is " + "; ".join(spike_reasons)
-        })
+        alerts.append(spike_alert(ticker, today_vol, spike_reasons))
 
     return alerts
 
 
-def insert_alert_if_new(alert: Dict, anomaly_type: str) -> bool:
-    """Insert anomaly into Supabase if not already logged *today*."""
-    today = date.today().isoformat()
+def analyze_ticker(ticker: str, baselines: Tuple) -> List[Dict]:
+    """
+    Analyze a single ticker for volume anomalies. Candles come from the local
+    OHLCV store (spac_data only for the missing tail); no Yahoo calls.
+    `baselines` is the ticker's (10-day, 90-day) row of spac_volume_baselines,
+    the same source the vectorized path uses.
+    """
+    today = date.today()
+    avg10, avg90 = baselines
+
+    # Latest candles for the rules (zero-copy slice of the memory map)
+    recent, _ = store.read_through(ticker, today - timedelta(days=RECENT_WINDOW_DAYS), fetch_from_spac_data)
+    rows = [
+        {"trade_date": r["date"], "volume": r["volume"], "close": r["close"]}
+        for r in reversed(to_records(recent[-LOOKBACK_ROWS:]))  # today + last 5 days, newest first
+    ]
+    return evaluate_volume_rules(ticker, rows, avg10, avg90)
+
+
+# ---- Vectorized path: whole universe at once ----
+def analyze_universe(rows: pd.DataFrame, baselines: Dict[str, Tuple], tickers: List[str]) -> List[Dict]:
+    """
+    Vectorized volume rules for every ticker at once.
+    `rows` holds (ticker, trade_date, ..., close, volume) records; they are scattered into
+    a ticker × position matrix (position 0 = latest candle, 1-5 = the previous five),
+    the same rows analyze_ticker() looks at. Alerts come out in `tickers` order and
+    are identical to the per-ticker path.
+    """
+    if rows.empty:
+        return []
+
+    # Same rows the local store keeps (it skips candles with missing fields)
+    df = rows.dropna(subset=[c for c in ("open", "high", "low", "close", "volume") if c in rows])
+
+    order = list(dict.fromkeys(tickers))
+    codes = pd.Categorical(df["ticker"], categories=order).codes.astype("int64")  # -1 = not requested
+    days = pd.to_datetime(df["trade_date"]).to_numpy(dtype="datetime64[D]").astype("int64")
+
+    # Sort by ticker, newest first; pos = rank of each candle within its ticker
+    idx = np.lexsort((-days, codes))
+    codes = codes[idx]
+    pos = np.arange(len(idx)) - np.searchsorted(codes, codes, side="left")
+    keep = (codes >= 0) & (pos < LOOKBACK_ROWS)
+
+    V = np.full((len(order), LOOKBACK_ROWS), np.nan)
+    V[codes[keep], pos[keep]] = df["volume"].to_numpy(dtype="float64")[idx][keep]
+    latest = keep & (pos == 0)
+    today_price = np.full(len(order), np.nan)
+    today_price[codes[latest]] = df["close"].to_numpy(dtype="float64")[idx][latest]
 
-    exists = (
-        supabase.table("anomaly_reports")
-        .select("id")
-        .eq("ticker", alert["ticker"])
-        .eq("trade_date", today)
-        .eq("anomaly_type", anomaly_type)
-        .eq("description", alert["description"])
-        .execute()
-        .data
-    )
-
-    if not exists:
-        supabase.table("anomaly_reports").insert({
-            "ticker": alert["ticker"],
-            "trade_date": today,
-            "anomaly_type": anomaly_type,
-            "description": alert["description"],
-        }).execute()
-        return True
-
-    return False
+    today_vol = V[:, 0]
+
+    past = V[:, 1:]
+    counts = (~np.isnan(past)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        local_avg = np.where(counts > 0, np.nansum(past, axis=1) / counts, np.nan)
+
+    base = np.array(
+        [[np.nan if v is None else float(v) for v in baselines.get(t, (None, None))] for t in order],
+        dtype="float64",
+    ).reshape(len(order), 2)
+    avg10, avg90 = base[:, 0], base[:, 1]
+
+    def truthy(x):  # mirrors `if avg and ...` (None/NaN and 0 are falsy)
+        return ~np.isnan(x) & (x != 0)
+
+    low = (today_price >= 0.20) & (today_vol < 10_000)
+    s10 = truthy(avg10) & (today_vol > 3 * avg10)
+    s90 = truthy(avg90) & (today_vol > 3 * avg90)
+    slocal = truthy(local_avg) & (today_vol > 3 * local_avg)
+
+    alerts: List[Dict] = []
+    for i in np.flatnonzero(low | s10 | s90 | slocal):
+        ticker = order[i]
+        volume = int(today_vol[i])
+        if low[i]:
+            alerts.append(low_volume_alert(ticker, float(today_price[i]), volume))
+
+        reasons = []
+        if s10[i]:
+            reasons.append(f">3× 10-day avg ({avg10[i]:,.0f})")
+        if s90[i]:
+            reasons.append(f">3× 90-day avg ({avg90[i]:,.0f})")
+        if slocal[i]:
+            reasons.append(f">3× local 5-day avg ({local_avg[i]:,.0f})")
+        if reasons:
+            alerts.append(spike_alert(ticker, volume, reasons))
+
+    return alerts
+
+
+def detect_volume_alerts(tickers: List[str], mode: str = ANALYZER_MODE) -> List[Dict]:
+    """
+    Run the volume rules over `tickers` with the per-ticker or vectorized engine.
+    Both read the baselines precomputed by the data agent (spac_volume_baselines),
+    so the two modes agree on the same day.
+    """
+    baselines = load_volume_baselines(tickers)
+    if mode != "vectorized":
+        return [
+            alert for ticker in tickers
+            for alert in analyze_ticker(ticker, baselines.get(ticker, (None, None)))
+        ]
+
+    started = time.perf_counter()
+    rows = load_window(tickers, RECENT_WINDOW_DAYS)
+    alerts = analyze_universe(rows, baselines, tickers)
+    print(f"⏱️ Vectorized analysis of {len(tickers)} tickers ({len(rows)} rows) in {time.perf_counter() - started:.2f}s")
+    return alerts
 
 
 def run_analyzer_agent(state: Dict = None) -> Dict:
@@ -103,20 +187,21 @@ def run_analyzer_agent(state: Dict = None) -> Dict:
 
     tickers = state.get("tickers")
     if not tickers:
-        rows = supabase.table("spac_list").select("ticker").execute().data
-        tickers = [row["ticker"] for row in rows] if rows else []
+        tickers = [row["ticker"] for row in load_spac_list("ticker")]
 
     results: List[Dict] = []
     today = date.today().isoformat()
 
-    for ticker in tickers:
-        alerts = analyze_ticker(ticker)
-        for alert in alerts:
-            if insert_alert_if_new(alert, "Volume"):
-                print(f"⚡ {alert['ticker']} ({today}) [Volume] {alert['description']}")
-                results.append({**alert, "trade_date": today})
-            else:
-                print(f"⏩ Skipped duplicate for {alert['ticker']} ({today}): {alert['description']}")
+    sink = AnomalySink()
+    for alert in detect_volume_alerts(tickers):
+        sink.add(alert, "Volume")
+
+    inserted, skipped = sink.flush()
+    for alert in inserted:
+        print(f"⚡ {alert['ticker']} ({today}) [Volume] {alert['description']}")
+        results.append(alert)
+    for alert in skipped:
+        print(f"⏩ Skipped duplicate for {alert['ticker']} ({today}): {alert['description']}")
 
     state.update({
         "tickers": tickers,
@@ -1,13 +1,237 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
 import yfinance as yf
-from backend.db.supabase_client import supabase
-from datetime import datetime, date
-from typing import Dict, List
+from backend.db.supabase_client import supabase, fetch_all
+from backend.db.spac_data_reader import load_spac_list
+from backend.db.spac_data_writer import SpacDataWriter
+from backend.lib.ohlcv_store import store
+from backend.lib.volume_baselines import refresh_volume_baselines
+from backend.lib import metrics
+from backend.config import (
+    DATA_FETCH_MODE, DATA_CHUNK_SIZE, DATA_FETCH_THREADS, DATA_SYNC_MODE, DATA_INITIAL_HISTORY_DAYS,
+)
+from datetime import date, timedelta
+from typing import Dict, List, Optional
 
 
-def fetch_and_store_daily_data(state: Dict = None) -> Dict:
+def chunked(items: List, size: int) -> List[List]:
+    """Split a list into consecutive chunks of at most `size` items."""
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def split_download(data: pd.DataFrame, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Split a grouped yf.download() frame into one OHLCV frame per ticker.
+    Rows without a close (dates where only other tickers traded) are dropped.
+    """
+    histories: Dict[str, pd.DataFrame] = {}
+    if data is None or data.empty:
+        return histories
+
+    grouped = isinstance(data.columns, pd.MultiIndex)
+    available = set(data.columns.get_level_values(0)) if grouped else set()
+
+    for ticker in tickers:
+        if grouped:
+            if ticker not in available:
+                continue
+            hist = data[ticker]
+        elif len(tickers) == 1:
+            hist = data
+        else:
+            continue
+
+        hist = hist.dropna(subset=["Close"])
+        if not hist.empty:
+            histories[ticker] = hist
+
+    return histories
+
+
+def fetch_histories(tickers: List[str], **kwargs) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch daily OHLCV for many tickers.
+
+    In "batched" mode the universe is split into DATA_CHUNK_SIZE groups and each
+    group is pulled with a single yf.download() call (DATA_FETCH_THREADS workers
+    inside yfinance). "per_ticker" keeps the old one-request-per-symbol path.
+    kwargs are passed through to yfinance (period=..., or start=/end=).
+    """
+    if DATA_FETCH_MODE == "per_ticker":
+        histories = {}
+        for ticker in tickers:
+            try:
+                metrics.count("yahoo_calls")
+                hist = yf.Ticker(ticker).history(**kwargs)
+                if not hist.empty:
+                    histories[ticker] = hist
+            except Exception as e:
+                print(f" Failed OHLCV fetch for {ticker}: {e}")
+        return histories
+
+    histories: Dict[str, pd.DataFrame] = {}
+    chunks = chunked(tickers, DATA_CHUNK_SIZE)
+
+    # yf.download keeps its results in module-level state, so chunks run one
+    # after another and the parallelism lives inside each grouped download.
+    for i, chunk in enumerate(chunks, start=1):
+        started = time.perf_counter()
+        metrics.count("yahoo_calls", len(chunk))  # yfinance requests each symbol separately
+        try:
+            data = yf.download(
+                chunk,
+                group_by="ticker",
+                auto_adjust=True,
+                threads=DATA_FETCH_THREADS,
+                progress=False,
+                **kwargs,
+            )
+            chunk_histories = split_download(data, chunk)
+        except Exception as e:
+            print(f" Failed OHLCV download for chunk {i}/{len(chunks)}: {e}")
+            chunk_histories = {}
+
+        histories.update(chunk_histories)
+        elapsed = time.perf_counter() - started
+        print(
+            f"⏱️ Chunk {i}/{len(chunks)}: {len(chunk_histories)}/{len(chunk)} tickers "
+            f"in {elapsed:.2f}s"
+        )
+
+    return histories
+
+
+def latest_finalized_candle(hist: pd.DataFrame) -> Optional[pd.Series]:
+    """Return the latest complete daily candle (skips today's intraday bar)."""
+    if hist is None or hist.empty:
+        return None
+
+    last = hist.iloc[-1]
+    if last.name.date() == date.today():
+        # If today is incomplete → use yesterday’s
+        if len(hist) > 1:
+            last = hist.iloc[-2]
+    return last
+
+
+def candle_to_row(ticker: str, candle: pd.Series) -> Dict:
+    """Convert a yfinance candle into a spac_data row."""
+    return {
+        "ticker": ticker,
+        "trade_date": candle.name.date().isoformat(),
+        "open": float(candle["Open"]),
+        "high": float(candle["High"]),
+        "low": float(candle["Low"]),
+        "close": float(candle["Close"]),
+        "volume": int(candle["Volume"])
+    }
+
+
+def get_last_trade_dates() -> Dict[str, date]:
+    """Latest stored trade_date per ticker, via one aggregate RPC (see spac_data_repo)."""
+    rows = fetch_all(lambda: supabase.rpc("spac_data_last_trade_dates", {}))
+    return {
+        row["ticker"]: date.fromisoformat(row["last_trade_date"])
+        for row in rows
+        if row.get("last_trade_date")
+    }
+
+
+def missing_ranges(tickers: List[str], last_dates: Dict[str, date], today: date) -> Dict[date, List[str]]:
+    """
+    Group tickers by the first trade date missing from spac_data.
+    Tickers with no stored history start DATA_INITIAL_HISTORY_DAYS back;
+    tickers with no business day between their last candle and today are skipped.
     """
-    Fetch OHLCV + metadata for SPAC tickers, update Supabase,
+    groups: Dict[date, List[str]] = {}
+    for ticker in tickers:
+        last = last_dates.get(ticker)
+        start = last + timedelta(days=1) if last else today - timedelta(days=DATA_INITIAL_HISTORY_DAYS)
+        if start >= today or np.busday_count(start, today) == 0:
+            continue
+        groups.setdefault(start, []).append(ticker)
+    return groups
+
+
+def store_latest_candles(tickers: List[str], writer: SpacDataWriter) -> List[Dict]:
+    """Queue the latest finalized candle per ticker (the pre-incremental behaviour)."""
+    updated: List[Dict] = []
+
+    # --- Latest finalized OHLCV (avoid intraday candles) ---
+    started = time.perf_counter()
+    histories = fetch_histories(tickers, period="7d")  # last week to be safe
+    print(f"⏱️ Downloaded OHLCV for {len(histories)}/{len(tickers)} tickers in {time.perf_counter() - started:.2f}s")
+
+    for ticker in tickers:
+        try:
+            last = latest_finalized_candle(histories.get(ticker))
+            if last is None:
+                print(f" No OHLCV data for {ticker}")
+                continue
+
+            candle = candle_to_row(ticker, last)
+            writer.add(candle)
+            print(f" Queued OHLCV for {ticker} on {candle['trade_date']}")
+            updated.append({"ticker": ticker, "trade_date": candle["trade_date"]})
+
+        except Exception as e:
+            print(f" Failed OHLCV parse for {ticker}: {e}")
+
+    return updated
+
+
+def sync_missing_candles(tickers: List[str], writer: SpacDataWriter) -> List[Dict]:
+    """
+    Incremental sync: fetch only the finalized days missing since each ticker's
+    last stored candle. Today's candle is excluded (yfinance `end` is exclusive).
+    """
+    today = date.today()
+    last_dates = get_last_trade_dates()
+    groups = missing_ranges(tickers, last_dates, today)
+
+    pending = sum(len(group) for group in groups.values())
+    print(f"🔄 Incremental sync: {pending}/{len(tickers)} tickers missing data ({len(groups)} date ranges)")
+
+    updated: List[Dict] = []
+    for start, group in sorted(groups.items()):
+        started = time.perf_counter()
+        histories = fetch_histories(group, start=start.isoformat(), end=today.isoformat())
+        print(f"⏱️ Range {start} → {today}: {len(histories)}/{len(group)} tickers in {time.perf_counter() - started:.2f}s")
+
+        group_updated: List[Dict] = []
+        for ticker, hist in histories.items():
+            last = last_dates.get(ticker)
+            rows = [
+                candle_to_row(ticker, candle)
+                for _, candle in hist.iterrows()
+                if candle.name.date() < today and (last is None or candle.name.date() > last)
+            ]
+            for row in rows:
+                writer.add(row)
+            if rows:
+                print(f" Queued {len(rows)} OHLCV rows for {ticker} ({rows[0]['trade_date']} → {rows[-1]['trade_date']})")
+                group_updated.append({"ticker": ticker, "trade_date": rows[-1]["trade_date"]})
+
+        # Commit each range as soon as it is fetched: if the run dies later, the
+        # rerun's get_last_trade_dates() already skips these tickers.
+        if writer.flush():
+            refresh_volume_baselines([u["ticker"] for u in group_updated])
+        updated.extend(group_updated)
+
+    return updated
+
+
+def fetch_and_store_daily_data(state: Dict = None, mode: str = DATA_SYNC_MODE) -> Dict:
+    """
+    Fetch OHLCV for SPAC tickers, update Supabase,
     and return workflow state for downstream agents.
+    Metadata (country / exchange / IPO date) is refreshed separately by metadata_agent.
+
+    mode="incremental" fills every missing day since the last stored candle,
+    mode="latest" only stores the most recent finalized candle.
 
     Returns state dict with:
     {
@@ -20,92 +244,78 @@ def fetch_and_store_daily_data(state: Dict = None) -> Dict:
     if state is None:
         state = {}
 
-    tickers = supabase.table("spac_list").select("ticker").execute().data
-    if not tickers:
+    # A sharded run passes its slice of the universe in state["tickers"]
+    universe = state.get("tickers") or [row["ticker"] for row in load_spac_list("ticker")]
+    if not universe:
         print(" No tickers found in spac_list")
         state.update({"status": "empty", "tickers": [], "updated": [], "anomalies": []})
         return state
 
-    updated: List[Dict] = []
+    writer = SpacDataWriter(mirror=store)  # keep the local OHLCV store in sync
 
-    for row in tickers:
-        ticker = row["ticker"]
-        stock = yf.Ticker(ticker)
+    if mode == "incremental":
+        updated = sync_missing_candles(universe, writer)
+    else:
+        updated = store_latest_candles(universe, writer)
 
-        # --- 1. Metadata enrichment ---
-        try:
-            info = stock.info or {}
-            country = info.get("country", "Unknown")
-            exchange = info.get("exchange", "Unknown")
-            ipo_raw = info.get("ipoExpectedDate") or info.get("firstTradeDateEpochUtc")
-
-            ipo_date = None
-            if ipo_raw:
-                try:
-                    if isinstance(ipo_raw, int):
-                        ipo_date = datetime.fromtimestamp(ipo_raw).date()
-                    elif isinstance(ipo_raw, str):
-                        ipo_date = datetime.strptime(ipo_raw, "%Y-%m-%d").date()
-                except Exception:
-                    ipo_date = None
-
-            supabase.table("spac_list").update({
-                "country": country,
-                "exchange": exchange,
-                "ipo_date": ipo_date.isoformat() if ipo_date else None
-            }).eq("ticker", ticker).execute()
-
-            print(f" Metadata updated for {ticker}: {country}, IPO={ipo_date}, Exchange={exchange}")
-        except Exception as e:
-            print(f" Failed metadata update for {ticker}: {e}")
-
-        # --- 2. Latest finalized OHLCV (avoid intraday candles) ---
-        try:
-            hist = stock.history(period="7d")  # last week to be safe
-            if hist.empty:
-                print(f" No OHLCV data for {ticker}")
-                continue
-
-            last = hist.iloc[-1]
-            if last.name.date() == date.today():
-                # If today is incomplete → use yesterday’s
-                if len(hist) > 1:
-                    last = hist.iloc[-2]
-
-            trade_date = last.name.date()
-
-            supabase.table("spac_data").upsert({
-                "ticker": ticker,
-                "trade_date": trade_date.isoformat(),
-                "open": float(last["Open"]),
-                "high": float(last["High"]),
-                "low": float(last["Low"]),
-                "close": float(last["Close"]),
-                "volume": int(last["Volume"])
-            }).execute()
-
-            print(f" Stored OHLCV for {ticker} on {trade_date}")
-            updated.append({"ticker": ticker, "trade_date": trade_date.isoformat()})
-
-        except Exception as e:
-            print(f" Failed OHLCV fetch for {ticker}: {e}")
+    # One batched upsert per SPAC_DATA_BATCH_SIZE rows instead of one per ticker
+    # (incremental mode has already flushed range by range)
+    if writer.flush():
+        # Keep the analyzer's 10/90-day volume baselines in step with the new candles
+        refresh_volume_baselines([u["ticker"] for u in updated])
 
     # --- Build final state ---
     state.update({
         "status": "ok",
-        "tickers": [row["ticker"] for row in tickers],
+        "tickers": universe,
         "updated": updated,
         "anomalies": state.get("anomalies", [])  
     })
     return state
 
 
-# For standalone runs (outside LangGraph)
-if __name__ == "__main__":
-    final_state = fetch_and_store_daily_data()
-    print("Final state:", final_state)
+def backfill(start: str, end: str, tickers: Optional[List[str]] = None) -> int:
+    """
+    Rebuild spac_data between start and end (inclusive, YYYY-MM-DD) for the
+    whole universe. Sequential chunked backfill: DATA_CHUNK_SIZE tickers per
+    grouped download, one chunk after another (yf.download keeps module-level
+    state, see fetch_histories); the only concurrency is yfinance's own
+    DATA_FETCH_THREADS inside each chunk. Rows are upserted in batches.
+    Returns the number of rows written.
+    """
+    if tickers is None:
+        tickers = [row["ticker"] for row in load_spac_list("ticker")]
 
+    today = date.today()
+    end_exclusive = min(date.fromisoformat(end) + timedelta(days=1), today)  # never store today's candle
+    print(f"🧱 Backfilling {len(tickers)} tickers from {start} to {end_exclusive - timedelta(days=1)}")
 
+    started = time.perf_counter()
+    histories = fetch_histories(tickers, start=start, end=end_exclusive.isoformat())
 
+    writer = SpacDataWriter(mirror=store)  # keep the local OHLCV store in sync
+    for ticker, hist in histories.items():
+        for _, candle in hist.iterrows():
+            if candle.name.date() < today:
+                writer.add(candle_to_row(ticker, candle))
 
+    written = writer.flush()
+    if written:
+        refresh_volume_baselines(list(histories))
+    print(f"✅ Backfill finished: {written} rows for {len(histories)}/{len(tickers)} tickers in {time.perf_counter() - started:.2f}s")
+    return written
+
+
+# For standalone runs (outside LangGraph)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch SPAC OHLCV into spac_data")
+    parser.add_argument("--mode", choices=["incremental", "latest"], default=DATA_SYNC_MODE)
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"),
+                        help="rebuild history for the whole universe between START and END (YYYY-MM-DD)")
+    args = parser.parse_args()
 
+    if args.backfill:
+        backfill(*args.backfill)
+    else:
+        final_state = fetch_and_store_daily_data(mode=args.mode)
+        print("Final state:", final_state)
@@ -1,5 +1,6 @@
 # backend/agents/lifecycle_agent.py
-from backend.db.supabase_client import supabase
+from backend.db.alerts_repo import AnomalySink
+from backend.db.spac_data_reader import load_spac_list
 from datetime import date
 from typing import List, Dict
 
@@ -21,37 +22,6 @@ def check_milestones(ticker: str, ipo_date: date) -> List[str]:
     return alerts
 
 
-def insert_alert_if_new(alert: Dict, anomaly_type: str) -> bool:
-    """
-    Insert anomaly into Supabase if not already logged *today*.
-    Always enforces today's trade_date.
-    Returns True if inserted, False if duplicate.
-    """
-    today = date.today().isoformat()
-
-    exists = (
-        supabase.table("anomaly_reports")
-        .select("id")
-        .eq("ticker", alert["ticker"])
-        .eq("trade_date", today)   # ✅ only today
-        .eq("anomaly_type", anomaly_type)
-        .eq("description", alert["description"])
-        .execute()
-        .data
-    )
-
-    if not exists:
-        supabase.table("anomaly_reports").insert({
-            "ticker": alert["ticker"],
-            "trade_date": today,  # ✅ force today's date
-            "anomaly_type": anomaly_type,
-            "description": alert["description"],
-        }).execute()
-        return True
-
-    return False
-
-
 def run_lifecycle_agent(state: Dict = None) -> Dict:
     """
     Lifecycle agent: check IPO milestones for tickers in state["tickers"],
@@ -61,22 +31,13 @@ def run_lifecycle_agent(state: Dict = None) -> Dict:
     if state is None:
         state = {}
 
-    tickers = state.get("tickers")
-    if not tickers:
-        rows = supabase.table("spac_list").select("ticker, ipo_date").execute().data
-        tickers = [row["ticker"] for row in rows] if rows else []
-
-    # Pull IPO dates for selected tickers
-    spac_rows = (
-        supabase.table("spac_list")
-        .select("ticker, ipo_date")
-        .in_("ticker", tickers)
-        .execute()
-        .data
-    )
+    # Pull IPO dates for selected tickers (whole list if none given)
+    spac_rows = load_spac_list("ticker, ipo_date", state.get("tickers") or None)
+    tickers = [row["ticker"] for row in spac_rows]
 
     today = date.today().isoformat()
     new_alerts: List[Dict] = []
+    sink = AnomalySink()
 
     for row in spac_rows:
         ticker = row["ticker"]
@@ -99,11 +60,14 @@ def run_lifecycle_agent(state: Dict = None) -> Dict:
                 "description": desc,
             }
 
-            if insert_alert_if_new(alert, "Lifecycle"):
-                print(f"📌 {ticker} ({today}) [Lifecycle] {desc}")
-                new_alerts.append({**alert, "trade_date": today})
-            else:
-                print(f"⏩ Skipped duplicate for {ticker} ({today}): {desc}")
+            sink.add(alert, "Lifecycle")
+
+    inserted, skipped = sink.flush()
+    for alert in inserted:
+        print(f"📌 {alert['ticker']} ({today}) [Lifecycle] {alert['description']}")
+        new_alerts.append(alert)
+    for alert in skipped:
+        print(f"⏩ Skipped duplicate for {alert['ticker']} ({today}): {alert['description']}")
 
     # --- Update workflow state ---
     state.update({
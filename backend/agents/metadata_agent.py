@@ -0,0 +1,118 @@
+# backend/agents/metadata_agent.py
+import yfinance as yf
+from dateutil.parser import isoparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, List, Optional
+from backend.db.supabase_client import supabase
+from backend.db.spac_data_reader import load_spac_list
+from backend.lib.rate_limit import RateLimiter
+from backend.lib import metrics
+from backend.config import METADATA_TTL_DAYS, METADATA_WORKERS, METADATA_RATE_LIMIT
+
+
+def parse_ipo_date(info: Dict) -> Optional[date]:
+    """Read the IPO / first trade date from a Yahoo info payload."""
+    ipo_raw = info.get("ipoExpectedDate") or info.get("firstTradeDateEpochUtc")
+    if not ipo_raw:
+        return None
+
+    try:
+        if isinstance(ipo_raw, int):
+            return datetime.fromtimestamp(ipo_raw).date()
+        if isinstance(ipo_raw, str):
+            return datetime.strptime(ipo_raw, "%Y-%m-%d").date()
+    except Exception:
+        return None
+    return None
+
+
+def is_stale(row: Dict, now: datetime, ttl_days: float = METADATA_TTL_DAYS) -> bool:
+    """Metadata needs a refresh if it was never fetched, is incomplete, or is older than the TTL."""
+    if not row.get("country") or not row.get("exchange"):
+        return True
+
+    refreshed_at = row.get("metadata_updated_at")
+    if not refreshed_at:
+        return True
+
+    try:
+        # Postgres timestamptz trims fractional seconds ("12:00:00.1234+00:00"),
+        # which datetime.fromisoformat rejects before Python 3.11
+        refreshed_at = isoparse(refreshed_at)
+    except ValueError:
+        return True
+    if refreshed_at.tzinfo is None:
+        refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)
+
+    return now - refreshed_at > timedelta(days=ttl_days)
+
+
+def fetch_metadata(ticker: str, limiter: RateLimiter, now: datetime) -> Optional[Dict]:
+    """Fetch country / exchange / IPO date for one ticker (rate limited)."""
+    limiter.wait()
+    metrics.count("yahoo_calls")
+    try:
+        info = yf.Ticker(ticker).info or {}
+    except Exception as e:
+        print(f" Failed metadata update for {ticker}: {e}")
+        return None
+
+    ipo_date = parse_ipo_date(info)
+    row = {
+        "ticker": ticker,
+        "country": info.get("country", "Unknown"),
+        "exchange": info.get("exchange", "Unknown"),
+        "ipo_date": ipo_date.isoformat() if ipo_date else None,
+        "metadata_updated_at": now.isoformat(),
+    }
+    print(f" Metadata updated for {ticker}: {row['country']}, IPO={ipo_date}, Exchange={row['exchange']}")
+    return row
+
+
+def run_metadata_agent(state: Dict = None) -> Dict:
+    """
+    Metadata agent: refresh spac_list country / exchange / ipo_date for tickers
+    whose metadata is missing or older than METADATA_TTL_DAYS.
+    Yahoo calls run on a bounded thread pool behind a shared rate limit
+    (state["metadata_rate"] when a shard gets a share of it) and all refreshed
+    rows are written back with a single upsert.
+    """
+    if state is None:
+        state = {}
+
+    rows = load_spac_list("ticker, country, exchange, ipo_date, metadata_updated_at", state.get("tickers") or None)
+
+    now = datetime.now(timezone.utc)
+    stale = [row["ticker"] for row in rows if is_stale(row, now)]
+    print(f"🏷️ Metadata: {len(stale)}/{len(rows)} tickers older than {METADATA_TTL_DAYS:g} days or missing")
+
+    refreshed: List[Dict] = []
+    if stale:
+        rate = state.get("metadata_rate")
+        limiter = RateLimiter(METADATA_RATE_LIMIT if rate is None else rate)
+        with ThreadPoolExecutor(max_workers=max(1, METADATA_WORKERS)) as pool:
+            fetch = metrics.bind_context(fetch_metadata)
+            results = pool.map(lambda t: fetch(t, limiter, now), stale)
+            refreshed = [r for r in results if r]
+
+    if refreshed:
+        try:
+            supabase.table("spac_list").upsert(refreshed, on_conflict="ticker").execute()
+            metrics.count("rows_written", len(refreshed))
+            print(f"💾 Wrote metadata for {len(refreshed)} tickers in one batch")
+        except Exception as e:
+            print(f"❌ Failed metadata batch update: {e}")
+            refreshed = []
+
+    state.update({
+        "metadata_refreshed": [r["ticker"] for r in refreshed],
+        "anomalies": state.get("anomalies", []),
+    })
+    return state
+
+
+if __name__ == "__main__":
+    print("🚀 Running Metadata Agent...")
+    final_state = run_metadata_agent()
+    print(f"✅ Completed — {len(final_state['metadata_refreshed'])} tickers refreshed")
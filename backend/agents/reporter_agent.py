@@ -1,10 +1,17 @@
 # backend/agents/reporter_agent.py
+import argparse
+import asyncio
+import html
 import os
-import requests
-from datetime import date
+from datetime import date, datetime
+from typing import Iterator
+from dateutil.parser import isoparse
 from backend.db.supabase_client import supabase
+from backend.db.alerts_repo import utc_now_naive, anomaly_fingerprint
+from backend.lib.report_cache import report_cache, content_hash
+from backend.services.delivery import enqueue_report, drain, last_delivery_at
+from backend.config import REPORT_MODE, DELIVERY_DRAIN_TIMEOUT
 
-DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
 REPORTS_DIR = "reports"
 
 
@@ -18,27 +25,6 @@ def save_markdown_report(content: str, filename: str) -> str:
     return path
 
 
-def send_to_discord(filepath: str, summary: str, message: str = "📊 Daily SPAC Report"):
-    """Send the Markdown file to Discord via webhook with a summary message."""
-    if not DISCORD_WEBHOOK_URL:
-        print("⚠️ No Discord webhook configured")
-        return
-
-    try:
-        with open(filepath, "rb") as f:
-            response = requests.post(
-                DISCORD_WEBHOOK_URL,
-                data={"content": f"{message}\n{summary}"},
-                files={"file": (os.path.basename(filepath), f, "text/markdown")},
-            )
-        if response.status_code in (200, 204):
-            print("✅ Report sent to Discord")
-        else:
-            print(f"❌ Discord webhook error: {response.status_code} {response.text}")
-    except Exception as e:
-        print(f"❌ Failed to send Discord message: {e}")
-
-
 def normalize_anomaly(a: dict) -> dict:
     """Ensure anomaly dict has all required keys."""
     return {
@@ -49,45 +35,43 @@ def normalize_anomaly(a: dict) -> dict:
     }
 
 
-def build_markdown_from_anomalies(anomalies: list) -> str:
-    """Build a Markdown report with deduplicated, merged Volume sections."""
-    if not anomalies:
-        return "# 📊 Daily SPAC Alerts\n\n✅ No anomalies today."
-
-    # Normalize anomalies
+def build_report_model(anomalies: list) -> dict:
+    """
+    Structured report: the sections of the Markdown report as plain data
+    (priority tickers, merged Volume alerts, remaining categories), so the same
+    content can be rendered as Markdown, JSON or HTML. Anomalies are indexed by
+    ticker and category in one pass (O(n log n) overall, for the sorts).
+    """
+    # ---- Index once: by category and by ticker (input order preserved) ----
     grouped = {}
+    by_ticker = {}
     ticker_categories = {}
     for a in anomalies:
         ticker = a["ticker"]
         anomaly_type = a["anomaly_type"]
 
         grouped.setdefault(anomaly_type, []).append(a)
+        by_ticker.setdefault(ticker, []).append(a)
         ticker_categories.setdefault(ticker, set()).add(anomaly_type)
 
-    content = "# 📊 Daily SPAC Alerts\n\n"
-
     # ---- Priority Section: Multi-category tickers ----
-    priority = [t for t, cats in ticker_categories.items() if len(cats) > 1]
-    if priority:
-        content += "## ⚠️ Priority: Multi-Category Tickers\n\n"
-        for ticker in sorted(priority):
-            cats = ", ".join(sorted(ticker_categories[ticker]))
-            ticker_anomalies = [a for a in anomalies if a["ticker"] == ticker]
-            content += f"- [**{ticker}**]({ticker}) → in categories: *{cats}*\n"
-            for a in sorted(ticker_anomalies, key=lambda x: x["anomaly_type"]):
-                content += f"  - ({a['trade_date']}) [{a['anomaly_type']}] {a['description']}\n"
-            content += "\n"
+    priority = [
+        {
+            "ticker": ticker,
+            "categories": sorted(ticker_categories[ticker]),
+            "alerts": sorted(by_ticker[ticker], key=lambda x: x["anomaly_type"]),
+        }
+        for ticker in sorted(t for t, cats in ticker_categories.items() if len(cats) > 1)
+    ]
 
     # ---- Organize Volume Alerts (deduped + merged per ticker) ----
+    volume = None
     if "Volume" in grouped:
         merged = {}
-        for a in grouped["Volume"]:
+        for a in grouped.pop("Volume"):
             ticker = a["ticker"]
             desc = a["description"]
 
-            # Normalize duplicate ANNA-type messages
-            desc = desc.replace(f"{ticker} ($", f"{ticker} ($").replace(f"{ticker} had", f"{ticker} had")
-
             if ticker not in merged:
                 merged[ticker] = {
                     "trade_date": a["trade_date"],
@@ -103,81 +87,221 @@ def build_markdown_from_anomalies(anomalies: list) -> str:
             else:
                 merged[ticker]["spikes"].append(desc)
 
-        content += "## 🔹 Volume Alerts\n\n"
-
-        # Very Low Volume
-        low_tickers = {t: d for t, d in merged.items() if d["lows"]}
-        if low_tickers:
-            content += "### 🔻 Very Low Volume (Price ≥ $0.20)\n\n"
-            for ticker, data in sorted(low_tickers.items()):
-                # Dedup reasons
-                reasons = list(set(data["lows"]))
-                content += f"- [**{ticker}**]({ticker}) ({data['trade_date']}) → {'; '.join(reasons)}\n"
-
-            content += "\n"
-
-        # Volume Spikes
-        spike_tickers = {t: d for t, d in merged.items() if d["spikes"]}
-        if spike_tickers:
-            content += "### 🚀 Volume Spikes\n\n"
-            for ticker, data in sorted(spike_tickers.items()):
-                reasons = list(set(data["spikes"]))
-                content += f"- [**{ticker}**]({ticker}) ({data['trade_date']}) → {'; '.join(reasons)}\n"
-            content += "\n"
-
-        # Zero Volume
-        zero_tickers = {t: d for t, d in merged.items() if d["zeros"]}
-        if zero_tickers:
-            content += "### ⚠️ Suspicious Zero-Volume\n\n"
-            for ticker, data in sorted(zero_tickers.items()):
-                reasons = list(set(data["zeros"]))
-                content += f"- [**{ticker}**]({ticker}) ({data['trade_date']}) → {'; '.join(reasons)}\n"
-            content += "\n"
-
-        grouped.pop("Volume")
+        ordered = sorted(merged.items())
+        volume = {
+            # Dedup reasons
+            kind: [
+                {"ticker": ticker, "trade_date": data["trade_date"], "reasons": list(set(data[kind]))}
+                for ticker, data in ordered if data[kind]
+            ]
+            for kind in ("lows", "spikes", "zeros")
+        }
 
     # ---- Remaining Categories ----
-    for category, alerts in grouped.items():
-        content += f"## 🔹 {category} Alerts\n\n"
-        for a in sorted(alerts, key=lambda x: x["ticker"]):
-            content += f"- [**{a['ticker']}**]({a['ticker']}) ({a['trade_date']}) → {a['description']}\n"
-        content += "\n"
+    categories = [
+        {"name": category, "alerts": sorted(alerts, key=lambda x: x["ticker"])}
+        for category, alerts in grouped.items()
+    ]
 
-    return content
+    return {
+        "count": len(anomalies),
+        "alerts": anomalies,
+        "priority": priority,
+        "volume": volume,
+        "categories": categories,
+    }
 
 
+VOLUME_HEADINGS = {
+    "lows": "🔻 Very Low Volume (Price ≥ $0.20)",
+    "spikes": "🚀 Volume Spikes",
+    "zeros": "⚠️ Suspicious Zero-Volume",
+}
+
+
+def iter_markdown_from_model(model: dict) -> Iterator[str]:
+    """Yield the Markdown report for a build_report_model() result piece by piece."""
+    if not model["count"]:
+        yield "# 📊 Daily SPAC Alerts\n\n✅ No anomalies today."
+        return
+
+    yield "# 📊 Daily SPAC Alerts\n\n"
+
+    if model["priority"]:
+        yield "## ⚠️ Priority: Multi-Category Tickers\n\n"
+        for p in model["priority"]:
+            yield f"- [**{p['ticker']}**]({p['ticker']}) → in categories: *{', '.join(p['categories'])}*\n"
+            for a in p["alerts"]:
+                yield f"  - ({a['trade_date']}) [{a['anomaly_type']}] {a['description']}\n"
+            yield "\n"
+
+    if model["volume"] is not None:
+        yield "## 🔹 Volume Alerts\n\n"
+        for kind, heading in VOLUME_HEADINGS.items():
+            rows = model["volume"][kind]
+            if not rows:
+                continue
+            yield f"### {heading}\n\n"
+            for row in rows:
+                yield f"- [**{row['ticker']}**]({row['ticker']}) ({row['trade_date']}) → {'; '.join(row['reasons'])}\n"
+            yield "\n"
+
+    for category in model["categories"]:
+        yield f"## 🔹 {category['name']} Alerts\n\n"
+        for a in category["alerts"]:
+            yield f"- [**{a['ticker']}**]({a['ticker']}) ({a['trade_date']}) → {a['description']}\n"
+        yield "\n"
+
+
+def render_html(model: dict, title: str = "📊 Daily SPAC Alerts") -> str:
+    """HTML fragment for a build_report_model() result (same sections as the Markdown)."""
+    e = html.escape
+    out = [f"<h1>{e(title)}</h1>"]
+    if not model["count"]:
+        out.append("<p>✅ No anomalies today.</p>")
+        return "\n".join(out)
+
+    if model["priority"]:
+        out.append("<h2>⚠️ Priority: Multi-Category Tickers</h2><ul>")
+        for p in model["priority"]:
+            items = "".join(
+                f"<li>({e(a['trade_date'])}) [{e(a['anomaly_type'])}] {e(a['description'])}</li>" for a in p["alerts"]
+            )
+            out.append(f"<li><strong>{e(p['ticker'])}</strong> → in categories: <em>{e(', '.join(p['categories']))}</em><ul>{items}</ul></li>")
+        out.append("</ul>")
+
+    if model["volume"] is not None:
+        out.append("<h2>🔹 Volume Alerts</h2>")
+        for kind, heading in VOLUME_HEADINGS.items():
+            rows = model["volume"][kind]
+            if rows:
+                out.append(f"<h3>{e(heading)}</h3><ul>")
+                out.extend(
+                    f"<li><strong>{e(r['ticker'])}</strong> ({e(r['trade_date'])}) → {e('; '.join(r['reasons']))}</li>"
+                    for r in rows
+                )
+                out.append("</ul>")
+
+    for category in model["categories"]:
+        out.append(f"<h2>🔹 {e(category['name'])} Alerts</h2><ul>")
+        out.extend(
+            f"<li><strong>{e(a['ticker'])}</strong> ({e(a['trade_date'])}) → {e(a['description'])}</li>"
+            for a in category["alerts"]
+        )
+        out.append("</ul>")
+    return "\n".join(out)
+
+
+def iter_markdown_report(anomalies: list) -> Iterator[str]:
+    """Yield the Markdown report piece by piece, with deduplicated, merged Volume sections."""
+    return iter_markdown_from_model(build_report_model(anomalies))
 
-def run_reporter_agent(state: dict = None, target_date: str | None = None) -> dict:
-    """Reporter agent entrypoint."""
-    target_date = target_date or date.today().isoformat()
 
-    response = (
+def build_markdown_from_anomalies(anomalies: list) -> str:
+    """Build the Markdown report as one string."""
+    return "".join(iter_markdown_report(anomalies))
+
+
+def stream_markdown_report(anomalies: list, filename: str, model: dict | None = None) -> str:
+    """Render the report straight into the report file (no full in-memory copy) and return its path."""
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = os.path.join(REPORTS_DIR, filename)
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(iter_markdown_from_model(model or build_report_model(anomalies)))
+    print(f"📄 Markdown report saved to {path}")
+    return path
+
+
+# --- Anomaly sources ---
+def load_anomalies(target_date: str, created_after: str | None = None, created_before: str | None = None) -> list:
+    """anomaly_reports rows for target_date, optionally limited to a created_at window."""
+    query = (
         supabase.table("anomaly_reports")
         .select("ticker, trade_date, anomaly_type, description")
         .eq("trade_date", target_date)
-        .execute()
     )
-    anomalies = [normalize_anomaly(a) for a in (response.data or [])]
+    if created_after:
+        query = query.gt("created_at", created_after)
+    if created_before:
+        query = query.lt("created_at", created_before)
+    return [normalize_anomaly(a) for a in (query.order("id").execute().data or [])]
+
+
+def collect_anomalies(state: dict | None, target_date: str, since: str | None = None) -> list:
+    """
+    Anomalies to report: the ones this run already holds in state plus a single
+    query for rows written before the run started (earlier runs, other
+    processes). Without state["run_started_at"] everything comes from the table.
+
+    State only holds rows this run inserted, all created after run_started_at.
+    When `since` (the last delta) is later than that, some of them were already
+    reported, so the delta is read from the table by created_at instead.
+    """
+    started = (state or {}).get("run_started_at")
+    if not started or (since and isoparse(since) >= isoparse(started)):
+        return load_anomalies(target_date, created_after=since)
+
+    earlier = load_anomalies(target_date, created_after=since, created_before=started)
+    ours = [normalize_anomaly(a) for a in state.get("anomalies", []) if a.get("trade_date") == target_date]
+
+    anomalies, seen = [], set()
+    for a in earlier + ours:
+        key = (a["ticker"], a["anomaly_type"], a["description"])
+        if key not in seen:
+            seen.add(key)
+            anomalies.append(a)
+    return anomalies
+
+
+def run_reporter_agent(state: dict = None, target_date: str | None = None, mode: str = REPORT_MODE) -> dict:
+    """
+    Reporter agent entrypoint.
+
+    mode="full" renders every anomaly of the day and sends it once per date.
+    mode="delta" renders only anomalies created since the last report for the
+    date and sends them as an update (falls back to full if nothing was sent yet).
+    """
+    target_date = target_date or date.today().isoformat()
+    built_at = utc_now_naive()  # the next delta starts here
+
+    since = last_delivery_at(target_date) if mode == "delta" else None
+    delta = since is not None
+
+    fingerprint = None if delta else anomaly_fingerprint(target_date)  # before the read, see report_cache.put
+    anomalies = collect_anomalies(state, target_date, since)
 
     if state is not None:
         state["anomalies"] = anomalies
 
-    # Build + save report
-    content = build_markdown_from_anomalies(anomalies)
-    filename = f"spac_alerts_{target_date}.md"
-    path = save_markdown_report(content, filename)
-
     anomaly_count = len(anomalies)
-    summary = "✅ No anomalies today." if anomaly_count == 0 else f"⚡ {anomaly_count} anomalies detected today."
-
-    # Send to Discord
-    send_to_discord(path, summary, f"📊 SPAC Anomaly Report for {target_date}")
-
-    # Log reporting event
-    supabase.table("alerts_log").upsert({
-        "alert_date": target_date,
-        "alert_channel": "discord"
-    }).execute()
+    if delta and anomaly_count == 0:
+        print(f"⏩ No new anomalies since the last report ({since})")
+        if state is not None:
+            return state
+        return {"status": "unchanged", "file": None, "anomalies": 0}
+
+    # Build + save report (streamed into the file)
+    if delta:
+        filename = f"spac_alerts_{target_date}_delta_{datetime.now().strftime('%H%M%S')}.md"
+    else:
+        filename = f"spac_alerts_{target_date}.md"
+    model = build_report_model(anomalies)
+    path = stream_markdown_report(anomalies, filename, model)
+    if not delta and fingerprint[0] == anomaly_count:
+        # Same model serves get_alerts_markdown (Markdown / JSON / HTML) without a rebuild.
+        # A count mismatch means rows this run didn't read (state + earlier query): don't cache.
+        report_cache.put(target_date, content_hash(anomalies), model, fingerprint)
+
+    if delta:
+        summary = f"🆕 {anomaly_count} new anomalies since the last report."
+        title = f"📊 SPAC Anomaly Update for {target_date}"
+    else:
+        summary = "✅ No anomalies today." if anomaly_count == 0 else f"⚡ {anomaly_count} anomalies detected today."
+        title = f"📊 SPAC Anomaly Report for {target_date}"
+
+    # Queue for delivery (services/delivery): full reports once per date and
+    # channel, every delta as a new message. Sending happens off the workflow path.
+    enqueue_report(path, title, summary, target_date, built_at, delta=delta)
 
     print("✅ Reporter agent finished.")
 
@@ -187,7 +311,12 @@ def run_reporter_agent(state: dict = None, target_date: str | None = None) -> di
 
 
 if __name__ == "__main__":
-    run_reporter_agent()
+    parser = argparse.ArgumentParser(description="Build and send the SPAC anomaly report")
+    parser.add_argument("--date", default=None, help="report date (default: today)")
+    parser.add_argument("--mode", choices=["full", "delta"], default=REPORT_MODE)
+    args = parser.parse_args()
+    run_reporter_agent(target_date=args.date, mode=args.mode)
+    asyncio.run(drain(timeout=DELIVERY_DRAIN_TIMEOUT))
 
 
 
@@ -1,5 +1,6 @@
 # backend/agents/risk_agent.py
-from backend.db.supabase_client import supabase
+from backend.db.alerts_repo import AnomalySink
+from backend.db.spac_data_reader import load_spac_list
 from datetime import date
 from typing import Dict, List
 
@@ -22,47 +23,16 @@ def check_risks(ticker: str, country: str, exchange: str) -> List[str]:
     return alerts
 
 
-def insert_alert_if_new(alert: Dict, anomaly_type: str) -> bool:
-    """
-    Insert anomaly into Supabase if not already logged *today*.
-    Always enforces today's trade_date.
-    Returns True if inserted, False if duplicate.
-    """
-    today = date.today().isoformat()
-
-    exists = (
-        supabase.table("anomaly_reports")
-        .select("id")
-        .eq("ticker", alert["ticker"])
-        .eq("trade_date", today)   # ✅ only today
-        .eq("anomaly_type", anomaly_type)
-        .eq("description", alert["description"])
-        .execute()
-        .data
-    )
-
-    if not exists:
-        supabase.table("anomaly_reports").insert({
-            "ticker": alert["ticker"],
-            "trade_date": today,  # ✅ force today
-            "anomaly_type": anomaly_type,
-            "description": alert["description"],
-        }).execute()
-        return True
-
-    return False
-
-
 def run_risk_agent(state: Dict = None) -> Dict:
     """
-    Risk agent: check SPACs against risk rules.
+    Risk agent: check SPACs in state["tickers"] (or all SPACs) against risk rules.
     Deduplicates anomalies by (ticker, type, desc) *for today only*.
     Updates and returns state.
     """
     if state is None:
         state = {}
 
-    rows = supabase.table("spac_list").select("ticker, country, exchange").execute().data
+    rows = load_spac_list("ticker, country, exchange", state.get("tickers") or None)
     if not rows:
         print("⚠️ No tickers found in spac_list")
         return state
@@ -70,6 +40,7 @@ def run_risk_agent(state: Dict = None) -> Dict:
     tickers = [row["ticker"] for row in rows if "ticker" in row]
     today = date.today().isoformat()
     new_alerts: List[Dict] = []
+    sink = AnomalySink()
 
     for row in rows:
         ticker = row.get("ticker")
@@ -88,11 +59,14 @@ def run_risk_agent(state: Dict = None) -> Dict:
                 "description": desc,
             }
 
-            if insert_alert_if_new(alert, "Risk"):
-                print(f"📌 {ticker} ({today}) [Risk] {desc}")
-                new_alerts.append({**alert, "trade_date": today})
-            else:
-                print(f"⏩ Skipped duplicate for {ticker} ({today}): {desc}")
+            sink.add(alert, "Risk")
+
+    inserted, skipped = sink.flush()
+    for alert in inserted:
+        print(f"📌 {alert['ticker']} ({today}) [Risk] {alert['description']}")
+        new_alerts.append(alert)
+    for alert in skipped:
+        print(f"⏩ Skipped duplicate for {alert['ticker']} ({today}): {alert['description']}")
 
     # --- Update workflow state ---
     state.update({
@@ -0,0 +1,85 @@
+# backend/config.py
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# --- Data agent: OHLCV download ---
+# "batched" → grouped yf.download calls, "per_ticker" → one Ticker.history() per symbol
+DATA_FETCH_MODE = os.getenv("DATA_FETCH_MODE", "batched")
+DATA_CHUNK_SIZE = int(os.getenv("DATA_CHUNK_SIZE", "50"))       # tickers per grouped download
+DATA_FETCH_THREADS = int(os.getenv("DATA_FETCH_THREADS", "8"))  # yfinance worker threads per chunk
+# "incremental" → fill every missing day since the last stored candle, "latest" → only the last finalized candle
+DATA_SYNC_MODE = os.getenv("DATA_SYNC_MODE", "incremental")
+DATA_INITIAL_HISTORY_DAYS = int(os.getenv("DATA_INITIAL_HISTORY_DAYS", "180"))  # history pulled for new tickers
+
+# --- Supabase bulk writes ---
+SPAC_DATA_BATCH_SIZE = int(os.getenv("SPAC_DATA_BATCH_SIZE", "500"))  # rows per spac_data upsert
+
+# --- Metadata enrichment (country / exchange / ipo_date) ---
+METADATA_TTL_DAYS = float(os.getenv("METADATA_TTL_DAYS", "7"))   # refresh when older than this
+METADATA_WORKERS = int(os.getenv("METADATA_WORKERS", "4"))       # concurrent stock.info calls
+METADATA_RATE_LIMIT = float(os.getenv("METADATA_RATE_LIMIT", "2"))  # Yahoo info requests per second
+
+# --- Local OHLCV store (read-through mirror of spac_data) ---
+OHLCV_STORE_DIR = os.getenv("OHLCV_STORE_DIR", "data/ohlcv")
+
+# --- Analyzer agent ---
+ANALYZER_MODE = os.getenv("ANALYZER_MODE", "vectorized")  # "vectorized" | "per_ticker"
+
+# --- Anomaly writes ---
+ANOMALY_BATCH_SIZE = int(os.getenv("ANOMALY_BATCH_SIZE", "500"))  # rows per anomaly_reports insert
+
+# --- Workflow runs: metrics log + checkpoints ---
+WORKFLOW_RUN_LOG = os.getenv("WORKFLOW_RUN_LOG", "data/workflow_runs.jsonl")  # one JSON line per run
+WORKFLOW_CHECKPOINT_DB = os.getenv("WORKFLOW_CHECKPOINT_DB", "data/workflow_checkpoints.sqlite")  # resumable runs
+WORKFLOW_SHARDS = int(os.getenv("WORKFLOW_SHARDS", "1"))  # >1 → run data + checks per hash shard in a process pool
+
+# --- Reporter ---
+REPORT_MODE = os.getenv("REPORT_MODE", "full")  # "full" (once per date) | "delta" (only what is new since the last report)
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", "reports/cache")  # rendered report models, one JSON per date
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "64"))       # dates kept in memory
+
+# --- MCP tool dispatch (http_server / main run_tool) ---
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "16"))             # threads shared by all blocking tools
+TOOL_CONCURRENCY = int(os.getenv("TOOL_CONCURRENCY", "8"))      # default concurrent calls per tool
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "30"))           # default seconds before a call is abandoned
+# per-tool overrides, "name=concurrency:timeout,…" (pyplot is not thread safe → one chart at a time)
+TOOL_LIMITS = os.getenv("TOOL_LIMITS", "get_filings=2:120,plot_volume_chart=1:30")
+TOOL_CACHE_MAX_BYTES = int(os.getenv("TOOL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # cached tool results (LRU by size)
+TOOL_BATCH_MAX_CALLS = int(os.getenv("TOOL_BATCH_MAX_CALLS", "100"))  # calls per /tools/batch request
+
+# --- MCP agent client (mcp_clients) ---
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))                        # long-lived MCP server sessions
+MCP_POOL_HEALTH_SECONDS = float(os.getenv("MCP_POOL_HEALTH_SECONDS", "30"))  # ping idle sessions this often
+MCP_POOL_ACQUIRE_TIMEOUT = float(os.getenv("MCP_POOL_ACQUIRE_TIMEOUT", "60"))  # wait for a free session
+MCP_CALL_TIMEOUT = float(os.getenv("MCP_CALL_TIMEOUT", "120"))              # per MCP request
+
+# --- Ticker index (ticker / company name resolution in /mcp/agent) ---
+TICKER_INDEX_REFRESH_SECONDS = float(os.getenv("TICKER_INDEX_REFRESH_SECONDS", str(6 * 3600)))  # rebuild in the background
+SEC_TICKERS_CACHE = os.getenv("SEC_TICKERS_CACHE", "data/sec_company_tickers.json")  # local copy of the SEC ticker list
+
+# --- LLM response cache (lib/llm_cache) ---
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "data/llm_cache.sqlite")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))             # default lifetime of a cached response
+LLM_CACHE_AGENT_TTL = float(os.getenv("LLM_CACHE_AGENT_TTL", "300"))          # agent answers use live data: short
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))  # LRU eviction above this
+
+# --- Outbound delivery (services/delivery) ---
+DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
+DISCORD_MAX_FILE_BYTES = int(os.getenv("DISCORD_MAX_FILE_BYTES", str(8 * 1024 * 1024)))  # larger reports are split
+DELIVERY_WEBHOOK_URL = os.getenv("DELIVERY_WEBHOOK_URL")  # generic JSON webhook channel
+DELIVERY_WEBHOOK_MAX_BYTES = int(os.getenv("DELIVERY_WEBHOOK_MAX_BYTES", str(1024 * 1024)))
+SMTP_HOST = os.getenv("SMTP_HOST")  # email channel (with REPORT_EMAIL_TO)
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+REPORT_EMAIL_FROM = os.getenv("REPORT_EMAIL_FROM", "spac-monitor@localhost")
+REPORT_EMAIL_TO = os.getenv("REPORT_EMAIL_TO")  # comma separated
+DELIVERY_OUTBOX_DB = os.getenv("DELIVERY_OUTBOX_DB", "data/outbox.sqlite")
+DELIVERY_MAX_ATTEMPTS = int(os.getenv("DELIVERY_MAX_ATTEMPTS", "8"))
+DELIVERY_BACKOFF_SECONDS = float(os.getenv("DELIVERY_BACKOFF_SECONDS", "2"))        # first retry delay, doubles
+DELIVERY_MAX_BACKOFF_SECONDS = float(os.getenv("DELIVERY_MAX_BACKOFF_SECONDS", "300"))
+DELIVERY_SEND_TIMEOUT = float(os.getenv("DELIVERY_SEND_TIMEOUT", "30"))             # per message
+DELIVERY_DRAIN_TIMEOUT = float(os.getenv("DELIVERY_DRAIN_TIMEOUT", "30"))           # workflow waits this long, the worker does the rest
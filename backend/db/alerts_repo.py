@@ -0,0 +1,139 @@
+# backend/db/alerts_repo.py
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from backend.db.supabase_client import supabase
+from backend.config import ANOMALY_BATCH_SIZE
+from backend.lib import metrics
+from backend.lib.report_cache import report_cache
+
+# Columns of unique_anomaly_idx (see anomaly_repo)
+CONFLICT_COLUMNS = ("ticker", "trade_date", "anomaly_type", "description")
+
+
+def anomaly_key(row: Dict) -> Tuple:
+    return tuple(row[c] for c in CONFLICT_COLUMNS)
+
+
+class AnomalySink:
+    """
+    Shared anomaly writer for the agents. Alerts are buffered with add() and
+    written by flush() in batched inserts; duplicates are dropped by the
+    database through unique_anomaly_idx (ON CONFLICT DO NOTHING), so there is
+    no SELECT per alert and overlapping runs can't race each other.
+    """
+
+    def __init__(self, batch_size: int = ANOMALY_BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
+        self._rows: Dict[Tuple, Dict] = {}
+        self._buffered_dupes: List[Dict] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, alert: Dict, anomaly_type: str) -> None:
+        """Buffer an alert for *today* (trade_date is always forced to today)."""
+        row = {
+            "ticker": alert["ticker"],
+            "trade_date": date.today().isoformat(),
+            "anomaly_type": anomaly_type,
+            "description": alert["description"],
+        }
+        key = anomaly_key(row)
+        if key in self._rows:
+            self._buffered_dupes.append(row)
+        else:
+            self._rows[key] = row
+
+    def flush(self) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Insert all buffered alerts. Returns (inserted, skipped) rows in the order
+        they were added; skipped rows were already logged for today.
+        """
+        rows = list(self._rows.values())
+        skipped: List[Dict] = list(self._buffered_dupes)
+        self._rows.clear()
+        self._buffered_dupes = []
+
+        inserted: List[Dict] = []
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i:i + self.batch_size]
+            response = (
+                supabase.table("anomaly_reports")
+                .upsert(batch, on_conflict=",".join(CONFLICT_COLUMNS), ignore_duplicates=True)
+                .execute()
+            )
+            # With ON CONFLICT DO NOTHING only the rows actually inserted come back
+            new_keys = {anomaly_key(r) for r in (response.data or [])}
+            metrics.count("rows_written", len(new_keys))
+            for row in batch:
+                (inserted if anomaly_key(row) in new_keys else skipped).append(row)
+
+        # Rendered reports for these dates are out of date now (other processes
+        # notice through the anomaly fingerprint, see report_cache)
+        for day in {row["trade_date"] for row in inserted}:
+            report_cache.invalidate(day)
+
+        return inserted, skipped
+
+
+def anomaly_fingerprint(target_date: str) -> Tuple[int, int]:
+    """(row count, max id) of a date's anomaly_reports rows: one cheap query, changes with every insert or delete."""
+    response = (
+        supabase.table("anomaly_reports")
+        .select("id", count="exact")
+        .eq("trade_date", target_date)
+        .order("id", desc=True)
+        .limit(1)
+        .execute()
+    )
+    max_id = response.data[0]["id"] if response.data else 0
+    return (response.count or 0, max_id)
+
+
+# --- alerts_log: report deliveries ---
+def utc_now_naive() -> str:
+    """Current UTC time in the naive format of the created_at columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def already_reported(target_date: str, channel: str = "discord") -> bool:
+    """True if a report for target_date was already delivered on `channel`."""
+    rows = (
+        supabase.table("alerts_log")
+        .select("id")
+        .eq("alert_date", target_date)
+        .eq("alert_channel", channel)
+        .limit(1)
+        .execute()
+        .data
+    )
+    return bool(rows)
+
+
+def last_report_at(target_date: str, channels: List[str]) -> Optional[str]:
+    """created_at of the latest full or delta report for target_date on any of `channels`."""
+    labels = [c for name in channels for c in (name, f"{name}:delta")]
+    rows = (
+        supabase.table("alerts_log")
+        .select("created_at")
+        .eq("alert_date", target_date)
+        .in_("alert_channel", labels)
+        .order("created_at", desc=True)
+        .limit(1)
+        .execute()
+        .data
+    )
+    return rows[0]["created_at"] if rows else None
+
+
+def log_report(target_date: str, channel: str, created_at: Optional[str] = None, message: Optional[str] = None) -> None:
+    """
+    Record a delivery result (one row per date and channel label). For reports,
+    created_at is when the report was built, which is where the next delta starts.
+    """
+    supabase.table("alerts_log").upsert({
+        "alert_date": target_date,
+        "alert_channel": channel,
+        "message": message,
+        "created_at": created_at or utc_now_naive(),
+    }, on_conflict="alert_date,alert_channel").execute()
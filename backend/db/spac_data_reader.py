@@ -0,0 +1,37 @@
+# backend/db/spac_data_reader.py
+import pandas as pd
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from backend.db.supabase_client import supabase, fetch_all
+
+IN_CHUNK = 300  # tickers per IN (...) filter, keeps request URLs short
+COLUMNS = ["ticker", "trade_date", "open", "high", "low", "close", "volume"]
+
+
+def load_window(tickers: List[str], days: int) -> pd.DataFrame:
+    """Last `days` calendar days of spac_data for many tickers (one paged query per IN_CHUNK tickers)."""
+    cutoff = (date.today() - timedelta(days=days)).isoformat()
+    rows: List[Dict] = []
+    for i in range(0, len(tickers), IN_CHUNK):
+        chunk = tickers[i:i + IN_CHUNK]
+        rows += fetch_all(lambda: (
+            supabase.table("spac_data")
+            .select(", ".join(COLUMNS))
+            .in_("ticker", chunk)
+            .gte("trade_date", cutoff)
+            .order("ticker")
+            .order("trade_date")
+        ))
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def load_spac_list(columns: str, tickers: Optional[List[str]] = None) -> List[Dict]:
+    """spac_list rows for `tickers` (IN_CHUNK tickers per request), or the whole list if None."""
+    if tickers is None:
+        return fetch_all(lambda: supabase.table("spac_list").select(columns).order("ticker"))
+
+    rows: List[Dict] = []
+    for i in range(0, len(tickers), IN_CHUNK):
+        chunk = tickers[i:i + IN_CHUNK]
+        rows += fetch_all(lambda: supabase.table("spac_list").select(columns).in_("ticker", chunk).order("ticker"))
+    return rows
@@ -40,4 +40,51 @@ create table alerts_log (
     alert_channel text, -- "discord", "email"
     message text,
     created_at timestamp default now()
-);
\ No newline at end of file
+);
+
+-- Natural key for daily candles: one row per (ticker, trade_date).
+-- Drop duplicates left by earlier runs first (keep the newest row).
+DELETE FROM spac_data a
+USING spac_data b
+WHERE a.ticker = b.ticker
+  AND a.trade_date = b.trade_date
+  AND a.id < b.id;
+
+ALTER TABLE spac_data
+    ADD CONSTRAINT spac_data_ticker_trade_date_key UNIQUE (ticker, trade_date);
+
+-- Track when country / exchange / ipo_date were last refreshed from Yahoo
+ALTER TABLE spac_list
+    ADD COLUMN metadata_updated_at timestamptz;
+
+-- Latest stored candle per ticker, used by the incremental sync (one aggregate query)
+CREATE OR REPLACE FUNCTION spac_data_last_trade_dates()
+RETURNS TABLE (ticker text, last_trade_date date)
+LANGUAGE sql STABLE
+AS $$
+    SELECT ticker, max(trade_date) AS last_trade_date
+    FROM spac_data
+    GROUP BY ticker
+    ORDER BY ticker;
+$$;
+
+-- Rolling average daily volume per ticker, refreshed by the data agent after each sync
+-- (replaces Yahoo's averageDailyVolume10Day / averageDailyVolume3Month in the analyzer)
+create table spac_volume_baselines (
+    ticker text primary key references spac_list(ticker),
+    as_of date not null,          -- latest candle included in the averages
+    avg_volume_10d numeric,       -- last 10 sessions
+    avg_volume_3m numeric,        -- last 63 sessions
+    updated_at timestamptz default now()
+);
+
+-- One delivery log row per (date, channel) so the reporter sends each daily
+-- report once, even when a workflow run is resumed or repeated.
+DELETE FROM alerts_log a
+USING alerts_log b
+WHERE a.alert_date = b.alert_date
+  AND a.alert_channel IS NOT DISTINCT FROM b.alert_channel
+  AND a.id < b.id;
+
+ALTER TABLE alerts_log
+    ADD CONSTRAINT alerts_log_date_channel_key UNIQUE (alert_date, alert_channel);
@@ -0,0 +1,55 @@
+# backend/db/spac_data_writer.py
+import math
+from typing import Dict, List, Tuple
+from backend.db.supabase_client import supabase
+from backend.config import SPAC_DATA_BATCH_SIZE
+from backend.lib import metrics
+
+
+class SpacDataWriter:
+    """
+    Collect spac_data rows for a whole run and write them with a few batched
+    upserts keyed on (ticker, trade_date) instead of one request per candle.
+    If a `mirror` store is given (see lib/ohlcv_store), every batch that reaches
+    Supabase is appended to it too.
+    """
+
+    def __init__(self, batch_size: int = SPAC_DATA_BATCH_SIZE, mirror=None):
+        self.batch_size = max(1, batch_size)
+        self.mirror = mirror
+        self._rows: Dict[Tuple[str, str], Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, row: Dict) -> None:
+        """Buffer one candle. A later row for the same (ticker, trade_date) wins."""
+        # Postgres rejects an upsert that touches the same key twice in one statement
+        self._rows[(row["ticker"], row["trade_date"])] = row
+
+    def flush(self) -> int:
+        """Upsert all buffered rows in batches. Returns the number of rows written."""
+        rows: List[Dict] = list(self._rows.values())
+        self._rows.clear()
+
+        written = 0
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i:i + self.batch_size]
+            try:
+                supabase.table("spac_data").upsert(batch, on_conflict="ticker,trade_date").execute()
+                written += len(batch)
+                metrics.count("rows_written", len(batch))
+            except Exception as e:
+                print(f"❌ Failed spac_data batch upsert ({len(batch)} rows): {e}")
+                continue
+
+            if self.mirror is not None:
+                by_ticker: Dict[str, List[Dict]] = {}
+                for row in batch:
+                    by_ticker.setdefault(row["ticker"], []).append(row)
+                for ticker, ticker_rows in by_ticker.items():
+                    self.mirror.append(ticker, ticker_rows)
+
+        if rows:
+            print(f"💾 Upserted {written}/{len(rows)} spac_data rows in {math.ceil(len(rows) / self.batch_size)} batches")
+        return written
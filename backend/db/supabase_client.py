@@ -1,6 +1,7 @@
 from supabase import create_client
 import os
 from dotenv import load_dotenv
+from backend.lib.metrics import instrument_supabase
 
 load_dotenv()
 
@@ -8,3 +9,19 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+instrument_supabase(supabase)  # per-node request / row counts (lib/metrics)
+
+
+def fetch_all(build_query, page_size: int = 1000) -> list:
+    """
+    Page through a query that can return more rows than PostgREST's max-rows cap.
+    `build_query` must return a fresh (ordered) query builder on every call.
+    """
+    rows = []
+    start = 0
+    while True:
+        page = build_query().range(start, start + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
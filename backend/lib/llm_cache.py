@@ -0,0 +1,141 @@
+# backend/lib/llm_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from backend.config import LLM_CACHE_DB, LLM_CACHE_MAX_BYTES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,               -- sha256 of model + messages + params
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL,              -- bytes of the response, for eviction
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_used_idx ON llm_cache (last_used_at);
+"""
+
+
+def cache_key(model: str, messages: List[Dict], params: Optional[Dict] = None) -> str:
+    """Content address of a request: identical model, prompt and data → identical key."""
+    body = json.dumps({"model": model, "messages": messages, "params": params or {}},
+                      sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Exact-match cache of LLM responses in SQLite, shared by every process on
+    the machine. Entries expire after their TTL; when the responses outgrow
+    LLM_CACHE_MAX_BYTES the least recently used are evicted.
+    Hit / miss counts, tokens and latencies are kept per process for stats().
+    """
+
+    def __init__(self, path: str = LLM_CACHE_DB, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.tokens_spent = 0
+        self._hit_ms: deque = deque(maxlen=1000)
+        self._miss_ms: deque = deque(maxlen=1000)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached {response, prompt_tokens, completion_tokens}, or None if missing / expired."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, prompt_tokens, completion_tokens FROM llm_cache WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (now, key))
+        return dict(row)
+
+    def put(self, key: str, model: str, response: str, ttl: float,
+            prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, model, response, prompt_tokens, completion_tokens, size, created_at, expires_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, response, prompt_tokens, completion_tokens, size, now, now + ttl, now),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(conn, total - int(self.max_bytes * 0.9))
+
+    @staticmethod
+    def _evict(conn: sqlite3.Connection, excess: int) -> None:
+        """Drop least recently used rows until `excess` bytes are freed."""
+        freed = 0
+        victims = []
+        for row in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used_at"):
+            if freed >= excess:
+                break
+            victims.append((row["key"],))
+            freed += row["size"]
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+
+    def record(self, hit: bool, elapsed: float, tokens: int) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.tokens_saved += tokens
+                self._hit_ms.append(elapsed * 1000)
+            else:
+                self.misses += 1
+                self.tokens_spent += tokens
+                self._miss_ms.append(elapsed * 1000)
+
+    def stats(self) -> Dict:
+        with self._lock, self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "tokens_saved": self.tokens_saved,
+                "tokens_spent": self.tokens_spent,
+                "p50_hit_ms": round(statistics.median(self._hit_ms), 2) if self._hit_ms else None,
+                "p50_miss_ms": round(statistics.median(self._miss_ms), 2) if self._miss_ms else None,
+            }
+
+
+_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Shared cache (created on first use so importing this module touches no files)."""
+    global _cache
+    if _cache is None:
+        _cache = LLMCache()
+    return _cache
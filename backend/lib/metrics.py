@@ -0,0 +1,225 @@
+# backend/lib/metrics.py
+import argparse
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from backend.config import WORKFLOW_RUN_LOG
+
+# Counters every node reports (missing ones are 0)
+COUNTERS = ("yahoo_calls", "supabase_calls", "llm_calls", "rows_read", "rows_written", "tickers")
+
+# Metrics of the node currently running in this context (None outside instrumented nodes)
+_current: contextvars.ContextVar[Optional["NodeMetrics"]] = contextvars.ContextVar("node_metrics", default=None)
+
+
+class NodeMetrics:
+    """Wall time + counters for one node execution. Safe to update from worker threads."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.counters: Dict[str, int] = {c: 0 for c in COUNTERS}
+        self._lock = threading.Lock()
+
+    def add(self, counter: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def to_dict(self) -> Dict:
+        return {"seconds": round(self.seconds, 3), **self.counters}
+
+
+class RunMetrics:
+    """All node metrics of one workflow run, appended to the JSONL run log on finish."""
+
+    def __init__(self, label: str = "daily"):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.started_at = datetime.now(timezone.utc)
+        self.nodes: Dict[str, NodeMetrics] = {}
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, node: NodeMetrics) -> None:
+        with self._lock:
+            self.nodes[node.name] = node
+
+    def to_dict(self) -> Dict:
+        totals = {c: sum(n.counters.get(c, 0) for n in self.nodes.values()) for c in COUNTERS}
+        return {
+            "run_id": self.run_id,
+            "label": self.label,
+            "started_at": self.started_at.isoformat(),
+            "seconds": round(time.perf_counter() - self._t0, 3),
+            "totals": totals,
+            "nodes": {name: n.to_dict() for name, n in self.nodes.items()},
+        }
+
+
+# One workflow run per process; nodes may execute on LangGraph's worker threads
+_run: Optional[RunMetrics] = None
+
+
+# --- Recording ---
+def count(counter: str, n: int = 1) -> None:
+    """Add to a counter of the node running in this context (no-op outside nodes)."""
+    node = _current.get()
+    if node is not None:
+        node.add(counter, n)
+
+
+def bind_context(fn: Callable) -> Callable:
+    """
+    Wrap fn so it runs with the caller's context vars, e.g. for pool.map().
+    Thread pools don't copy contextvars on their own, so counts from worker
+    threads would otherwise be lost.
+    """
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def instrument(name: str, fn: Callable) -> Callable:
+    """Wrap a LangGraph node: time it, collect its counters and add them to the current run."""
+
+    @functools.wraps(fn)
+    def node(state, *args, **kwargs):
+        metrics = NodeMetrics(name)
+        token = _current.set(metrics)
+        t0 = time.perf_counter()
+        try:
+            result = fn(state, *args, **kwargs)
+        finally:
+            metrics.seconds = time.perf_counter() - t0
+            _current.reset(token)
+            if _run is not None:
+                _run.record(metrics)
+
+        if not metrics.counters["tickers"]:
+            tickers = (result or {}).get("tickers") or (state or {}).get("tickers") or []
+            metrics.counters["tickers"] = len(tickers)
+        print(f"⏱️ {name}: {metrics.seconds:.2f}s {metrics.counters}")
+        return result
+
+    return node
+
+
+def merge_nodes(nodes: Dict[str, Dict]) -> None:
+    """
+    Fold node metrics reported by another process (e.g. a shard) into the current
+    run: counters add up, seconds keep the slowest shard (wall time).
+    """
+    if _run is None:
+        return
+    for name, data in nodes.items():
+        with _run._lock:
+            node = _run.nodes.setdefault(name, NodeMetrics(name))
+        node.seconds = max(node.seconds, data.get("seconds", 0.0))
+        for counter in COUNTERS:
+            node.add(counter, data.get(counter, 0))
+
+
+def start_run(label: str = "daily") -> RunMetrics:
+    global _run
+    _run = RunMetrics(label)
+    return _run
+
+
+def finish_run(path: str = WORKFLOW_RUN_LOG) -> Optional[Dict]:
+    """Append the current run to the JSONL run log and return it."""
+    global _run
+    if _run is None:
+        return None
+    entry = _run.to_dict()
+    _run = None
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+    print(f"📈 Run {entry['run_id']} metrics saved to {path} ({entry['seconds']:.2f}s total)")
+    return entry
+
+
+# --- Supabase hook ---
+def _count_supabase_response(response) -> None:
+    count("supabase_calls")
+    if response.request.method == "GET":
+        # PostgREST reports the returned row range, e.g. "0-999/*"
+        span = response.headers.get("content-range", "").split("/")[0]
+        if "-" in span:
+            lo, hi = span.split("-", 1)
+            count("rows_read", int(hi) - int(lo) + 1)
+
+
+def instrument_supabase(client) -> None:
+    """Count every PostgREST request (and rows returned) made through `client`."""
+    hooks = client.postgrest.session.event_hooks.setdefault("response", [])
+    if _count_supabase_response not in hooks:
+        hooks.append(_count_supabase_response)
+
+
+# --- Run log / CLI ---
+def load_runs(path: str = WORKFLOW_RUN_LOG, last: int = 10) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    return runs[-last:]
+
+
+def compare_runs(runs: List[Dict], threshold: float = 0.2) -> str:
+    """Table of the given runs (oldest first) plus regressions of the newest run vs the mean of the others."""
+    if not runs:
+        return "No runs recorded yet."
+
+    nodes = list(dict.fromkeys(name for r in runs for name in r["nodes"]))
+    header = ["run", "started", "total"] + nodes + ["yahoo", "supabase", "llm", "read", "written"]
+    lines = [" | ".join(header)]
+    for r in runs:
+        t = r["totals"]
+        cells = [r["run_id"], r["started_at"][:16], f"{r['seconds']:.1f}s"]
+        cells += [f"{r['nodes'][n]['seconds']:.1f}s" if n in r["nodes"] else "-" for n in nodes]
+        cells += [str(t.get(c, 0)) for c in ("yahoo_calls", "supabase_calls", "llm_calls", "rows_read", "rows_written")]
+        lines.append(" | ".join(cells))
+
+    if len(runs) > 1:
+        latest, previous = runs[-1], runs[:-1]
+        checks = [("total", latest["seconds"], [r["seconds"] for r in previous])]
+        checks += [
+            (n, latest["nodes"][n]["seconds"], [r["nodes"][n]["seconds"] for r in previous if n in r["nodes"]])
+            for n in nodes if n in latest["nodes"]
+        ]
+        checks += [
+            (c, latest["totals"].get(c, 0), [r["totals"].get(c, 0) for r in previous])
+            for c in ("yahoo_calls", "supabase_calls", "llm_calls")
+        ]
+        regressions = []
+        for name, value, history in checks:
+            if not history:
+                continue
+            baseline = sum(history) / len(history)
+            if baseline > 0 and value > baseline * (1 + threshold):
+                regressions.append(f"⚠️ {name}: {value:g} vs avg {baseline:.2f} (+{(value / baseline - 1) * 100:.0f}%)")
+        lines.append("")
+        lines.extend(regressions or ["✅ No regressions in the latest run"])
+
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare recent workflow runs")
+    parser.add_argument("--last", type=int, default=5, help="number of runs to compare")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown flagged as regression")
+    parser.add_argument("--log", default=WORKFLOW_RUN_LOG)
+    args = parser.parse_args()
+    print(compare_runs(load_runs(args.log, args.last), args.threshold))
@@ -0,0 +1,311 @@
+# backend/lib/ohlcv_store.py
+import json
+import math
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+import numpy as np
+import yfinance as yf
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+try:
+    import fcntl  # inter-process file locks (Linux / macOS)
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+from backend.config import OHLCV_STORE_DIR
+from backend.db.supabase_client import supabase, fetch_all
+from backend.lib import metrics
+
+# Column layout of every stored array; dates are kept as days since 1970-01-01
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+COL = {name: i for i, name in enumerate(COLUMNS)}
+
+# fetcher(ticker, start, end_exclusive_or_None) -> [{"trade_date", "open", ..., "volume"}, ...]
+Fetcher = Callable[[str, date, Optional[date]], List[Dict]]
+
+
+def _to_days(d) -> int:
+    if isinstance(d, str):
+        d = date.fromisoformat(d)
+    return int(np.datetime64(d, "D").astype("int64"))
+
+
+def _from_days(days) -> date:
+    return np.datetime64(int(days), "D").astype(date)
+
+
+def to_records(arr: np.ndarray) -> List[Dict]:
+    """Convert a stored (n, 6) slice into JSON-friendly OHLCV dicts."""
+    return [
+        {
+            "date": _from_days(row[COL["date"]]).isoformat(),
+            "open": float(row[COL["open"]]),
+            "high": float(row[COL["high"]]),
+            "low": float(row[COL["low"]]),
+            "close": float(row[COL["close"]]),
+            "volume": int(row[COL["volume"]]),
+        }
+        for row in arr
+    ]
+
+
+def live_to_records(rows: List[Dict]) -> List[Dict]:
+    """Convert fetched (not yet stored) rows into the same shape as to_records()."""
+    return [
+        {
+            "date": r["trade_date"],
+            "open": float(r["open"]),
+            "high": float(r["high"]),
+            "low": float(r["low"]),
+            "close": float(r["close"]),
+            "volume": int(r["volume"]),
+        }
+        for r in rows
+    ]
+
+
+class OHLCVStore:
+    """
+    Local columnar mirror of spac_data: one float64 (n, 6) array per ticker,
+    sorted by date and saved in Fortran (column-major) order, so every column
+    is contiguous on disk. Reads are memory-mapped and range reads return
+    views (no copy). Appends rewrite the file atomically.
+
+    Several processes share the store (the MCP server pool, the APIs, the
+    workflow), so every read-merge-replace holds a per-ticker file lock and
+    writes its own temp file.
+    """
+
+    def __init__(self, root: str = OHLCV_STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str, ext: str = "npy") -> str:
+        return os.path.join(self.root, f"{ticker.upper()}.{ext}")
+
+    def _tmp_path(self, ticker: str, ext: str) -> str:
+        return self._path(ticker, f"{os.getpid()}.{uuid.uuid4().hex}.tmp.{ext}")
+
+    @contextmanager
+    def _locked(self, ticker: str):
+        """Exclusive per-ticker lock across threads and processes."""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, open(self._path(ticker, "lock"), "a") as handle:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def load(self, ticker: str) -> np.ndarray:
+        """Whole history for a ticker as a read-only memory map (empty if unknown)."""
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return np.empty((0, len(COLUMNS)), dtype="float64", order="F")
+        return np.load(path, mmap_mode="r")
+
+    def read(self, ticker: str, start: Optional[date] = None, end: Optional[date] = None) -> np.ndarray:
+        """Rows with start <= date <= end, as a zero-copy slice of the memory map."""
+        arr = self.load(ticker)
+        dates = arr[:, COL["date"]]
+        lo = int(np.searchsorted(dates, _to_days(start), side="left")) if start else 0
+        hi = int(np.searchsorted(dates, _to_days(end), side="right")) if end else len(arr)
+        return arr[lo:hi]
+
+    def last_date(self, ticker: str) -> Optional[date]:
+        arr = self.load(ticker)
+        return _from_days(arr[-1, COL["date"]]) if len(arr) else None
+
+    # --- Metadata (TICKER.json) ---
+    def _meta(self, ticker: str) -> Dict:
+        path = self._path(ticker, "json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _update_meta(self, ticker: str, update: Optional[Callable[[Dict], Dict]] = None, **changes) -> None:
+        """Read-modify-write of the metadata under the ticker lock; `update` maps old → new."""
+        with self._locked(ticker):
+            meta = self._meta(ticker)
+            meta = {**(update(meta) if update else meta), **changes}
+            tmp = self._tmp_path(ticker, "json")
+            with open(tmp, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp, self._path(ticker, "json"))
+
+    def covered_from(self, ticker: str) -> Optional[date]:
+        """Earliest date from which the stored history is known to be complete."""
+        value = self._meta(ticker).get("covered_from")
+        return date.fromisoformat(value) if value else None
+
+    def set_covered_from(self, ticker: str, start: date) -> None:
+        self._update_meta(ticker, covered_from=start.isoformat())
+
+    def closed_days(self, ticker: str) -> List[str]:
+        """Weekdays inside the history the source had no candle for (market holidays)."""
+        return self._meta(ticker).get("closed_days", [])
+
+    def add_closed_days(self, ticker: str, days: List[date]) -> None:
+        if days:
+            new = {d.isoformat() for d in days}
+            # merged under the lock, so concurrent writers don't drop each other's days
+            self._update_meta(ticker, lambda meta: {**meta, "closed_days": sorted(set(meta.get("closed_days", [])) | new)})
+
+    def missing_sessions(self, ticker: str, start: date) -> List[date]:
+        """
+        Weekdays (minus known closed days) between stored candles since `start`
+        that have no candle: interior holes, e.g. left by the data agent's
+        latest-candle-only mirror.
+        """
+        arr = self.read(ticker, start)
+        if len(arr) < 2:
+            return []
+        dates = arr[:, COL["date"]].astype("int64").astype("datetime64[D]")
+        holidays = np.array(self.closed_days(ticker), dtype="datetime64[D]")
+        one_day = np.timedelta64(1, "D")
+        gaps = np.nonzero(np.busday_count(dates[:-1] + one_day, dates[1:], holidays=holidays) > 0)[0]
+        missing: List[date] = []
+        for i in gaps:
+            days = np.arange(dates[i] + one_day, dates[i + 1], dtype="datetime64[D]")
+            missing += [d.astype(date) for d in days[np.is_busday(days, holidays=holidays)]]
+        return missing
+
+    def append(self, ticker: str, rows: List[Dict]) -> int:
+        """
+        Merge spac_data-style rows into the ticker's history (a newer row for an
+        existing date replaces it). Returns the number of rows supplied.
+        """
+        if not rows:
+            return 0
+
+        new = np.array(
+            [
+                [_to_days(r["trade_date"]), r["open"], r["high"], r["low"], r["close"], r["volume"]]
+                for r in rows
+            ],
+            dtype="float64",
+        )
+
+        with self._locked(ticker):
+            old = np.asarray(self.load(ticker))
+            if len(old) and new[:, 0].min() > old[-1, 0]:
+                # Common case: strictly newer candles → plain append
+                merged = np.concatenate([old, new[np.argsort(new[:, 0], kind="stable")]])
+            else:
+                both = np.concatenate([new, old]) if len(old) else new
+                # np.unique keeps the first occurrence per date → rows from `new` win
+                _, idx = np.unique(both[:, 0], return_index=True)
+                merged = both[idx]
+
+            tmp = self._tmp_path(ticker, "npy")
+            np.save(tmp, np.asfortranarray(merged))
+            os.replace(tmp, self._path(ticker))
+
+        return len(rows)
+
+    def read_through(
+        self,
+        ticker: str,
+        start: date,
+        fetcher: Fetcher,
+        include_today: bool = False,
+    ) -> Tuple[np.ndarray, List[Dict]]:
+        """
+        Serve daily history since `start` from the local store, fetching only what
+        is missing: the head (if the store never covered `start`), holes between
+        stored candles, and the tail of finalized candles since the last stored day.
+
+        Returns (stored slice, live rows). Live rows hold today's still-forming
+        candle when include_today=True; it is returned but never stored.
+        """
+        ticker = ticker.upper()
+        today = date.today()
+        live: List[Dict] = []
+        fetched_to_now = False
+
+        covered = self.covered_from(ticker)
+        if covered is None or start < covered:
+            end = covered if covered and self.last_date(ticker) else None
+            rows = fetcher(ticker, start, end)
+            self.append(ticker, [r for r in rows if date.fromisoformat(r["trade_date"]) < today])
+            live = [r for r in rows if date.fromisoformat(r["trade_date"]) >= today]
+            self.set_covered_from(ticker, start)
+            fetched_to_now = end is None
+
+        missing = self.missing_sessions(ticker, start)
+        if missing:
+            # One fetch spanning every hole; days still without a candle were closed
+            rows = fetcher(ticker, missing[0], missing[-1] + timedelta(days=1))
+            self.append(ticker, rows)
+            got = {r["trade_date"] for r in rows}
+            self.add_closed_days(ticker, [d for d in missing if d.isoformat() not in got])
+
+        if not fetched_to_now:
+            last = self.last_date(ticker)
+            tail_from = last + timedelta(days=1) if last else start
+            missing_days = tail_from < today and np.busday_count(tail_from, today) > 0
+            if missing_days or (include_today and np.is_busday(today)):
+                rows = fetcher(ticker, tail_from, None)
+                self.append(ticker, [r for r in rows if date.fromisoformat(r["trade_date"]) < today])
+                live = [r for r in rows if date.fromisoformat(r["trade_date"]) >= today]
+
+        return self.read(ticker, start), (live if include_today else [])
+
+
+# --- Fetchers ---
+def fetch_from_yahoo(ticker: str, start: date, end: Optional[date] = None) -> List[Dict]:
+    """Daily candles from Yahoo for [start, end)."""
+    metrics.count("yahoo_calls")
+    hist = yf.Ticker(ticker).history(
+        start=start.isoformat(),
+        end=end.isoformat() if end else None,
+        interval="1d",
+    )
+    return history_to_rows(hist)
+
+
+def history_to_rows(hist) -> List[Dict]:
+    """
+    Yahoo history frame → [{trade_date, open, high, low, close, volume}, ...].
+    Rows without prices are dropped (no candle that day); a missing volume is 0.
+    """
+    rows = []
+    for idx, row in hist.iterrows():
+        prices = [float(row[c]) for c in ("Open", "High", "Low", "Close")]
+        if any(math.isnan(p) for p in prices):
+            continue
+        volume = float(row["Volume"])
+        rows.append({
+            "trade_date": idx.date().isoformat(),
+            "open": prices[0],
+            "high": prices[1],
+            "low": prices[2],
+            "close": prices[3],
+            "volume": 0 if math.isnan(volume) else int(volume),
+        })
+    return rows
+
+
+def fetch_from_spac_data(ticker: str, start: date, end: Optional[date] = None) -> List[Dict]:
+    """Daily candles from the Supabase spac_data table for [start, end)."""
+    def build_query():
+        query = (
+            supabase.table("spac_data")
+            .select("trade_date, open, high, low, close, volume")
+            .eq("ticker", ticker)
+            .gte("trade_date", start.isoformat())
+        )
+        if end:
+            query = query.lt("trade_date", end.isoformat())
+        return query.order("trade_date")
+
+    fields = ("open", "high", "low", "close", "volume")
+    return [r for r in fetch_all(build_query) if all(r.get(f) is not None for f in fields)]
+
+
+# Shared singleton store
+store = OHLCVStore()
@@ -1,10 +1,50 @@
 # backend/lib/openai_client.py
+import asyncio
 import os
+import time
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, DefaultHttpxClient
+from backend.config import LLM_CACHE_TTL
+from backend.lib import metrics
+from backend.lib.llm_cache import cache_key, get_llm_cache
 
 # Load environment variables
 load_dotenv()
 
 # Initialize once
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = OpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    http_client=DefaultHttpxClient(event_hooks={"request": [lambda request: metrics.count("llm_calls")]}),
+)
+
+
+def chat(messages: List[Dict], model: str = "gpt-4o-mini", ttl: Optional[float] = LLM_CACHE_TTL, **params) -> str:
+    """
+    Chat completion through the shared LLM cache: an identical request (model,
+    messages, params) within `ttl` seconds is answered from the cache.
+    ttl=None (or 0) bypasses the cache.
+    """
+    started = time.perf_counter()
+    cache = get_llm_cache() if ttl else None
+    key = cache_key(model, messages, params)
+    if cache:
+        hit = cache.get(key)
+        if hit:
+            cache.record(True, time.perf_counter() - started, hit["prompt_tokens"] + hit["completion_tokens"])
+            return hit["response"]
+
+    response = client.chat.completions.create(model=model, messages=messages, **params)
+    text = (response.choices[0].message.content or "").strip()
+    usage = response.usage
+    prompt_tokens = usage.prompt_tokens if usage else 0
+    completion_tokens = usage.completion_tokens if usage else 0
+    if cache:
+        cache.put(key, model, text, ttl, prompt_tokens, completion_tokens)
+        cache.record(False, time.perf_counter() - started, prompt_tokens + completion_tokens)
+    return text
+
+
+async def achat(messages: List[Dict], model: str = "gpt-4o-mini", ttl: Optional[float] = LLM_CACHE_TTL, **params) -> str:
+    """chat() off the event loop."""
+    return await asyncio.to_thread(chat, messages, model, ttl, **params)
@@ -0,0 +1,28 @@
+# backend/lib/rate_limit.py
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe rate limiter shared by a pool of workers.
+    Each wait() reserves the next free slot, so at most `rate` calls per second
+    go out no matter how many threads are calling.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+
+        with self._lock:
+            slot = max(time.monotonic(), self._next_slot)
+            self._next_slot = slot + self.interval
+
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,147 @@
+# backend/lib/report_cache.py
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from backend.config import REPORT_CACHE_DIR, REPORT_CACHE_SIZE
+
+
+def content_hash(anomalies: List[Dict]) -> str:
+    """Order-independent hash of a day's anomalies."""
+    keys = sorted(
+        (a["ticker"], a["trade_date"], a["anomaly_type"], a["description"]) for a in anomalies
+    )
+    return hashlib.sha1(json.dumps(keys, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def built_after_close(day: str, built_at: str) -> bool:
+    """
+    True if an entry built at `built_at` (naive UTC ISO) can no longer miss rows
+    of `day`: built a full day after the date ended, which absorbs time-zone
+    differences between the workflow runner and this process.
+    """
+    try:
+        closed = date.fromisoformat(day) + timedelta(days=2)
+        return datetime.fromisoformat(built_at).date() >= closed
+    except ValueError:
+        return False
+
+
+class ReportCache:
+    """
+    Rendered report models per date, in an in-memory LRU backed by one JSON
+    file per date under REPORT_CACHE_DIR.
+
+    Every entry records the fingerprint of the date's anomaly_reports rows it
+    was built from (row count, max id). get() serves it only while the caller's
+    current fingerprint still matches, so rows written anywhere (the workflow
+    runs on another machine) make it a miss. Only entries built after the date
+    closed are served without a fingerprint query.
+    """
+
+    def __init__(self, root: str = REPORT_CACHE_DIR, max_entries: int = REPORT_CACHE_SIZE):
+        self.root = root
+        self.max_entries = max(1, max_entries)
+        self._mem: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()  # date → (entry, file mtime)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, day: str) -> str:
+        return os.path.join(self.root, f"{day}.json")
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def _remember(self, day: str, entry: Dict, mtime: Optional[float]) -> None:
+        with self._lock:
+            self._mem[day] = (entry, mtime or 0.0)
+            self._mem.move_to_end(day)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+
+    def _entry(self, day: str) -> Optional[Dict]:
+        """The stored entry for a date: memory if it matches the file, else the file."""
+        path = self._path(day)
+        mtime = self._mtime(path)
+        with self._lock:
+            found = self._mem.get(day)
+            if found and found[1] == (mtime or 0.0):
+                self._mem.move_to_end(day)
+                return found[0]
+        if mtime is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entry = {
+                "hash": data["hash"],
+                "model": data["model"],
+                "fingerprint": tuple(data["fingerprint"]),
+                "built_at": data["built_at"],
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return None  # unreadable or written by an older version: rebuild
+        self._remember(day, entry, mtime)
+        return entry
+
+    def get(self, day: str, fingerprint: Callable[[], Tuple]) -> Optional[Tuple[str, Dict]]:
+        """
+        (hash, model) for a date, or None on a miss. `fingerprint()` returns the
+        current fingerprint of the date's rows; it is only called when the entry
+        could still be out of date.
+        """
+        entry = self._entry(day)
+        fresh = entry is not None and (
+            built_after_close(day, entry["built_at"]) or entry["fingerprint"] == tuple(fingerprint())
+        )
+        with self._lock:
+            if fresh:
+                self.hits += 1
+                return entry["hash"], entry["model"]
+            self.misses += 1
+        return None
+
+    def put(self, day: str, digest: str, model: Dict, fingerprint: Tuple, built_at: Optional[str] = None) -> None:
+        """
+        Store a model in memory and on disk (atomic replace). `fingerprint` must
+        be taken *before* the rows were read, so rows added meanwhile make the
+        entry a miss instead of hiding in it.
+        """
+        entry = {
+            "hash": digest,
+            "model": model,
+            "fingerprint": tuple(fingerprint),
+            "built_at": built_at or datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+        }
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(day)
+        tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"date": day, **entry, "fingerprint": list(entry["fingerprint"])}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._remember(day, entry, self._mtime(path))
+
+    def invalidate(self, day: str) -> None:
+        with self._lock:
+            self._mem.pop(day, None)
+        try:
+            os.remove(self._path(day))
+        except OSError:
+            pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._mem), "hits": self.hits, "misses": self.misses}
+
+
+# Shared singleton cache
+report_cache = ReportCache()
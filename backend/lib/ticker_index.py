@@ -0,0 +1,230 @@
+# backend/lib/ticker_index.py
+import difflib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import requests
+from backend.config import TICKER_INDEX_REFRESH_SECONDS, SEC_TICKERS_CACHE
+from backend.mcp_server.tools.sec_utils import SEC_HEADERS, TICKER_CIK_URL
+
+# Words that are also tickers but almost never mean one in a question
+STOPWORDS = {
+    "A", "ABOUT", "AI", "ALL", "AM", "AN", "AND", "ANY", "ARE", "AS", "AT", "BE", "BEST", "BIG", "BUY", "BY", "CAN",
+    "CHART", "CLOSE", "DATA", "DAY", "DAYS", "DID", "DO", "DOES", "FOR", "FROM", "FUN", "GAIN", "GET", "GIVE", "GO",
+    "GOOD", "HAS", "HAVE", "HE", "HIGH", "HOLD", "HOW", "I", "IF", "IN", "INFO", "IS", "IT", "ITS", "JUST", "K", "KEY",
+    "LAST", "LIKE", "LIST", "LOW", "ME", "MORE", "MOST", "MY", "NEW", "NEWS", "NEXT", "NOW", "OF", "ON", "ONE", "OPEN",
+    "OR", "OUT", "PLAY", "PRICE", "REAL", "RISK", "SEE", "SELL", "SHOW", "SO", "SPIKE", "STOCK", "TELL", "THAT", "THE",
+    "THIS", "TO", "TODAY", "TWO", "UP", "US", "VERY", "VOLUME", "VS", "WAS", "WEEK", "WELL", "WHAT", "WHEN", "WHO",
+    "WHY", "WILL", "WITH", "YOU",
+}
+
+# Legal / SPAC suffixes dropped from company names ("SoFi Technologies, Inc." → "sofi technologies")
+NAME_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited", "plc", "llc", "lp", "sa",
+    "nv", "ag", "se", "holdings", "holding", "group", "the", "class", "a", "ordinary", "shares", "common", "stock",
+}
+
+MAX_NAME_WORDS = 5
+
+
+def normalize_name(name: str) -> str:
+    """Lower-case, punctuation-free company name without legal suffixes."""
+    words = re.findall(r"[a-z0-9&]+", name.lower().replace("'", ""))
+    while words and words[-1] in NAME_SUFFIXES:
+        words.pop()
+    while words and words[0] == "the":
+        words.pop(0)
+    return " ".join(words)
+
+
+class TrieNode:
+    __slots__ = ("children", "tickers")
+
+    def __init__(self):
+        self.children: Dict[str, "TrieNode"] = {}
+        self.tickers: List[str] = []  # tickers whose key ends here
+
+
+class TickerIndex:
+    """
+    In-memory ticker / company-name index for resolving tickers in free-text
+    questions without a network or LLM call.
+
+    - tickers: {ticker: company name}, exact lookups
+    - names:   {normalized company name: ticker}, matched against word n-grams
+    - trie:    prefixes of tickers and normalized names (search / autocomplete)
+    - fuzzy:   difflib over names with the same first letter, last resort
+
+    The whole index is rebuilt off to the side and swapped in one assignment,
+    so lookups never see a half-built index.
+    """
+
+    def __init__(self):
+        self._data: Tuple[Dict[str, str], Dict[str, str], TrieNode, Dict[str, List[str]]] = ({}, {}, TrieNode(), {})
+        self.built_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # --- Build ---
+    @staticmethod
+    def _insert(root: TrieNode, key: str, ticker: str) -> None:
+        node = root
+        for ch in key:
+            node = node.children.setdefault(ch, TrieNode())
+        if ticker not in node.tickers:
+            node.tickers.append(ticker)
+
+    def build(self, entries: List[Tuple[str, str]]) -> None:
+        """(ticker, company name) pairs; earlier entries win name collisions."""
+        tickers: Dict[str, str] = {}
+        names: Dict[str, str] = {}
+        root = TrieNode()
+        by_letter: Dict[str, List[str]] = {}
+        for ticker, company in entries:
+            ticker = (ticker or "").strip().upper()
+            if not ticker:
+                continue
+            tickers.setdefault(ticker, company or "")
+            self._insert(root, ticker.lower(), ticker)
+            name = normalize_name(company or "")
+            if name and name not in names:
+                names[name] = ticker
+                self._insert(root, name, ticker)
+                by_letter.setdefault(name[0], []).append(name)
+        self._data = (tickers, names, root, by_letter)
+        self.built_at = time.time()
+
+    @property
+    def size(self) -> int:
+        return len(self._data[0])
+
+    # --- Lookups ---
+    def company(self, ticker: str) -> Optional[str]:
+        return self._data[0].get(ticker.upper())
+
+    def search(self, prefix: str, limit: int = 10) -> List[str]:
+        """Tickers whose symbol or company name starts with `prefix` (shortest keys first)."""
+        node = self._data[2]
+        for ch in prefix.lower().strip():
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        found: List[str] = []
+        level = [node]
+        while level and len(found) < limit:
+            next_level = []
+            for n in level:
+                for ticker in n.tickers:
+                    if ticker not in found:
+                        found.append(ticker)
+                next_level.extend(n.children[ch] for ch in sorted(n.children))
+            level = next_level
+        return found[:limit]
+
+    def resolve(self, query: str) -> Optional[str]:
+        """
+        Best ticker mentioned in a question, or None. In order: $cashtags,
+        upper-case symbols as typed, company names (longest phrase first),
+        other words that are symbols (minus common words), fuzzy company names.
+        """
+        tickers, names, _, by_letter = self._data
+        if not tickers:
+            return None
+
+        for tag in re.findall(r"\$([A-Za-z][A-Za-z.\-]{0,6})", query):
+            if tag.upper() in tickers:
+                return tag.upper()
+
+        raw = re.findall(r"[A-Za-z][A-Za-z.\-]*", query)
+        for word in raw:
+            if word.isupper() and word in tickers and word not in STOPWORDS:
+                return word
+
+        words = re.findall(r"[a-z0-9&]+", query.lower().replace("'", ""))
+        grams = [
+            " ".join(words[i:i + n])
+            for n in range(min(MAX_NAME_WORDS, len(words)), 0, -1)
+            for i in range(len(words) - n + 1)
+        ]
+        for gram in grams:
+            if gram in names and gram.upper() not in STOPWORDS:
+                return names[gram]
+
+        for word in raw:
+            upper = word.upper()
+            if upper in tickers and upper not in STOPWORDS and len(upper) > 1:
+                return upper
+
+        for gram in grams:
+            if len(gram) < 4 or all(w.upper() in STOPWORDS for w in gram.split()):
+                continue
+            close = difflib.get_close_matches(gram, by_letter.get(gram[0], []), n=1, cutoff=0.88)
+            if close:
+                return names[close[0]]
+        return None
+
+    # --- Sources + background refresh ---
+    def refresh(self) -> None:
+        """Rebuild from spac_list (company_name) and the SEC ticker list."""
+        from backend.db.spac_data_reader import load_spac_list  # Supabase only when refreshing
+
+        entries: List[Tuple[str, str]] = []
+        try:
+            entries += [(r.get("ticker"), r.get("company_name")) for r in load_spac_list("ticker, company_name")]
+        except Exception as e:
+            print(f"⚠️ Ticker index: spac_list unavailable ({e})", flush=True)
+        entries += load_sec_tickers()
+        if entries:
+            self.build(entries)
+            print(f"🔎 Ticker index: {self.size} tickers", flush=True)
+
+    def start_background_refresh(self, interval: float = TICKER_INDEX_REFRESH_SECONDS) -> None:
+        """Build now in a daemon thread, then rebuild every `interval` seconds."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"⚠️ Ticker index refresh failed: {e}", flush=True)
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=loop, name="ticker-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def load_sec_tickers(path: str = SEC_TICKERS_CACHE, max_age: float = TICKER_INDEX_REFRESH_SECONDS) -> List[Tuple[str, str]]:
+    """SEC company_tickers.json as (ticker, title) pairs, cached on disk for `max_age` seconds."""
+    data = None
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    if data is None:
+        try:
+            resp = requests.get(TICKER_CIK_URL, headers=SEC_HEADERS, timeout=30)
+            resp.raise_for_status()
+            data = resp.json()
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        except Exception as e:
+            print(f"⚠️ Ticker index: SEC ticker list unavailable ({e})", flush=True)
+            if not os.path.exists(path):
+                return []
+            with open(path, "r", encoding="utf-8") as f:  # stale copy beats nothing
+                data = json.load(f)
+    return [(entry.get("ticker"), entry.get("title", "")) for entry in data.values()]
+
+
+# Shared singleton index
+ticker_index = TickerIndex()
@@ -0,0 +1,164 @@
+# backend/lib/tool_cache.py
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from backend.config import TOOL_CACHE_MAX_BYTES
+
+
+def canonical_key(tool_name: str, signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+    """
+    Same key for every spelling of the same call: positional vs keyword,
+    defaults filled in, keys sorted, ticker symbols upper-cased.
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    params = {}
+    for name, value in bound.arguments.items():
+        if isinstance(value, str):
+            value = value.strip()
+            if name == "ticker":
+                value = value.upper()
+        params[name] = value
+    return tool_name + ":" + json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+
+
+def result_size(value: Any) -> int:
+    """Approximate memory cost of a result (its JSON size)."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+
+def cacheable(value: Any) -> bool:
+    # Tools report failures as {"error": ...}; those are retried, not cached
+    return not (isinstance(value, dict) and "error" in value)
+
+
+class ToolCache:
+    """
+    Shared LRU of tool results bounded by total size (TOOL_CACHE_MAX_BYTES).
+
+    An entry is fresh for `ttl` seconds. For `stale_ttl` seconds after that it
+    is still returned immediately while a background thread recomputes it
+    (stale-while-revalidate); past that the caller waits for a fresh call.
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = TOOL_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()  # key → (value, stored_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._refreshing: set = set()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tool-cache")
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, tool_name: str, event: str) -> None:
+        tool_stats = self._stats.setdefault(tool_name, {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0})
+        tool_stats[event] += 1
+
+    def _lookup(self, key: str) -> Optional[Tuple[Any, float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0], time.monotonic() - entry[1]
+
+    def store(self, key: str, value: Any) -> None:
+        if not cacheable(value):
+            return
+        size = result_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old[2]
+            self._entries[key] = (value, time.monotonic(), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def _revalidate(self, tool_name: str, key: str, call: Callable[[], Any]) -> None:
+        try:
+            self.store(key, call())
+            with self._lock:
+                self._count(tool_name, "refreshes")
+        except Exception as e:
+            print(f"⚠️ Background refresh of {tool_name} failed: {e}", flush=True)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_call(self, tool_name: str, key: str, ttl: float, stale_ttl: float, call: Callable[[], Any]) -> Any:
+        with self._lock:
+            found = self._lookup(key)
+            if found is not None:
+                value, age = found
+                if age < ttl:
+                    self._count(tool_name, "hits")
+                    return value
+                if age < ttl + stale_ttl:
+                    self._count(tool_name, "stale_hits")
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        self._refresher.submit(self._revalidate, tool_name, key, call)
+                    return value
+            self._count(tool_name, "misses")
+
+        value = call()
+        self.store(key, value)
+        return value
+
+    def peek(self, tool_name: str, key: str, ttl: float) -> Optional[Any]:
+        """A fresh cached value (counted as a hit), or None (counted as a miss)."""
+        with self._lock:
+            found = self._lookup(key)
+            if found is not None and found[1] < ttl:
+                self._count(tool_name, "hits")
+                return found[0]
+            self._count(tool_name, "misses")
+            return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "tools": {name: dict(counts) for name, counts in self._stats.items()},
+            }
+
+
+# Shared singleton cache
+tool_cache = ToolCache()
+
+
+def cached_tool(tool_name: str, ttl: float, stale_ttl: Optional[float] = None, cache: ToolCache = tool_cache):
+    """Decorator: serve a tool from `cache` for `ttl` seconds (stale for another `stale_ttl`, default ttl)."""
+    stale_ttl = ttl if stale_ttl is None else stale_ttl
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = canonical_key(tool_name, signature, args, kwargs)
+            return cache.get_or_call(tool_name, key, ttl, stale_ttl, lambda: func(*args, **kwargs))
+
+        wrapper.cache_ttl = ttl  # lets batch execution read / fill the same entries
+        return wrapper
+
+    return decorator
@@ -0,0 +1,103 @@
+# backend/lib/volume_baselines.py
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from backend.db.supabase_client import supabase
+from backend.db.spac_data_reader import load_window, IN_CHUNK
+from backend.lib import metrics
+
+# Rolling average daily volume, computed from stored candles (replaces Yahoo's
+# averageDailyVolume10Day / averageDailyVolume3Month). The window is the
+# sessions *before* the as-of session, so the candle being judged never
+# inflates its own baseline (a spike would otherwise hide smaller ones).
+WINDOWS = {"avg_volume_10d": 10, "avg_volume_3m": 63}  # trading sessions
+HISTORY_DAYS = 100  # calendar days of spac_data that cover 63 sessions + the as-of one
+
+
+def window_mean(volumes: np.ndarray, window: int) -> Optional[float]:
+    """
+    Mean of the `window` volumes before the latest one (oldest → newest);
+    None with less than half a window.
+    """
+    tail = volumes[-window - 1:-1]
+    if len(tail) < max(1, window // 2):
+        return None
+    return float(np.sum(tail)) / len(tail)
+
+
+def baselines_from_history(volumes: np.ndarray) -> Tuple[Optional[float], Optional[float]]:
+    """(10-day, 3-month) averages for one ticker's volume history (oldest → newest)."""
+    return window_mean(volumes, WINDOWS["avg_volume_10d"]), window_mean(volumes, WINDOWS["avg_volume_3m"])
+
+
+def compute_baselines(rows: pd.DataFrame) -> List[Dict]:
+    """
+    Vectorized version of baselines_from_history() for every ticker in `rows`
+    (ticker, trade_date, volume records). Returns spac_volume_baselines rows;
+    as_of is the latest session, the averages cover the sessions before it.
+    """
+    df = rows.dropna(subset=["volume"])
+    if df.empty:
+        return []
+
+    codes, tickers = pd.factorize(df["ticker"])
+    days = pd.to_datetime(df["trade_date"]).to_numpy(dtype="datetime64[D]").astype("int64")
+    volumes = df["volume"].to_numpy(dtype="float64")
+
+    # Sort by ticker, newest first; pos = how many sessions back each candle is
+    idx = np.lexsort((-days, codes))
+    codes, days, volumes = codes[idx], days[idx], volumes[idx]
+    pos = np.arange(len(idx)) - np.searchsorted(codes, codes, side="left")
+
+    out = {"as_of": np.zeros(len(tickers), dtype="int64")}
+    out["as_of"][codes[pos == 0]] = days[pos == 0]
+    for column, window in WINDOWS.items():
+        mask = (pos >= 1) & (pos <= window)  # the as-of session (pos 0) is excluded
+        sums = np.bincount(codes[mask], weights=volumes[mask], minlength=len(tickers))
+        counts = np.bincount(codes[mask], minlength=len(tickers))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[column] = np.where(counts >= max(1, window // 2), sums / counts, np.nan)
+
+    return [
+        {
+            "ticker": ticker,
+            "as_of": str(np.datetime64(int(out["as_of"][i]), "D")),
+            **{
+                column: None if np.isnan(out[column][i]) else float(out[column][i])
+                for column in WINDOWS
+            },
+        }
+        for i, ticker in enumerate(tickers)
+    ]
+
+
+def refresh_volume_baselines(tickers: List[str]) -> int:
+    """Recompute baselines for `tickers` from spac_data and upsert them in one batch."""
+    if not tickers:
+        return 0
+
+    rows = compute_baselines(load_window(tickers, HISTORY_DAYS))
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [{**row, "updated_at": now} for row in rows]
+    if rows:
+        supabase.table("spac_volume_baselines").upsert(rows, on_conflict="ticker").execute()
+        metrics.count("rows_written", len(rows))
+    print(f"📐 Refreshed volume baselines for {len(rows)} tickers")
+    return len(rows)
+
+
+def load_volume_baselines(tickers: List[str]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """Precomputed (10-day, 3-month) averages per ticker, one query per IN_CHUNK tickers."""
+    baselines: Dict[str, Tuple] = {}
+    for i in range(0, len(tickers), IN_CHUNK):
+        rows = (
+            supabase.table("spac_volume_baselines")
+            .select("ticker, avg_volume_10d, avg_volume_3m")
+            .in_("ticker", tickers[i:i + IN_CHUNK])
+            .execute()
+            .data
+        ) or []
+        for row in rows:
+            baselines[row["ticker"]] = (row.get("avg_volume_10d"), row.get("avg_volume_3m"))
+    return baselines
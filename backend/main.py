@@ -2,13 +2,24 @@
 import importlib
 import pkgutil
 import json
+import re
+from typing import Callable, List, NamedTuple, Optional
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, APIRouter, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from backend.mcp_server import mcp
+from backend.mcp_server.dispatch import call_tool, call_batch, tool_error, stats as dispatch_stats
+from backend.lib.tool_cache import tool_cache
+from backend.lib.ticker_index import ticker_index
+from backend.lib.llm_cache import get_llm_cache
+from backend.lib.openai_client import achat
+from backend.config import TOOL_BATCH_MAX_CALLS, LLM_CACHE_AGENT_TTL
 import backend.mcp_server.tools as tools_pkg
-from backend.mcp_clients.openai_client import run_agent
+from backend.mcp_clients.openai_client import (
+    run_agent, stream_agent_sse, start_agent_pool, stop_agent_pool, agent_pool_stats,
+)
 
 
 # -----------------------------
@@ -21,7 +32,17 @@ class AgentQuery(BaseModel):
 # -----------------------------
 # FastAPI Setup
 # -----------------------------
-app = FastAPI(title="MCP Agent API", version="2.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Long-lived MCP sessions for the LLM agent instead of a subprocess per query
+    await start_agent_pool()
+    ticker_index.start_background_refresh()
+    yield
+    ticker_index.stop()
+    await stop_agent_pool()
+
+
+app = FastAPI(title="MCP Agent API", version="2.0", lifespan=lifespan)
 
 # CORS setup
 app.add_middleware(
@@ -39,6 +60,18 @@ for _, module_name, _ in pkgutil.iter_modules(tools_pkg.__path__):
 router = APIRouter()
 
 
+# -----------------------------
+# Batch Tool Endpoint (before /tools/{tool_name})
+# -----------------------------
+@router.post("/tools/batch")
+async def run_batch(payload: dict = Body(...)):
+    """Run {"calls": [{"tool", "args"}, ...]} concurrently; results in call order."""
+    calls = payload.get("calls") or []
+    if len(calls) > TOOL_BATCH_MAX_CALLS:
+        return {"error": f"Too many calls in one batch ({len(calls)} > {TOOL_BATCH_MAX_CALLS})"}
+    return {"results": await call_batch(calls)}
+
+
 # -----------------------------
 # Generic Tool Endpoint
 # -----------------------------
@@ -46,15 +79,16 @@ router = APIRouter()
 async def run_tool(tool_name: str, payload: dict = Body(...)):
     """Generic wrapper for any MCP tool."""
     data = payload.get("args", payload) if payload else {}
-    tool = mcp.tools.get(tool_name)
-
-    if not tool:
-        return {"error": f"Tool '{tool_name}' not found"}
-
     try:
-        return tool(**data) if data else tool()
+        return await call_tool(tool_name, data)
     except Exception as e:
-        return {"error": str(e)}
+        return tool_error(tool_name, e)
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Tool result cache (entries, bytes, per-tool hits / misses), single-flight savings and the LLM response cache."""
+    return {**tool_cache.stats(), "single_flight": dispatch_stats(), "llm": get_llm_cache().stats()}
 
 
 app.include_router(router)
@@ -65,7 +99,7 @@ async def root():
     return {
         "status": "ok",
         "message": "📈 MCP Agent backend is live",
-        "endpoints": ["/tools/{tool_name}", "/mcp/agent"],
+        "endpoints": ["/tools/{tool_name}", "/tools/batch", "/cache/stats", "/tickers/search", "/mcp/agent", "/mcp/agent/stream"],
     }
 
 
@@ -73,25 +107,37 @@ async def root():
 # Helper: Detect ticker
 # -----------------------------
 async def extract_ticker(user_query: str) -> str | None:
-    """Try to extract a valid ticker from query, fallback to LLM reasoning."""
-    words = user_query.split()
-    candidates = [w.upper() for w in words if len(w) <= 5 and w.isalpha()]
-
-    if candidates:
-        return candidates[-1]
+    """Resolve the ticker from the in-memory index, fallback to LLM reasoning."""
+    ticker = ticker_index.resolve(user_query)
+    if ticker:
+        return ticker
 
-    # 🧠 Fallback to LLM reasoning
+    # 🧠 Fallback to LLM reasoning (only when the index finds nothing)
+    # (plain completion: extracting a symbol needs no tools)
     prompt = f"""
     Extract the stock ticker symbol (like AAPL, TSLA, etc.) from this query: '{user_query}'.
     If none exists, reply 'None' only.
     """
-    result = await run_agent(prompt, structured=False)
-    if isinstance(result, str) and result.strip().upper() != "NONE":
+    try:
+        result = await achat([{"role": "user", "content": prompt}], model="gpt-4.1-mini", temperature=0, max_tokens=10)
+    except Exception as e:
+        print(f"⚠️ Ticker extraction failed: {e}", flush=True)
+        return None
+    if result and result.strip().upper() != "NONE":
         return result.strip().upper()
 
     return None
 
 
+@app.get("/tickers/search")
+async def search_tickers(q: str, limit: int = 10):
+    """Prefix search over tickers and company names (autocomplete)."""
+    return {
+        "query": q,
+        "results": [{"ticker": t, "company": ticker_index.company(t)} for t in ticker_index.search(q, limit)],
+    }
+
+
 # -----------------------------
 # Helper: Summarize results
 # -----------------------------
@@ -103,10 +149,74 @@ async def summarize_result(result: dict, context: str) -> str:
     If numeric data is given, highlight the key insights.
 
     Data:
-    {json.dumps(result, indent=2)}
+    {json.dumps(result, indent=2, sort_keys=True, default=str)}
     """
-    summary = await run_agent(prompt, structured=False)
-    return summary
+    # The data is already fetched: one cached completion, no agent / tools needed
+    try:
+        return await achat([{"role": "user", "content": prompt}], model="gpt-4.1-mini", temperature=0)
+    except Exception as e:
+        return f"⚠️ LLM summarization failed: {e}"
+
+
+@app.post("/mcp/agent/stream")
+async def mcp_agent_stream(query: AgentQuery):
+    """Streaming LLM agent (Server-Sent Events): tool_start / tool_end / token, then done."""
+    return StreamingResponse(
+        stream_agent_sse(query.query),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/mcp/agent/pool")
+async def agent_pool():
+    """MCP session pool: size, healthy / idle sessions, reconnects."""
+    return agent_pool_stats()
+
+
+# -----------------------------
+# Planner: query → independent tool calls
+# -----------------------------
+class Intent(NamedTuple):
+    name: str
+    keywords: List[str]
+    tool: str
+    args: Optional[Callable[[str], dict]]  # ticker → tool args; None = needs no ticker
+    context: Optional[str]                 # summary context; None = result returned as is
+    no_ticker: Optional[str] = None        # answer when the ticker can't be detected
+
+
+INTENTS = [
+    Intent("price", ["price", "prices", "value", "worth"], "get_stock_price",
+           lambda t: {"ticker": t, "period": "1mo", "interval": "1d"}, "stock price",
+           "⚠️ Could not detect a ticker symbol."),
+    Intent("volume", ["volume"], "get_volume_history",
+           lambda t: {"ticker": t, "days": 30}, "trading volume",
+           "⚠️ Please specify a ticker for volume analysis."),
+    # filings carry their own LLM summaries
+    Intent("filings", ["filing", "filings", "10-k", "8-k", "report"], "get_filings",
+           lambda t: {"ticker": t, "form_types": ["8-K"], "limit": 3, "summarize": True}, None,
+           "⚠️ Please provide a ticker to fetch filings."),
+    Intent("list", ["list"], "list_tickers", None, None),
+    Intent("anomalies", ["anomaly", "anomalies", "spike", "spikes", "unusual"], "detect_anomalies",
+           lambda t: {"ticker": t}, "anomaly detection",
+           "⚠️ Please provide a ticker for anomaly checking."),
+]
+
+
+def mentions(query: str, keyword: str) -> bool:
+    """Whole-word match: "list" is not in "analyst", "report" is not in "reporting"."""
+    return re.search(rf"\b{re.escape(keyword)}\b", query) is not None
+
+
+def plan_intents(user_query: str) -> List[Intent]:
+    """Every intent the query mentions ("price and volume for SOFI" → price, volume)."""
+    query = user_query.lower()
+    intents = [intent for intent in INTENTS if any(mentions(query, word) for word in intent.keywords)]
+    # "stock" alone means price ("SOFI stock"), but not in "unusual volume in SOFI stock"
+    if not intents and mentions(query, "stock"):
+        intents = [INTENTS[0]]
+    return intents
 
 
 # -----------------------------
@@ -114,60 +224,47 @@ async def summarize_result(result: dict, context: str) -> str:
 # -----------------------------
 @app.post("/mcp/agent")
 async def mcp_agent(query: AgentQuery):
-    """Reasoning agent for MCP demo."""
-    user_query = query.query.lower().strip()
-    ticker = await extract_ticker(user_query)
-
-    # 1️⃣ Stock Price Queries
-    if any(word in user_query for word in ["price", "stock", "value", "worth"]):
-        if ticker:
-            tool = mcp.tools.get("get_stock_price")
-            res = tool(ticker=ticker, period="1mo", interval="1d")
-            if "error" not in res:
-                summary = await summarize_result(res, "stock price")
-                return {"answer": summary, "data": res}
-            return {"answer": res}
-        return {"answer": "⚠️ Could not detect a ticker symbol."}
-
-    # 2️⃣ Volume Queries
-    if "volume" in user_query:
-        if ticker:
-            tool = mcp.tools.get("get_volume_history")
-            res = tool(ticker=ticker, days=30)
-            summary = await summarize_result(res, "trading volume")
-            return {"answer": summary, "data": res}
-        return {"answer": "⚠️ Please specify a ticker for volume analysis."}
-
-    # 3️⃣ Filings Queries
-    if any(word in user_query for word in ["filing", "10-k", "8-k", "report"]):
-        if ticker:
-            tool = mcp.tools.get("get_filings")
-            res = tool(ticker=ticker, form_types=["8-K"], limit=3, summarize=True)
-            return {"answer": res}
-        return {"answer": "⚠️ Please provide a ticker to fetch filings."}
-
-    # 4️⃣ List Available Tickers
-    if "list" in user_query:
-        tool = mcp.tools.get("list_tickers")
-        return {"answer": tool()}
-
-    # 5️⃣ Anomaly Detection
-    if any(word in user_query for word in ["anomaly", "spike", "unusual"]):
-        if ticker:
-            tool = mcp.tools.get("detect_anomalies")
-            res = tool(ticker=ticker)
-            summary = await summarize_result(res, "anomaly detection")
-            return {"answer": summary, "data": res}
-        return {"answer": "⚠️ Please provide a ticker for anomaly checking."}
-
-    # 6️⃣ Fallback → Let LLM interpret any other financial question
-    try:
-        result = await run_agent(query.query, structured=False)
-        return {"answer": result}
-    except Exception as e:
-        return {"answer": f"⚠️ MCP LLM fallback failed: {str(e)}"}
-
-
-
+    """
+    Reasoning agent for MCP demo. Every planned tool call runs concurrently
+    (call_batch, off the event loop) and the results are summarized in one LLM call.
+    """
+    intents = plan_intents(query.query)
+
+    # Fallback → Let LLM interpret any other financial question
+    if not intents:
+        try:
+            result = await run_agent(query.query, structured=False, cache_ttl=LLM_CACHE_AGENT_TTL)
+            return {"answer": result}
+        except Exception as e:
+            return {"answer": f"⚠️ MCP LLM fallback failed: {str(e)}"}
+
+    ticker = None
+    if any(intent.args for intent in intents):
+        ticker = await extract_ticker(query.query)  # original casing: "SOFI" is a symbol, "show" is not
+    planned = [intent for intent in intents if intent.args is None or ticker]
+    if not planned:
+        return {"answer": intents[0].no_ticker}
+
+    entries = await call_batch([
+        {"tool": intent.tool, "args": intent.args(ticker) if intent.args else {}} for intent in planned
+    ])
+    results = {
+        intent.name: entry["result"] if entry["ok"] else {k: v for k, v in entry.items() if k not in ("tool", "ok")}
+        for intent, entry in zip(planned, entries)
+    }
 
+    if len(planned) == 1:
+        intent = planned[0]
+        res = results[intent.name]
+        if intent.context is None or (isinstance(res, dict) and "error" in res):
+            return {"answer": res}
+        return {"answer": await summarize_result(res, intent.context), "data": res}
 
+    # Several intents → one summary of everything that succeeded
+    summarizable = {
+        intent.context: results[intent.name] for intent in planned
+        if intent.context and not (isinstance(results[intent.name], dict) and "error" in results[intent.name])
+    }
+    answer = await summarize_result(summarizable, " and ".join(summarizable)) if summarizable else results
+    warnings = [intent.no_ticker for intent in intents if intent not in planned]
+    return {"answer": answer, "data": results, **({"warnings": warnings} if warnings else {})}
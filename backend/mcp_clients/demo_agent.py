@@ -1,7 +1,8 @@
 import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from backend.mcp_clients.openai_client import run_agent
+from backend.mcp_clients.openai_client import run_agent, agent_pool_stats, stream_agent_sse
 
 # ✅ FastAPI router
 router = APIRouter()
@@ -49,6 +50,25 @@ async def ask_agent(payload: AgentRequest):
 
 
 
+@router.post("/agent/stream")
+async def ask_agent_stream(payload: AgentRequest):
+    """
+    Streaming variant of /mcp/agent (Server-Sent Events):
+    tool_start / tool_end / token events while the agent works, then done (or error).
+    """
+    return StreamingResponse(
+        stream_agent_sse(payload.query, structured=payload.structured),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/agent/pool")
+async def agent_pool():
+    """MCP session pool: size, healthy / idle sessions, reconnects."""
+    return agent_pool_stats()
+
+
 # 🚀 API endpoint
 @router.post("/agent")
 async def ask_agent(payload: AgentRequest):
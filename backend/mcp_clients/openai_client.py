@@ -1,24 +1,20 @@
+import asyncio
+import json
 import os
+import time
 import traceback
+from typing import AsyncIterator, Dict, Optional
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
-from langchain_mcp_adapters.tools import load_mcp_tools
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from backend.mcp_clients.session_pool import MCPSessionPool
+from backend.lib.llm_cache import cache_key, get_llm_cache
 
 # Load environment variables
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-
-async def run_agent(user_query: str, structured: bool = False) -> str:
-    """
-    Run the MCP agent with the given user query and return the response.
-    - If structured=True, the agent will try to return JSON instead of free text.
-    """
-
-    SYSTEM_PROMPT = """
+SYSTEM_PROMPT = """
 You are MCP Agent — a finance-focused AI assistant with access to the following tools:
 
 🛠️ Tools you can use:
@@ -40,66 +36,159 @@ You are MCP Agent — a finance-focused AI assistant with access to the followin
 - When `structured=True`, return valid JSON with keys like "type", "content", "ticker", etc.
 """
 
-    # Start the MCP server (the one managing your data tools)
-    server_params = StdioServerParameters(
-        command="python",
-        args=["-m", "backend.mcp_server.mcp_server"],  # start your MCP server as a subprocess
+STRUCTURED_PROMPT = (
+    "Return ONLY valid JSON. Use one of the formats below:\n"
+    '{"type": "text", "content": "..."} OR '
+    '{"type": "chart", "ticker": "...", "data": [...]} OR '
+    '{"type": "filings", "ticker": "...", "filings": [...]} OR '
+    '{"type": "anomalies", "ticker": "...", "anomalies": [...]}'
+)
+
+
+AGENT_MODEL = "gpt-4.1-mini"
+
+
+def build_agent(tools):
+    """ReAct-style agent (LLM + MCP tools), compiled once per pooled session."""
+    llm = ChatOpenAI(
+        model=AGENT_MODEL,
+        temperature=0,
+        openai_api_key=OPENAI_API_KEY,
     )
+    return create_react_agent(llm, tools)
+
+
+def build_messages(user_query: str, structured: bool = False) -> list:
+    """Conversation context for one query (system prompt, user query, output format)."""
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_query}
+    ]
+    if structured:
+        messages.append({"role": "system", "content": STRUCTURED_PROMPT})
+    return messages
+
+
+# --- Session pool (started by the FastAPI apps at startup) ---
+_pool: MCPSessionPool = None
+
+
+async def start_agent_pool() -> MCPSessionPool:
+    """Start the shared MCP session pool on the running loop (idempotent)."""
+    global _pool
+    if _pool is None or _pool.loop is not asyncio.get_running_loop():
+        _pool = MCPSessionPool(build_agent)
+        await _pool.start()
+    return _pool
+
+
+async def stop_agent_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
 
+def agent_pool_stats() -> dict:
+    return _pool.stats() if _pool else {"size": 0, "healthy": 0, "idle": 0, "reconnects": 0}
+
+
+async def run_agent(user_query: str, structured: bool = False, cache_ttl: Optional[float] = None) -> str:
+    """
+    Run the MCP agent with the given user query and return the response.
+    - If structured=True, the agent will try to return JSON instead of free text.
+    - If cache_ttl is set, the same query within cache_ttl seconds is answered
+      from the LLM cache (errors are never cached).
+    Uses a pooled MCP session (started on first use outside the apps).
+    """
+    messages = build_messages(user_query, structured)
+    if cache_ttl:
+        started = time.perf_counter()
+        cache = get_llm_cache()
+        key = cache_key(f"agent:{AGENT_MODEL}", messages)
+        hit = await asyncio.to_thread(cache.get, key)
+        if hit:
+            cache.record(True, time.perf_counter() - started, 0)
+            return hit["response"]
+        answer = await run_agent(user_query, structured)
+        if isinstance(answer, str):
+            await asyncio.to_thread(cache.put, key, f"agent:{AGENT_MODEL}", answer, cache_ttl)
+            cache.record(False, time.perf_counter() - started, 0)
+        return answer
+
+    try:
+        pool = await start_agent_pool()
+        async with pool.acquire() as slot:
+            if not slot.tools:
+                slot.broken.set()  # a server without tools is as good as dead: reconnect it
+                return {"type": "error", "content": "⚠️ No tools were loaded. Check your MCP server."}
+
+            # 🔧 Run the agent. Errors propagate out of acquire() first, so the pool
+            # can ping the session and retire it if the transport is dead.
+            result = await slot.agent.ainvoke({"messages": messages})
+
+    except Exception as e:
+        print("💥 MCP agent failed:", e)
+        traceback.print_exc()
+        return {"type": "error", "content": f"⚠️ MCP agent error: {str(e)}"}
+
+    # ✅ Validate and return
+    if not result or "messages" not in result:
+        return {"type": "error", "content": "⚠️ MCP agent returned an unexpected result."}
+
+    return result["messages"][-1].content
+
+
+# --- Streaming (Server-Sent Events) ---
+def _preview(value, limit: int = 500) -> str:
+    text = getattr(value, "content", value)
+    if isinstance(text, list):  # MCP content blocks
+        text = "".join(b.get("text", "") if isinstance(b, dict) else str(b) for b in text)
+    text = text if isinstance(text, str) else json.dumps(text, default=str)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+async def stream_agent(user_query: str, structured: bool = False) -> AsyncIterator[Dict]:
+    """
+    Run the MCP agent and yield events as they happen (astream_events):
+    {"event": "tool_start", "tool", "input"}, {"event": "tool_end", "tool", "output"},
+    {"event": "token", "content"} for LLM output, then {"event": "done", "answer"}
+    or {"event": "error", "content"}.
+    """
+    messages = build_messages(user_query, structured)
     try:
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-
-                # 🔧 Load MCP tools dynamically
-                tools = await load_mcp_tools(session)
-                if not tools:
-                    return {"type": "error", "content": "⚠️ No tools were loaded. Check your MCP server."}
-
-                # 🔧 Initialize OpenAI LLM
-                llm = ChatOpenAI(
-                    model="gpt-4.1-mini",
-                    temperature=0,
-                    openai_api_key=OPENAI_API_KEY,
-                )
-
-                # 🔧 Create a ReAct-style agent (LLM + tools)
-                agent = create_react_agent(llm, tools)
-
-                # ✅ Construct conversation context (include system prompt)
-                messages = [
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_query}
-                ]
-
-                if structured:
-                    messages.append({
-                        "role": "system",
-                        "content": (
-                            "Return ONLY valid JSON. Use one of the formats below:\n"
-                            '{"type": "text", "content": "..."} OR '
-                            '{"type": "chart", "ticker": "...", "data": [...]} OR '
-                            '{"type": "filings", "ticker": "...", "filings": [...]} OR '
-                            '{"type": "anomalies", "ticker": "...", "anomalies": [...]}'
-                        )
-                    })
-
-                # 🔧 Run the agent
-                try:
-                    result = await agent.ainvoke({"messages": messages})
-                except Exception as inner_e:
-                    print("💥 Agent crashed inside ainvoke:", inner_e)
-                    traceback.print_exc()
-                    return {"type": "error", "content": f"⚠️ MCP agent error (ainvoke): {str(inner_e)}"}
-
-                # ✅ Validate and return
-                if not result or "messages" not in result:
-                    return {"type": "error", "content": "⚠️ MCP agent returned an unexpected result."}
-
-                return result["messages"][-1].content
-
-    except Exception as outer_e:
-        print("💥 MCP client failed:", outer_e)
+        pool = await start_agent_pool()
+        async with pool.acquire() as slot:
+            if not slot.tools:
+                slot.broken.set()
+                yield {"event": "error", "content": "⚠️ No tools were loaded. Check your MCP server."}
+                return
+
+            answer = []
+            async for event in slot.agent.astream_events({"messages": messages}, version="v2"):
+                kind = event["event"]
+                if kind == "on_chat_model_start":
+                    answer = []  # only the last LLM turn is the answer
+                elif kind == "on_chat_model_stream":
+                    content = event["data"]["chunk"].content
+                    if isinstance(content, str) and content:
+                        answer.append(content)
+                        yield {"event": "token", "content": content}
+                elif kind == "on_tool_start":
+                    yield {"event": "tool_start", "tool": event["name"], "input": event["data"].get("input")}
+                elif kind == "on_tool_end":
+                    yield {"event": "tool_end", "tool": event["name"], "output": _preview(event["data"].get("output"))}
+
+            yield {"event": "done", "answer": "".join(answer)}
+
+    except Exception as e:
+        print("💥 MCP agent stream failed:", e)
         traceback.print_exc()
-        return {"type": "error", "content": f"⚠️ MCP agent error: {str(outer_e)}"}
+        yield {"event": "error", "content": f"⚠️ MCP agent error: {str(e)}"}
+
 
+async def stream_agent_sse(user_query: str, structured: bool = False) -> AsyncIterator[str]:
+    """stream_agent() formatted as Server-Sent Events (event name + JSON data)."""
+    yield ": stream open\n\n"  # first byte goes out before the agent starts
+    async for event in stream_agent(user_query, structured):
+        yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
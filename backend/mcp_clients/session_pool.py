@@ -0,0 +1,160 @@
+# backend/mcp_clients/session_pool.py
+import asyncio
+import os
+import sys
+import traceback
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Any, Callable, List, Optional
+from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from backend.config import (
+    MCP_POOL_SIZE, MCP_POOL_HEALTH_SECONDS, MCP_POOL_ACQUIRE_TIMEOUT, MCP_CALL_TIMEOUT,
+)
+
+SERVER_PARAMS = StdioServerParameters(
+    command=sys.executable,
+    args=["-m", "backend.mcp_server.mcp_server"],  # the MCP server managing the data tools
+    env=dict(os.environ),
+)
+
+
+class PooledSession:
+    """One long-lived MCP server subprocess with its session, tools and compiled agent."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.session: Optional[ClientSession] = None
+        self.tools: List = []
+        self.agent: Any = None
+        self.generation = 0  # bumped per connection; stale queue entries are dropped
+        self.broken = asyncio.Event()  # set → the holder task tears down and reconnects
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.session is not None and not self.broken.is_set()
+
+
+class MCPSessionPool:
+    """
+    Fixed-size pool of stdio MCP sessions, started once (app startup) instead
+    of one subprocess per query. Each slot loads the tool list and compiles the
+    agent once per connection (build_agent(tools)) and reuses them for every query.
+
+    A background task pings idle sessions every MCP_POOL_HEALTH_SECONDS; a
+    failed ping or call marks the slot broken and its holder task reconnects
+    with exponential backoff.
+    """
+
+    def __init__(self, build_agent: Callable[[List], Any], size: int = MCP_POOL_SIZE,
+                 server_params: StdioServerParameters = SERVER_PARAMS):
+        self.build_agent = build_agent
+        self.size = max(1, size)
+        self.server_params = server_params
+        self.slots = [PooledSession(i) for i in range(self.size)]
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.reconnects = 0
+
+    async def start(self, wait: float = 15.0) -> None:
+        """Spawn every slot and wait until the first one is ready (or `wait` passes; the rest connect in the background)."""
+        self.loop = asyncio.get_running_loop()
+        self._idle = asyncio.Queue()
+        for slot in self.slots:
+            slot.task = asyncio.create_task(self._hold(slot))
+        self._health_task = asyncio.create_task(self._health_loop())
+        deadline = self.loop.time() + wait
+        while not any(slot.healthy for slot in self.slots) and self.loop.time() < deadline:
+            await asyncio.sleep(0.1)
+        print(f"🔌 MCP session pool: {sum(s.healthy for s in self.slots)}/{self.size} sessions ready", flush=True)
+
+    async def _hold(self, slot: PooledSession) -> None:
+        """Keep one session open until it breaks, then reconnect (until close())."""
+        delay = 1.0
+        while not self._closing:
+            try:
+                async with stdio_client(self.server_params) as (read, write):
+                    async with ClientSession(read, write, read_timeout_seconds=timedelta(seconds=MCP_CALL_TIMEOUT)) as session:
+                        await session.initialize()
+                        slot.tools = await load_mcp_tools(session)
+                        slot.agent = self.build_agent(slot.tools)
+                        slot.session = session
+                        slot.generation += 1
+                        slot.broken.clear()
+                        self._idle.put_nowait((slot, slot.generation))
+                        delay = 1.0
+                        await slot.broken.wait()
+            except Exception as e:
+                print(f"💥 MCP session {slot.index} failed: {e}", flush=True)
+            finally:
+                slot.session = None
+            if self._closing:
+                return
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def _ping(self, slot: PooledSession) -> bool:
+        try:
+            await asyncio.wait_for(slot.session.send_ping(), timeout=5)
+            return True
+        except Exception:
+            return False
+
+    async def _health_loop(self) -> None:
+        while not self._closing:
+            await asyncio.sleep(MCP_POOL_HEALTH_SECONDS)
+            idle = []
+            while not self._idle.empty():
+                idle.append(self._idle.get_nowait())
+            for slot, generation in idle:
+                if generation != slot.generation:
+                    continue
+                if slot.healthy and await self._ping(slot):
+                    self._idle.put_nowait((slot, generation))
+                elif slot.session is not None:
+                    print(f"🩺 MCP session {slot.index} failed its health check, reconnecting", flush=True)
+                    slot.broken.set()
+
+    @asynccontextmanager
+    async def acquire(self, timeout: float = MCP_POOL_ACQUIRE_TIMEOUT):
+        """Borrow a healthy session (PooledSession) for one query."""
+        deadline = self.loop.time() + timeout
+        while True:
+            slot, generation = await asyncio.wait_for(self._idle.get(), max(0.01, deadline - self.loop.time()))
+            if slot.healthy and generation == slot.generation:
+                break
+        try:
+            yield slot
+        except Exception:
+            # A tool error or a dead server? Only a failed ping retires the session.
+            if slot.healthy and not await self._ping(slot):
+                slot.broken.set()
+            raise
+        finally:
+            if slot.healthy and generation == slot.generation:
+                self._idle.put_nowait((slot, generation))
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "healthy": sum(slot.healthy for slot in self.slots),
+            "idle": self._idle.qsize() if self._idle else 0,
+            "reconnects": self.reconnects,
+        }
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._health_task:
+            self._health_task.cancel()
+        for slot in self.slots:
+            slot.broken.set()
+        tasks = [slot.task for slot in self.slots if slot.task]
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=10)
+        except asyncio.TimeoutError:
+            traceback.print_exc()
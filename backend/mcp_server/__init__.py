@@ -1,31 +1,54 @@
 # backend/mcp_server/__init__.py
 from mcp.server.fastmcp import FastMCP
+from backend.lib.tool_cache import cached_tool
 
 class MCPWithRegistry(FastMCP):
     def __init__(self, name: str):
         super().__init__(name)
         self._tools = {}
+        self._batch_handlers = {}
 
-    def tool(self, *args, **kwargs):
+    def tool(self, *args, cache_ttl: float = None, stale_ttl: float = None, **kwargs):
         # get the real decorator from FastMCP
         base_decorator = super().tool(*args, **kwargs)
 
         def wrapper(func):
+            tool_name = kwargs.get("name", func.__name__)
+
+            # optional TTL cache (shared by MCP clients and the HTTP endpoints)
+            if cache_ttl:
+                func = cached_tool(tool_name, cache_ttl, stale_ttl)(func)
+
             # register with FastMCP
             wrapped = base_decorator(func)
 
             # also keep reference in registry
-            tool_name = kwargs.get("name", func.__name__)
             self._tools[tool_name] = wrapped
 
             return wrapped
 
         return wrapper
 
+    def batch(self, tool_name: str):
+        """
+        Register a native batch handler for a tool: it takes a list of argument
+        dicts and returns one result (or exception) per call, in order.
+        Used by the /tools/batch endpoint.
+        """
+        def wrapper(func):
+            self._batch_handlers[tool_name] = func
+            return func
+
+        return wrapper
+
     @property
     def tools(self):
         return self._tools
 
+    @property
+    def batch_handlers(self):
+        return self._batch_handlers
+
 # Shared singleton MCP instance
 mcp = MCPWithRegistry("spac-server")
 
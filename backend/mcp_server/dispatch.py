@@ -0,0 +1,264 @@
+# backend/mcp_server/dispatch.py
+import asyncio
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from backend.config import TOOL_WORKERS, TOOL_CONCURRENCY, TOOL_TIMEOUT, TOOL_LIMITS
+from backend.lib.tool_cache import canonical_key, cacheable, tool_cache
+from backend.mcp_server import mcp
+
+
+class ToolNotFound(KeyError):
+    """No tool registered under that name."""
+
+
+class ToolTimeout(Exception):
+    """The tool did not finish within its timeout."""
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, float]]:
+    """'get_filings=2:120,plot_volume_chart=1' → {name: (concurrency, timeout)}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        concurrency, _, timeout = value.partition(":")
+        limits[name.strip()] = (
+            int(concurrency) if concurrency else TOOL_CONCURRENCY,
+            float(timeout) if timeout else TOOL_TIMEOUT,
+        )
+    return limits
+
+
+LIMITS = parse_limits(TOOL_LIMITS)
+
+# MCP tools are plain blocking functions (yfinance, Supabase, requests, matplotlib),
+# so they run here instead of on the event loop.
+_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="mcp-tool")
+_semaphores: Dict[Tuple[int, str], asyncio.Semaphore] = {}
+# Calls currently running, by (event loop, canonical call key) → shared task
+_inflight: Dict[Tuple[int, str], asyncio.Task] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def limits_for(tool_name: str) -> Tuple[int, float]:
+    return LIMITS.get(tool_name, (TOOL_CONCURRENCY, TOOL_TIMEOUT))
+
+
+def _semaphore(tool_name: str) -> asyncio.Semaphore:
+    # One per (event loop, tool): asyncio primitives can't be shared across loops
+    key = (id(asyncio.get_running_loop()), tool_name)
+    if key not in _semaphores:
+        _semaphores[key] = asyncio.Semaphore(limits_for(tool_name)[0])
+    return _semaphores[key]
+
+
+def _count(tool_name: str, event: str, n: int = 1) -> None:
+    tool_stats = _stats.setdefault(tool_name, {"calls": 0, "executed": 0, "coalesced": 0, "timeouts": 0})
+    tool_stats[event] += n
+
+
+def call_key(tool_name: str, tool, args: Dict) -> Optional[str]:
+    """Canonical key of a call, or None if the arguments don't fit the tool (let it raise)."""
+    try:
+        return canonical_key(tool_name, inspect.signature(tool), (), args)
+    except (TypeError, ValueError):
+        return None
+
+
+async def _execute(tool_name: str, call: Callable[[], Any], timeout: float) -> Any:
+    """Run `call` in the pool; `timeout` covers waiting for a free slot and the call itself."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    semaphore = _semaphore(tool_name)
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout)
+    except asyncio.TimeoutError:
+        _count(tool_name, "timeouts")
+        raise ToolTimeout(f"Tool '{tool_name}' timed out after {timeout:g}s waiting for a free slot") from None
+    try:
+        future = loop.run_in_executor(_executor, call)
+    except BaseException:
+        semaphore.release()
+        raise
+    _count(tool_name, "executed")
+    # A thread can't be cancelled: the slot stays taken until the call really ends,
+    # so a hung tool can't push its own concurrency past the limit.
+    future.add_done_callback(lambda _: semaphore.release())
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), max(0.0, deadline - loop.time()))
+    except asyncio.TimeoutError:
+        _count(tool_name, "timeouts")
+        raise ToolTimeout(f"Tool '{tool_name}' timed out after {timeout:g}s") from None
+
+
+async def call_tool(tool_name: str, args: Optional[Dict] = None, timeout: Optional[float] = None) -> Any:
+    """
+    Run a registered MCP tool in the tool thread pool, at most N calls per tool
+    at a time, and wait up to its timeout. Raises ToolNotFound / ToolTimeout, or
+    whatever the tool raised.
+
+    Identical calls (same tool, same canonical arguments) made while one is
+    already running share that execution and its result (single flight).
+    """
+    tool = mcp.tools.get(tool_name)
+    if tool is None:
+        raise ToolNotFound(tool_name)
+    args = args or {}
+    timeout = limits_for(tool_name)[1] if timeout is None else timeout
+    _count(tool_name, "calls")
+
+    key = call_key(tool_name, tool, args)
+    if key is None:
+        return await _execute(tool_name, functools.partial(tool, **args), timeout)
+
+    slot = (id(asyncio.get_running_loop()), key)
+    task = _inflight.get(slot)
+    if task is not None:
+        _count(tool_name, "coalesced")
+    else:
+        task = asyncio.ensure_future(_execute(tool_name, functools.partial(tool, **args), timeout))
+        _inflight[slot] = task
+        task.add_done_callback(lambda _: _inflight.pop(slot, None))
+    # shield: one caller disconnecting must not cancel the call for the others
+    return await asyncio.shield(task)
+
+
+async def _run_batch(tool_name: str, arg_list: List[Dict], timeout: float) -> List[Any]:
+    """One mcp.batch handler call for `arg_list`, in the pool like a single call."""
+    handler = mcp.batch_handlers[tool_name]
+    try:
+        return await _execute(tool_name, functools.partial(handler, arg_list), timeout)
+    except ToolTimeout:
+        raise
+    except Exception as e:
+        print(f"⚠️ Batch handler for {tool_name} failed ({e}), running calls one by one", flush=True)
+        raise
+
+
+async def _batch_item(tool_name: str, batch: asyncio.Task, i: int, key: str, args: Dict,
+                      ttl: Optional[float], timeout: float) -> Any:
+    """Call i of a running batch, as the in-flight task for its key (see call_tool)."""
+    try:
+        value = (await asyncio.shield(batch))[i]
+    except ToolTimeout:
+        raise
+    except Exception:
+        # the handler itself failed: run this call on its own
+        return await _execute(tool_name, functools.partial(mcp.tools[tool_name], **args), timeout)
+    if isinstance(value, Exception):
+        raise value
+    if ttl and cacheable(value):
+        tool_cache.store(key, value)
+    return value
+
+
+async def _call_native_batch(tool_name: str, arg_list: List[Dict]) -> List[Any]:
+    """
+    Run calls of one tool through its mcp.batch handler: fresh cache entries are
+    used as is, calls already running (single flight) or repeated in the batch
+    share that execution, and only the rest go to the handler, in one call.
+    Each of those registers in _inflight, so a call_tool for the same arguments
+    joins the batch instead of running again. New results are cached like single
+    calls; if the handler fails, its calls run one by one.
+    """
+    tool = mcp.tools[tool_name]
+    ttl = getattr(tool, "cache_ttl", None)
+    timeout = limits_for(tool_name)[1]
+    loop_id = id(asyncio.get_running_loop())
+    keys = [call_key(tool_name, tool, args) for args in arg_list]
+    _count(tool_name, "calls", len(arg_list))
+
+    found: Dict[str, Any] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+    todo: Dict[str, Dict] = {}
+    for key, args in zip(keys, arg_list):
+        if key in found or key in tasks or key in todo:
+            _count(tool_name, "coalesced")  # repeated in this batch
+            continue
+        value = tool_cache.peek(tool_name, key, ttl) if ttl else None  # hits count in the cache's own stats
+        if value is not None:
+            found[key] = value
+        elif (loop_id, key) in _inflight:
+            tasks[key] = _inflight[(loop_id, key)]
+            _count(tool_name, "coalesced")
+        else:
+            todo[key] = args
+
+    if todo:
+        batch = asyncio.ensure_future(_run_batch(tool_name, list(todo.values()), timeout))
+        for i, (key, args) in enumerate(todo.items()):
+            task = asyncio.ensure_future(_batch_item(tool_name, batch, i, key, args, ttl, timeout))
+            slot = (loop_id, key)
+            _inflight[slot] = task
+            task.add_done_callback(lambda _, slot=slot: _inflight.pop(slot, None))
+            tasks[key] = task
+
+    results = await asyncio.gather(*(asyncio.shield(t) for t in tasks.values()), return_exceptions=True)
+    found.update(zip(tasks, results))
+    return [found[key] for key in keys]
+
+
+async def call_batch(calls: List[Dict]) -> List[Dict]:
+    """
+    Run many {"tool", "args"} calls concurrently. Results come back in request
+    order as {"tool", "ok": True, "result"} or {"tool", "ok": False, "error", ...}.
+    Several calls to a tool with a native batch handler (mcp.batch) are grouped
+    into one handler call; the rest go through call_tool.
+    """
+    outcomes: List[Any] = [None] * len(calls)
+    groups: Dict[str, List[int]] = {}
+    singles: List[int] = []
+    for i, call in enumerate(calls):
+        name, args = call.get("tool"), call.get("args") or {}
+        tool = mcp.tools.get(name)
+        if name in mcp.batch_handlers and tool and call_key(name, tool, args) is not None:
+            groups.setdefault(name, []).append(i)
+        else:
+            singles.append(i)
+    for name in [n for n, indexes in groups.items() if len(indexes) < 2]:
+        singles += groups.pop(name)
+
+    async def run_single(i: int) -> None:
+        try:
+            outcomes[i] = await call_tool(calls[i].get("tool"), calls[i].get("args"))
+        except Exception as e:
+            outcomes[i] = e
+
+    async def run_group(name: str, indexes: List[int]) -> None:
+        results = await _call_native_batch(name, [calls[i].get("args") or {} for i in indexes])
+        for i, result in zip(indexes, results):
+            outcomes[i] = result
+
+    await asyncio.gather(
+        *(run_single(i) for i in singles),
+        *(run_group(name, indexes) for name, indexes in groups.items()),
+    )
+
+    entries = []
+    for call, outcome in zip(calls, outcomes):
+        name = call.get("tool")
+        if isinstance(outcome, Exception):
+            entries.append({"tool": name, "ok": False, **tool_error(name, outcome)})
+        elif not cacheable(outcome):  # the tool's own {"error": ...} result
+            entries.append({"tool": name, "ok": False, **outcome})
+        else:
+            entries.append({"tool": name, "ok": True, "result": outcome})
+    return entries
+
+
+def stats() -> Dict:
+    """Per-tool calls, executions, coalesced calls (upstream calls saved) and timeouts."""
+    return {
+        "saved_calls": sum(s["coalesced"] for s in _stats.values()),
+        "tools": {name: dict(counts) for name, counts in _stats.items()},
+    }
+
+
+def tool_error(tool_name: str, e: Exception) -> Dict:
+    """JSON error body shared by the run_tool endpoints."""
+    if isinstance(e, ToolNotFound):
+        return {"error": f"Tool '{tool_name}' not found", "available_tools": list(mcp.tools.keys())}
+    if isinstance(e, ToolTimeout):
+        return {"error": str(e), "type": "ToolTimeout"}
+    return {"error": str(e), "type": e.__class__.__name__}
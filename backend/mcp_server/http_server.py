@@ -1,10 +1,17 @@
 # backend/mcp_server/http_server.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import List
 from backend.mcp_server import mcp
+from backend.mcp_server.dispatch import call_tool, call_batch, ToolNotFound, ToolTimeout, tool_error, stats as dispatch_stats
+from backend.lib.tool_cache import tool_cache
+from backend.lib.llm_cache import get_llm_cache
+from backend.config import TOOL_BATCH_MAX_CALLS
 import traceback
 from backend.mcp_clients import demo_agent
+from backend.mcp_clients.openai_client import start_agent_pool, stop_agent_pool
 
 
 
@@ -20,7 +27,15 @@ import backend.mcp_server.tools.charts
 import backend.mcp_server.tools.alerts
 
 
-app = FastAPI(title="MCP HTTP API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Long-lived MCP sessions for /mcp/agent instead of a subprocess per query
+    await start_agent_pool()
+    yield
+    await stop_agent_pool()
+
+
+app = FastAPI(title="MCP HTTP API", lifespan=lifespan)
 
 # 🔑 Allow frontend (localhost:5173) to call backend
 app.add_middleware(
@@ -36,22 +51,40 @@ class ToolRequest(BaseModel):
     args: dict = {}
 
 
+class ToolCall(BaseModel):
+    tool: str
+    args: dict = {}
+
+
+class BatchRequest(BaseModel):
+    calls: List[ToolCall]
+
+
+# Registered before /tools/{tool_name} so "batch" isn't taken as a tool name
+@app.post("/tools/batch")
+async def run_batch(req: BatchRequest):
+    """
+    Run several tools in one request, concurrently.
+    Body: {"calls": [{"tool": "get_stock_price", "args": {"ticker": "SOFI"}}, ...]}
+    Response: {"results": [{"tool", "ok", "result"} or {"tool", "ok": false, "error", ...}, ...]} in call order.
+    """
+    if len(req.calls) > TOOL_BATCH_MAX_CALLS:
+        return {"error": f"Too many calls in one batch ({len(req.calls)} > {TOOL_BATCH_MAX_CALLS})"}
+    return {"results": await call_batch([call.model_dump() for call in req.calls])}
+
+
 @app.post("/tools/{tool_name}")
 async def run_tool(tool_name: str, req: ToolRequest):
     """
-    Run an MCP tool by name.
+    Run an MCP tool by name in the tool thread pool (see dispatch.py), so a slow
+    tool never blocks other requests.
     All exceptions are caught and returned as JSON instead of FastAPI's {"detail": ...}.
     """
     try:
-        tool = mcp.tools.get(tool_name)
-        if not tool:
-            return {
-                "error": f"Tool '{tool_name}' not found",
-                "available_tools": list(mcp.tools.keys()),
-            }
+        return await call_tool(tool_name, req.args)
 
-        result = tool(**req.args)
-        return result
+    except (ToolNotFound, ToolTimeout) as e:
+        return tool_error(tool_name, e)
 
     except Exception as e:
         # Print full traceback to backend logs
@@ -59,12 +92,17 @@ async def run_tool(tool_name: str, req: ToolRequest):
 
         # Return structured JSON to frontend
         return {
-            "error": str(e),
-            "type": e.__class__.__name__,
+            **tool_error(tool_name, e),
             "traceback": traceback.format_exc().splitlines()[-5:],  # last 5 lines for context
         }
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Tool result cache (entries, bytes, per-tool hits / misses), single-flight savings and the LLM response cache."""
+    return {**tool_cache.stats(), "single_flight": dispatch_stats(), "llm": get_llm_cache().stats()}
+
+
 # 👇 Debug: print registered tools on startup
 print("✅ Registered tools:", list(mcp.tools.keys()), flush=True)
 
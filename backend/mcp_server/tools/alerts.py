@@ -1,37 +1,62 @@
 # backend/mcp_server/tools/alerts.py
 from backend.mcp_server import mcp
-from backend.agents.reporter_agent import build_markdown_from_anomalies, normalize_anomaly
+from backend.agents.reporter_agent import build_report_model, iter_markdown_from_model, render_html, normalize_anomaly
 from backend.db.supabase_client import supabase
+from backend.db.alerts_repo import anomaly_fingerprint
+from backend.lib.report_cache import report_cache, content_hash
 from datetime import date
 
+FORMATS = ("markdown", "json", "html")
+
+
 @mcp.tool()
-def get_alerts_markdown(start_date: str = None) -> dict:
+def get_alerts_markdown(start_date: str = None, format: str = "markdown", refresh: bool = False) -> dict:
     """
     Fetch and render anomalies for a specific day.
     Only returns entries with exact trade_date = start_date.
+    format: "markdown" (default), "json" (structured report) or "html".
+    Rendered reports are cached per date and rebuilt when the date's rows
+    change; refresh=True forces a rebuild.
     """
     today = date.today().isoformat()
     target_date = start_date or today
-
-    print(f"📅 Fetching anomalies for {target_date}")
-
-    response = (
-        supabase.table("anomaly_reports")
-        .select("ticker, trade_date, anomaly_type, description")
-        .eq("trade_date", target_date)  # ✅ match exact date
-        .execute()
-    )
-
-    anomalies = [normalize_anomaly(a) for a in (response.data or [])]
-    print(f"✅ Found {len(anomalies)} anomalies for {target_date}")
-
-    md = build_markdown_from_anomalies(anomalies)
-
-    return {
+    if format not in FORMATS:
+        return {"error": f"Unknown format '{format}'", "formats": list(FORMATS)}
+
+    cached = None if refresh else report_cache.get(target_date, lambda: anomaly_fingerprint(target_date))
+    if cached:
+        digest, model = cached
+        print(f"📦 Serving cached report for {target_date} ({model['count']} anomalies)")
+    else:
+        print(f"📅 Fetching anomalies for {target_date}")
+        fingerprint = anomaly_fingerprint(target_date)  # before the read: later inserts must miss
+
+        response = (
+            supabase.table("anomaly_reports")
+            .select("ticker, trade_date, anomaly_type, description")
+            .eq("trade_date", target_date)  # ✅ match exact date
+            .order("id")
+            .execute()
+        )
+
+        anomalies = [normalize_anomaly(a) for a in (response.data or [])]
+        print(f"✅ Found {len(anomalies)} anomalies for {target_date}")
+
+        digest = content_hash(anomalies)
+        model = build_report_model(anomalies)
+        report_cache.put(target_date, digest, model, fingerprint)
+
+    result = {
         "date": target_date,
-        "count": len(anomalies),
-        "markdown": md
+        "count": model["count"],
+        "format": format,
+        "hash": digest,
+        "cached": bool(cached),
     }
-
-
-
+    if format == "json":
+        result["report"] = model
+    elif format == "html":
+        result["html"] = render_html(model)
+    else:
+        result["markdown"] = "".join(iter_markdown_from_model(model))
+    return result
@@ -3,7 +3,7 @@ from backend.db.supabase_client import supabase
 from datetime import date
 from typing import Optional
 
-@mcp.tool()
+@mcp.tool(cache_ttl=120)
 def detect_anomalies(ticker: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
     """
     Fetch anomalies for a given ticker from Supabase.
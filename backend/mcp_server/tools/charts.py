@@ -1,7 +1,8 @@
 import matplotlib.pyplot as plt
 import io, base64
-from backend.db.supabase_client import supabase
+from datetime import date, timedelta
 from backend.mcp_server import mcp
+from backend.lib.ohlcv_store import store, fetch_from_spac_data, to_records
 
 @mcp.tool()
 def plot_volume_chart(ticker: str, days: int = 10) -> dict:
@@ -9,15 +10,10 @@ def plot_volume_chart(ticker: str, days: int = 10) -> dict:
     Generate a volume chart for the given ticker.
     Returns a base64-encoded PNG.
     """
-    rows = (
-        supabase.table("spac_data")
-        .select("trade_date, volume")
-        .eq("ticker", ticker.upper())
-        .order("trade_date", desc=False)
-        .limit(days)
-        .execute()
-        .data
-    )
+    # Local store first (spac_data only for the missing tail); ~7/5 calendar days per session
+    start = date.today() - timedelta(days=days * 7 // 5 + 7)
+    stored, _ = store.read_through(ticker, start, fetch_from_spac_data)
+    rows = [{"trade_date": r["date"], "volume": r["volume"]} for r in to_records(stored[-days:])]
 
     if not rows:
         return {"error": f"No data for {ticker}"}
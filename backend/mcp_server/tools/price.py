@@ -1,10 +1,50 @@
 # backend/mcp_server/tools/price.py
+import re
+import threading
 import yfinance as yf
 import numpy as np
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+from typing import Dict, List, Optional
 from backend.mcp_server import mcp
+from backend.agents.data_agent import fetch_histories
+from backend.lib.ohlcv_store import store, fetch_from_yahoo, history_to_rows, to_records, live_to_records, COL
 
+# yf.download keeps its results in module-level state: one grouped download at a time
+_download_lock = threading.Lock()
 
-@mcp.tool()
+
+def period_start(period: str) -> Optional[date]:
+    """
+    Translate a Yahoo period ("5d", "1mo", "1y", "ytd", ...) into a start date.
+    Returns None for periods the local store can't serve (e.g. "max").
+    """
+    today = date.today()
+    period = period.lower()
+
+    if period == "ytd":
+        return date(today.year, 1, 1)
+
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        return None
+
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == "d" and period in ("1d", "5d"):
+        # Yahoo's native 1d/5d ranges count trading days, ending at the latest session
+        last_session = np.busday_offset(today, 0, roll="backward")
+        return np.busday_offset(last_session, -(n - 1)).astype(date)
+
+    delta = {
+        "d": relativedelta(days=n),
+        "wk": relativedelta(weeks=n),
+        "mo": relativedelta(months=n),
+        "y": relativedelta(years=n),
+    }[unit]
+    return today - delta
+
+
+@mcp.tool(cache_ttl=60)
 def get_stock_price(ticker: str, period: str = "1mo", interval: str = "1d") -> dict:
     """
     Fetch stock historical data (OHLCV) and compute support/resistance.
@@ -24,14 +64,20 @@ def get_stock_price(ticker: str, period: str = "1mo", interval: str = "1d") -> d
             "resistance": ...
         }
     """
+    start = period_start(period) if interval == "1d" else None
+
+    if start:
+        # Daily candles: local store first, Yahoo only for the missing tail (+ today's live bar)
+        return daily_price(ticker, period, start, fetch_from_yahoo)
+
     stock = yf.Ticker(ticker)
     hist = stock.history(period=period, interval=interval)
+    return price_summary(ticker, period, interval, history_prices(hist), hist["Close"].values)
 
-    if hist.empty:
-        return {"error": f"No data for {ticker} with period={period}, interval={interval}"}
 
-    # Convert rows to JSON-serializable list
-    prices = [
+def history_prices(hist) -> List[Dict]:
+    """Yahoo history frame → JSON-serializable price rows."""
+    return [
         {
             "date": str(idx.date()),
             "open": float(row["Open"]),
@@ -43,8 +89,19 @@ def get_stock_price(ticker: str, period: str = "1mo", interval: str = "1d") -> d
         for idx, row in hist.iterrows()
     ]
 
+
+def daily_price(ticker: str, period: str, start: date, fetcher) -> dict:
+    stored, live = store.read_through(ticker, start, fetcher, include_today=True)
+    prices = to_records(stored) + live_to_records(live)
+    closes = np.concatenate([stored[:, COL["close"]], [p["close"] for p in prices[len(stored):]]])
+    return price_summary(ticker, period, "1d", prices, closes)
+
+
+def price_summary(ticker: str, period: str, interval: str, prices: List[Dict], closes) -> dict:
+    if not prices:
+        return {"error": f"No data for {ticker} with period={period}, interval={interval}"}
+
     # Compute support/resistance from close prices
-    closes = hist["Close"].values
     support = float(np.percentile(closes, 25))   # lower quartile
     resistance = float(np.percentile(closes, 75)) # upper quartile
     latest_close = float(closes[-1])
@@ -60,4 +117,61 @@ def get_stock_price(ticker: str, period: str = "1mo", interval: str = "1d") -> d
     }
 
 
+def fetch_start(ticker: str, start: date) -> date:
+    """First day read_through() will ask Yahoo for when serving `start`."""
+    covered = store.covered_from(ticker)
+    last = store.last_date(ticker)
+    if covered is None or start < covered or last is None:
+        return start
+    missing = store.missing_sessions(ticker, start)  # holes are fetched too
+    return missing[0] if missing else last + timedelta(days=1)
+
+
+@mcp.batch("get_stock_price")
+def get_stock_prices(calls: List[Dict]) -> List:
+    """
+    Native batch for get_stock_price: tickers sharing (period, interval) come
+    from one grouped yf.download instead of one Yahoo request each. Daily calls
+    still go through the local store, with the grouped download as the fetcher.
+    """
+    results: List = [None] * len(calls)
+    groups: Dict[tuple, List[int]] = {}
+    for i, call in enumerate(calls):
+        groups.setdefault((call.get("period", "1mo"), call.get("interval", "1d")), []).append(i)
+
+    for (period, interval), indexes in groups.items():
+        tickers = sorted({calls[i]["ticker"].upper() for i in indexes})
+        start = period_start(period) if interval == "1d" else None
+
+        if start:
+            group_start = min(fetch_start(t, start) for t in tickers)
+            with _download_lock:
+                histories = fetch_histories(tickers, start=group_start.isoformat())
+            prefetched = {t: history_to_rows(h) for t, h in histories.items()}
+
+            def fetcher(ticker: str, from_day: date, to_day: Optional[date] = None) -> List[Dict]:
+                if from_day < group_start or ticker not in prefetched:
+                    return fetch_from_yahoo(ticker, from_day, to_day)
+                return [
+                    r for r in prefetched[ticker]
+                    if r["trade_date"] >= from_day.isoformat() and (to_day is None or r["trade_date"] < to_day.isoformat())
+                ]
+
+            def build(t: str) -> dict:
+                return daily_price(t, period, start, fetcher)
+        else:
+            with _download_lock:
+                histories = fetch_histories(tickers, period=period, interval=interval)
+
+            def build(t: str) -> dict:
+                hist = histories.get(t)
+                if hist is None:
+                    return price_summary(t, period, interval, [], [])
+                return price_summary(t, period, interval, history_prices(hist), hist["Close"].values)
 
+        for i in indexes:
+            try:
+                results[i] = build(calls[i]["ticker"].upper())
+            except Exception as e:
+                results[i] = e
+    return results
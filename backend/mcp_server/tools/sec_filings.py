@@ -3,7 +3,7 @@ import requests
 import os
 import json
 from backend.mcp_server import mcp
-from backend.lib.openai_client import client
+from backend.lib.openai_client import chat
 
 # 🔑 SEC-API.io Key & Bases
 SEC_API_KEY = os.getenv("SEC_API_KEY")
@@ -27,10 +27,14 @@ def save_cache(cache):
 
 
 # --- LLM Summarizer ---
+FILING_SUMMARY_TTL = 30 * 24 * 3600  # a filing's text never changes
+
+
 def summarize_filing(text: str, form_type: str) -> str:
     try:
-        response = client.chat.completions.create(
+        return chat(
             model="gpt-4o-mini",
+            ttl=FILING_SUMMARY_TTL,
             messages=[
                 {"role": "system", "content": "You are a financial analyst. Extract key facts clearly and concisely."},
                 {"role": "user", "content": (
@@ -41,7 +45,6 @@ def summarize_filing(text: str, form_type: str) -> str:
             ],
             max_tokens=300
         )
-        return response.choices[0].message.content.strip()
     except Exception as e:
         return f"⚠️ LLM summarization failed: {e}"
 
@@ -99,7 +102,9 @@ def get_filings(
         return cache[cache_key]
 
     # --- Build Query ---
-    query_str = f"ticker:{ticker.upper()} AND formType:({' OR '.join([f'\"{ft}\"' for ft in form_types])})"
+    # no backslashes inside f-string expressions (a SyntaxError before Python 3.12)
+    forms = " OR ".join(f'"{ft}"' for ft in form_types)
+    query_str = f"ticker:{ticker.upper()} AND formType:({forms})"
     payload = {
         "query": {"query_string": {"query": query_str}},
         "from": 0,
@@ -2,7 +2,7 @@
 from backend.mcp_server import mcp
 from backend.db.supabase_client import supabase
 
-@mcp.tool()
+@mcp.tool(cache_ttl=600, stale_ttl=3600)
 def list_tickers() -> dict:
     """
     Fetch distinct list of tickers from Supabase `spac_list`.
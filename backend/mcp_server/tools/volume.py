@@ -1,13 +1,27 @@
 # backend/mcp_server/tools/volume.py
 import yfinance as yf
+from datetime import date, timedelta
 from backend.mcp_server import mcp
+from backend.lib.ohlcv_store import store, fetch_from_yahoo, to_records, live_to_records
 
-@mcp.tool()
+@mcp.tool(cache_ttl=300)
 def get_volume_history(ticker: str, days: int = 30, interval: str = "1d"):
     """
     Fetch historical daily volume for a given ticker.
     """
     period = f"{days}d"  # convert number -> yfinance period string
+
+    if interval == "1d":
+        # Local store first, Yahoo only for the missing tail (+ today's live bar)
+        stored, live = store.read_through(ticker, date.today() - timedelta(days=days), fetch_from_yahoo, include_today=True)
+        history = [
+            {"date": r["date"], "volume": r["volume"]}
+            for r in to_records(stored) + live_to_records(live)
+        ]
+        if not history:
+            return {"error": f"No volume data for {ticker} with period={period}, interval={interval}"}
+        return {"ticker": ticker.upper(), "days": days, "interval": interval, "history": history}
+
     stock = yf.Ticker(ticker)
     hist = stock.history(period=period, interval=interval)
 
@@ -20,9 +34,3 @@ def get_volume_history(ticker: str, days: int = 30, interval: str = "1d"):
     ]
 
     return {"ticker": ticker.upper(), "days": days, "interval": interval, "history": history}
-
-
-
-
-
-
@@ -0,0 +1,113 @@
+# backend/scripts/benchmark_analyzer.py
+"""
+Compare the per-ticker and vectorized volume-rule engines on a synthetic universe.
+Checks the alerts are identical, then reports two things separately:
+
+- compute: measured time of the rules alone (no I/O). The vectorized engine
+  is NOT faster here; at small universes its fixed pandas overhead makes it slower.
+- round trips: Supabase queries each path makes (one per ticker vs. paged
+  IN-chunk queries) and their modelled cost at --rtt-ms each.
+
+The vectorized mode's gain is fewer round trips only.
+
+    python -m backend.scripts.benchmark_analyzer --tickers 100 1000 5000 --rtt-ms 40
+"""
+import argparse
+import math
+import random
+import time
+import pandas as pd
+from datetime import date, timedelta
+from backend.agents.analyzer_agent import evaluate_volume_rules, analyze_universe, LOOKBACK_ROWS
+from backend.db.spac_data_reader import IN_CHUNK
+
+PAGE_SIZE = 1000  # PostgREST max rows per page (see fetch_all)
+
+
+def make_universe(n_tickers: int, n_days: int = 15, seed: int = 42):
+    rng = random.Random(seed)
+    today = date.today()
+    rows, baselines = [], {}
+    for i in range(n_tickers):
+        ticker = f"T{i:05d}"
+        base = rng.choice([2_000, 8_000, 50_000, 400_000])
+        price = rng.choice([0.05, 0.19, 0.20, 1.5, 12.0])
+        for d in range(n_days):
+            if rng.random() < 0.1:
+                continue  # holes in history
+            volume = int(base * rng.lognormvariate(0, 0.6))
+            if d == 0 and rng.random() < 0.2:
+                volume *= rng.choice([4, 10])  # spikes on the latest day
+            rows.append({
+                "ticker": ticker,
+                "trade_date": (today - timedelta(days=d)).isoformat(),
+                "open": price, "high": price, "low": price,
+                "close": round(price * rng.uniform(0.9, 1.1), 4),
+                "volume": volume,
+            })
+        baselines[ticker] = (
+            rng.choice([None, 0, base, base * 1.3]),
+            rng.choice([None, base, base * 0.8]),
+        )
+    return rows, baselines
+
+
+def per_ticker(rows, baselines, tickers):
+    by_ticker = {}
+    for r in rows:
+        by_ticker.setdefault(r["ticker"], []).append(r)
+    alerts = []
+    for ticker in tickers:
+        latest = sorted(by_ticker.get(ticker, []), key=lambda r: r["trade_date"], reverse=True)[:LOOKBACK_ROWS]
+        avg10, avg90 = baselines[ticker]
+        alerts += evaluate_volume_rules(ticker, latest, avg10, avg90)
+    return alerts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, nargs="+", default=[100, 1_000, 5_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rtt-ms", type=float, default=40.0, help="modelled Supabase round trip per query")
+    args = parser.parse_args()
+
+    print(f"{'':>16}{'--- compute (measured) ---':^38}{'--- round trips (modelled) ---':^40}")
+    print(
+        f"{'tickers':>8} {'alerts':>7} {'per-ticker':>12} {'vectorized':>12} {'vec/loop':>8}   "
+        f"{'queries':>12} {'per-ticker':>12} {'vectorized':>12}"
+    )
+    for n in args.tickers:
+        rows, baselines = make_universe(n)
+        tickers = list(baselines)
+        frame = pd.DataFrame(rows)
+
+        t_loop = min(_timed(lambda: per_ticker(rows, baselines, tickers)) for _ in range(args.repeat))
+        t_vec = min(_timed(lambda: analyze_universe(frame, baselines, tickers)) for _ in range(args.repeat))
+
+        expected = per_ticker(rows, baselines, tickers)
+        actual = analyze_universe(frame, baselines, tickers)
+        assert actual == expected, "vectorized alerts differ from the per-ticker path"
+
+        # per-ticker: one spac_data query per ticker; vectorized: paged queries per IN chunk
+        q_loop = n
+        rows_per_ticker = frame.groupby("ticker").size()
+        q_vec = sum(
+            max(1, math.ceil(rows_per_ticker.reindex(tickers[i:i + IN_CHUNK]).fillna(0).sum() / PAGE_SIZE))
+            for i in range(0, n, IN_CHUNK)
+        )
+
+        # ratio > 1 means the vectorized compute is slower
+        print(
+            f"{n:>8} {len(actual):>7} {t_loop * 1000:>10.1f}ms {t_vec * 1000:>10.1f}ms {t_vec / t_loop:>7.2f}x   "
+            f"{q_loop:>6}/{q_vec:<5} {q_loop * args.rtt_ms / 1000:>11.2f}s {q_vec * args.rtt_ms / 1000:>11.2f}s"
+        )
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    main()
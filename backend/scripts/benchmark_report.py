@@ -0,0 +1,171 @@
+# backend/scripts/benchmark_report.py
+"""
+Compare the previous string-concatenation report builder with the linear
+iter_markdown_report() on synthetic anomalies. Checks the Markdown is
+byte-identical and prints build times (plus streaming to a temp file).
+
+    python -m backend.scripts.benchmark_report --anomalies 10000 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date
+from backend.agents import reporter_agent
+from backend.agents.reporter_agent import build_markdown_from_anomalies, stream_markdown_report
+
+DESCRIPTIONS = {
+    "Volume": [
+        "{t} had very low volume (1,200) at price ${p}",
+        "{t} had zero volume (0) today",
+        "{t} volume 950,000 >3× 10-day avg",
+        "{t} volume 950,000 >3× 90-day avg",
+        "{t} volume 950,000 >3× local 5-day avg",
+    ],
+    "Lifecycle": ["{t} reached 6 months since IPO", "{t} reached 12 months since IPO"],
+    "Risk": ["{t} is listed in a high-risk country", "{t} trades on an OTC exchange"],
+}
+
+
+def make_anomalies(n: int, seed: int = 42) -> list:
+    """n anomalies over ~n/5 tickers, so plenty of tickers span several categories."""
+    rng = random.Random(seed)
+    today = date.today().isoformat()
+    n_tickers = max(1, n // 5)
+    anomalies = []
+    for _ in range(n):
+        ticker = f"T{rng.randrange(n_tickers):06d}"
+        anomaly_type = rng.choice(["Volume", "Volume", "Lifecycle", "Risk"])
+        description = rng.choice(DESCRIPTIONS[anomaly_type]).format(t=ticker, p=rng.choice([0.2, 1.5, 12.0]))
+        anomalies.append({"ticker": ticker, "trade_date": today, "anomaly_type": anomaly_type, "description": description})
+    return anomalies
+
+
+def legacy_build_markdown(anomalies: list) -> str:
+    """The previous += builder (quadratic priority section), kept as the reference output."""
+    if not anomalies:
+        return "# 📊 Daily SPAC Alerts\n\n✅ No anomalies today."
+
+    # Normalize anomalies
+    grouped = {}
+    ticker_categories = {}
+    for a in anomalies:
+        ticker = a["ticker"]
+        anomaly_type = a["anomaly_type"]
+
+        grouped.setdefault(anomaly_type, []).append(a)
+        ticker_categories.setdefault(ticker, set()).add(anomaly_type)
+
+    content = "# 📊 Daily SPAC Alerts\n\n"
+
+    # ---- Priority Section: Multi-category tickers ----
+    priority = [t for t, cats in ticker_categories.items() if len(cats) > 1]
+    if priority:
+        content += "## ⚠️ Priority: Multi-Category Tickers\n\n"
+        for ticker in sorted(priority):
+            cats = ", ".join(sorted(ticker_categories[ticker]))
+            ticker_anomalies = [a for a in anomalies if a["ticker"] == ticker]
+            content += f"- [**{ticker}**]({ticker}) → in categories: *{cats}*\n"
+            for a in sorted(ticker_anomalies, key=lambda x: x["anomaly_type"]):
+                content += f"  - ({a['trade_date']}) [{a['anomaly_type']}] {a['description']}\n"
+            content += "\n"
+
+    # ---- Organize Volume Alerts (deduped + merged per ticker) ----
+    if "Volume" in grouped:
+        merged = {}
+        for a in grouped["Volume"]:
+            ticker = a["ticker"]
+            desc = a["description"]
+
+            # Normalize duplicate ANNA-type messages
+            desc = desc.replace(f"{ticker} ($", f"{ticker} ($").replace(f"{ticker} had", f"{ticker} had")
+
+            if ticker not in merged:
+                merged[ticker] = {
+                    "trade_date": a["trade_date"],
+                    "lows": [],
+                    "spikes": [],
+                    "zeros": []
+                }
+
+            if "very low volume" in desc:
+                merged[ticker]["lows"].append(desc)
+            elif "zero volume" in desc or "(0)" in desc:
+                merged[ticker]["zeros"].append(desc)
+            else:
+                merged[ticker]["spikes"].append(desc)
+
+        content += "## 🔹 Volume Alerts\n\n"
+
+        # Very Low Volume
+        low_tickers = {t: d for t, d in merged.items() if d["lows"]}
+        if low_tickers:
+            content += "### 🔻 Very Low Volume (Price ≥ $0.20)\n\n"
+            for ticker, data in sorted(low_tickers.items()):
+                # Dedup reasons
+                reasons = list(set(data["lows"]))
+                content += f"- [**{ticker}**]({ticker}) ({data['trade_date']}) → {'; '.join(reasons)}\n"
+
+            content += "\n"
+
+        # Volume Spikes
+        spike_tickers = {t: d for t, d in merged.items() if d["spikes"]}
+        if spike_tickers:
+            content += "### 🚀 Volume Spikes\n\n"
+            for ticker, data in sorted(spike_tickers.items()):
+                reasons = list(set(data["spikes"]))
+                content += f"- [**{ticker}**]({ticker}) ({data['trade_date']}) → {'; '.join(reasons)}\n"
+            content += "\n"
+
+        # Zero Volume
+        zero_tickers = {t: d for t, d in merged.items() if d["zeros"]}
+        if zero_tickers:
+            content += "### ⚠️ Suspicious Zero-Volume\n\n"
+            for ticker, data in sorted(zero_tickers.items()):
+                reasons = list(set(data["zeros"]))
+                content += f"- [**{ticker}**]({ticker}) ({data['trade_date']}) → {'; '.join(reasons)}\n"
+            content += "\n"
+
+        grouped.pop("Volume")
+
+    # ---- Remaining Categories ----
+    for category, alerts in grouped.items():
+        content += f"## 🔹 {category} Alerts\n\n"
+        for a in sorted(alerts, key=lambda x: x["ticker"]):
+            content += f"- [**{a['ticker']}**]({a['ticker']}) ({a['trade_date']}) → {a['description']}\n"
+        content += "\n"
+
+    return content
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--anomalies", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'anomalies':>10} | {'legacy':>9} | {'linear':>9} | {'stream':>9} | {'speedup':>8} | identical")
+    for n in args.anomalies:
+        anomalies = make_anomalies(n)
+        old, t_old = timed(legacy_build_markdown, anomalies)
+        new, t_new = timed(build_markdown_from_anomalies, anomalies)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            reporter_agent.REPORTS_DIR = tmp
+            path, t_stream = timed(stream_markdown_report, anomalies, "bench.md")
+            with open(path, encoding="utf-8") as f:
+                streamed = f.read()
+            size = os.path.getsize(path)
+
+        identical = old == new == streamed
+        assert identical, "report output differs from the legacy builder"
+        print(
+            f"{n:>10} | {t_old:>8.3f}s | {t_new:>8.3f}s | {t_stream:>8.3f}s | {t_old / t_new:>7.1f}× | "
+            f"{identical} ({size / 1024:.0f} KiB)"
+        )
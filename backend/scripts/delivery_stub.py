@@ -0,0 +1,85 @@
+# backend/scripts/delivery_stub.py
+"""
+Local HTTP stub for exercising the delivery worker without Discord.
+Accepts Discord-style multipart posts and JSON webhook posts, and can inject
+rate limits and server errors.
+
+    python -m backend.scripts.delivery_stub --port 8765 --rate-limit-every 3 --fail-every 4
+    DISCORD_WEBHOOK_URL=http://127.0.0.1:8765/discord python -m backend.agents.reporter_agent
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    counter = 0
+    lock = threading.Lock()
+    rate_limit_every = 0
+    fail_every = 0
+    retry_after = 1.0
+    bucket_size = 5
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        with StubHandler.lock:
+            StubHandler.counter += 1
+            n = StubHandler.counter
+
+        if self.rate_limit_every and n % self.rate_limit_every == 0:
+            self._reply(429, {"message": "You are being rate limited.", "retry_after": self.retry_after},
+                        {"Retry-After": str(self.retry_after)})
+            print(f"#{n} {self.path} → 429 (retry after {self.retry_after}s)")
+            return
+        if self.fail_every and n % self.fail_every == 0:
+            self._reply(503, {"message": "stub failure"})
+            print(f"#{n} {self.path} → 503")
+            return
+
+        kind = self.headers.get("Content-Type", "").split(";")[0]
+        remaining = self.bucket_size - 1 - (n % self.bucket_size)
+        headers = {"X-RateLimit-Limit": str(self.bucket_size), "X-RateLimit-Remaining": str(remaining),
+                   "X-RateLimit-Reset-After": "0.5"}
+        if kind == "application/json":
+            payload = json.loads(body or b"{}")
+            print(f"#{n} {self.path} → 200 JSON part {payload.get('part')}/{payload.get('parts')} "
+                  f"({len(payload.get('content', ''))} chars)")
+        else:
+            print(f"#{n} {self.path} → 204 multipart ({len(body)} bytes)")
+        self._reply(204 if kind != "application/json" else 200, None, headers)
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass  # one line per request is printed above
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every Nth request with 503")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    args = parser.parse_args()
+
+    StubHandler.rate_limit_every = args.rate_limit_every
+    StubHandler.fail_every = args.fail_every
+    StubHandler.retry_after = args.retry_after
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StubHandler)
+    print(f"🧪 Delivery stub listening on http://127.0.0.1:{args.port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
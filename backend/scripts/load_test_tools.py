@@ -0,0 +1,101 @@
+# backend/scripts/load_test_tools.py
+"""
+Fire concurrent requests at POST /tools/{tool_name} and report latency and
+throughput.
+
+Against a running server:
+    python -m backend.scripts.load_test_tools --url http://127.0.0.1:8000 --tool get_stock_price \
+        --args '{"ticker": "SOFI"}' --requests 40 --concurrency 20
+
+In process, with a synthetic blocking tool (time.sleep), comparing the old
+inline call with the thread-pool dispatch:
+    python -m backend.scripts.load_test_tools --synthetic 0.5 --requests 20 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from typing import Callable, Dict, List, Union
+import httpx
+
+
+async def fire(client: httpx.AsyncClient, path: str, args: Union[Dict, Callable[[int], Dict]],
+               n: int, concurrency: int) -> Dict:
+    """args is the same dict for every request, or a function of the request index."""
+    limit = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with limit:
+            t0 = time.perf_counter()
+            response = await client.post(path, json={"args": args(i) if callable(args) else args})
+            latencies.append(time.perf_counter() - t0)
+            body = response.json()
+            if response.status_code != 200 or (isinstance(body, dict) and "error" in body):
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "requests": n,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "req_per_s": round(n / wall, 1),
+        "p50_s": round(statistics.median(latencies), 3),
+        "p95_s": round(latencies[int(0.95 * (len(latencies) - 1))], 3),
+    }
+
+
+def synthetic_app(delay: float):
+    """http_server.app plus a blocking tool and the pre-dispatch inline endpoint for comparison."""
+    from backend.mcp_server import mcp
+    from backend.mcp_server.http_server import app, ToolRequest
+
+    @mcp.tool()
+    def load_test_sleep(seconds: float = delay, n: int = 0) -> dict:
+        time.sleep(seconds)
+        return {"slept": seconds, "n": n}
+
+    @app.post("/inline/{tool_name}")
+    async def run_tool_inline(tool_name: str, req: ToolRequest):
+        return mcp.tools[tool_name](**req.args)  # blocks the event loop, as run_tool used to
+
+    return app
+
+
+async def main(args) -> None:
+    if args.synthetic:
+        app = synthetic_app(args.synthetic)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            for label, path in [("inline (before)", "/inline/load_test_sleep"),
+                                ("dispatch (after)", "/tools/load_test_sleep")]:
+                # Distinct args per request, or single flight would run them all as one call
+                result = await fire(client, path, lambda i: {"n": i}, args.requests, args.concurrency)
+                print(f"{label:17} {result}")
+        from backend.mcp_server import dispatch
+        print(f"{'dispatch stats':17} {dispatch.stats()['tools'].get('load_test_sleep')}")
+        return
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        result = await fire(client, f"/tools/{args.tool}", json.loads(args.args), args.requests, args.concurrency)
+    print(f"{args.tool}: {result}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--tool", default="get_stock_price")
+    parser.add_argument("--args", default='{"ticker": "SOFI"}', help="tool arguments as JSON")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--synthetic", type=float, default=0, metavar="SECONDS",
+                        help="run in process against a tool that sleeps this long")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,10 @@
+# backend/services/delivery/__init__.py
+"""
+Outbound delivery: reports are queued in a local SQLite outbox and an async
+worker delivers them to the configured channels (Discord, webhook, email)
+with retries, backoff and rate-limit handling. Results land in alerts_log.
+"""
+from backend.services.delivery.channels import Channel, register_channel, configured_channels
+from backend.services.delivery.worker import enqueue_report, drain, last_delivery_at
+
+__all__ = ["Channel", "register_channel", "configured_channels", "enqueue_report", "drain", "last_delivery_at"]
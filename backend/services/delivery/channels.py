@@ -0,0 +1,238 @@
+# backend/services/delivery/channels.py
+import asyncio
+import os
+import smtplib
+import time
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+import httpx
+from backend.config import (
+    DISCORD_WEBHOOK_URL, DISCORD_MAX_FILE_BYTES, DELIVERY_WEBHOOK_URL, DELIVERY_WEBHOOK_MAX_BYTES,
+    SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, REPORT_EMAIL_FROM, REPORT_EMAIL_TO,
+)
+
+DISCORD_MAX_CONTENT = 2000  # characters in a Discord message body
+
+
+# --- Errors a channel raises to steer the worker ---
+class RetryableError(Exception):
+    """Temporary failure (network, 5xx): retried with exponential backoff."""
+
+
+class RateLimited(RetryableError):
+    """The remote asked us to wait (HTTP 429); retried after `retry_after` seconds."""
+
+    def __init__(self, retry_after: float, message: str = "rate limited"):
+        super().__init__(f"{message} (retry after {retry_after:.1f}s)")
+        self.retry_after = retry_after
+
+
+class PermanentError(Exception):
+    """The message can never be delivered as is (4xx, missing file): not retried."""
+
+
+def split_markdown(content: str, max_bytes: int) -> List[str]:
+    """
+    Split a report on line boundaries into parts of at most max_bytes (UTF-8).
+    A part always holds at least one character, even if max_bytes is smaller.
+    """
+    if max_bytes < 1:
+        raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+    if len(content.encode("utf-8")) <= max_bytes:
+        return [content]
+
+    parts: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in content.splitlines(keepends=True):
+        encoded = len(line.encode("utf-8"))
+        while encoded > max_bytes:  # a single oversized line is cut hard
+            cut = line.encode("utf-8")[:max_bytes].decode("utf-8", "ignore") or line[0]
+            if current:
+                parts.append("".join(current))
+                current, size = [], 0
+            parts.append(cut)
+            line = line[len(cut):]
+            encoded = len(line.encode("utf-8"))
+        if not line:
+            continue
+        if size + encoded > max_bytes and current:
+            parts.append("".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += encoded
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def check_response(response: httpx.Response) -> None:
+    """Map an HTTP response onto delivered / RateLimited / RetryableError / PermanentError."""
+    if response.status_code == 429:
+        retry_after = response.headers.get("retry-after") or response.headers.get("x-ratelimit-reset-after")
+        try:
+            retry_after = float(retry_after) if retry_after else float(response.json().get("retry_after", 1))
+        except ValueError:
+            retry_after = 1.0
+        raise RateLimited(retry_after)
+    if response.status_code >= 500:
+        raise RetryableError(f"HTTP {response.status_code}")
+    if response.status_code >= 400:
+        raise PermanentError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+
+class Channel:
+    """
+    One outbound destination. send() delivers message parts in order, starting
+    after `parts_sent`, and calls on_part(n) after each part so a retry resumes
+    where the last attempt stopped.
+    """
+
+    name = "channel"
+
+    def parts(self, content: str) -> List[str]:
+        return [content]
+
+    async def send_part(self, client: httpx.AsyncClient, payload: Dict, part: str, index: int, total: int) -> None:
+        raise NotImplementedError
+
+    async def send(self, client: httpx.AsyncClient, payload: Dict, content: str, parts_sent: int, on_part) -> None:
+        parts = self.parts(content)
+        for i in range(parts_sent, len(parts)):
+            await self.send_part(client, payload, parts[i], i, len(parts))
+            on_part(i + 1)
+
+
+class DiscordChannel(Channel):
+    """
+    Discord webhook: the report goes as a .md attachment with the summary as
+    message text. Reports above DISCORD_MAX_FILE_BYTES are split into several
+    attachments. Discord's X-RateLimit-* headers are honoured proactively, and
+    429s surface as RateLimited with the advertised Retry-After.
+    """
+
+    name = "discord"
+
+    def __init__(self, webhook_url: str, max_file_bytes: int = DISCORD_MAX_FILE_BYTES):
+        self.webhook_url = webhook_url
+        self.max_file_bytes = max_file_bytes
+        self._blocked_until = 0.0  # bucket exhausted until this monotonic time
+
+    def parts(self, content: str) -> List[str]:
+        return split_markdown(content, self.max_file_bytes)
+
+    def _remember_bucket(self, response: httpx.Response) -> None:
+        if response.headers.get("x-ratelimit-remaining") == "0":
+            reset_after = float(response.headers.get("x-ratelimit-reset-after", "1"))
+            self._blocked_until = time.monotonic() + reset_after
+
+    async def send_part(self, client, payload, part, index, total):
+        wait = self._blocked_until - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        title = payload["title"] if total == 1 else f"{payload['title']} (part {index + 1}/{total})"
+        text = f"{title}\n{payload['summary']}" if index == 0 else title
+        filename = os.path.basename(payload["file"])
+        if total > 1:
+            filename = filename.replace(".md", f"_part{index + 1}.md")
+
+        response = await client.post(
+            self.webhook_url,
+            data={"content": text[:DISCORD_MAX_CONTENT]},
+            files={"file": (filename, part.encode("utf-8"), "text/markdown")},
+        )
+        self._remember_bucket(response)
+        check_response(response)
+
+
+class WebhookChannel(Channel):
+    """Generic JSON webhook: {title, summary, part, parts, content} per chunk."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, max_bytes: int = DELIVERY_WEBHOOK_MAX_BYTES):
+        self.url = url
+        self.max_bytes = max_bytes
+
+    def parts(self, content: str) -> List[str]:
+        return split_markdown(content, self.max_bytes)
+
+    async def send_part(self, client, payload, part, index, total):
+        response = await client.post(self.url, json={
+            "title": payload["title"],
+            "summary": payload["summary"],
+            "date": payload.get("date"),
+            "part": index + 1,
+            "parts": total,
+            "content": part,
+        })
+        check_response(response)
+
+
+class EmailChannel(Channel):
+    """SMTP email with the report attached (smtplib runs in a worker thread)."""
+
+    name = "email"
+
+    def __init__(self, host: str, port: int, sender: str, recipients: List[str],
+                 user: Optional[str] = None, password: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+        self.user = user
+        self.password = password
+
+    def _send_sync(self, payload: Dict, content: str) -> None:
+        msg = EmailMessage()
+        msg["Subject"] = payload["title"]
+        msg["From"] = self.sender
+        msg["To"] = ", ".join(self.recipients)
+        msg.set_content(payload["summary"])
+        msg.add_attachment(content.encode("utf-8"), maintype="text", subtype="markdown",
+                           filename=os.path.basename(payload["file"]))
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+                if self.user:
+                    smtp.starttls()
+                    smtp.login(self.user, self.password or "")
+                smtp.send_message(msg)
+        except smtplib.SMTPResponseException as e:
+            if 400 <= e.smtp_code < 500:
+                raise RetryableError(f"SMTP {e.smtp_code}: {e.smtp_error!r}")
+            raise PermanentError(f"SMTP {e.smtp_code}: {e.smtp_error!r}")
+        except (OSError, smtplib.SMTPException) as e:
+            raise RetryableError(f"SMTP error: {e}")
+
+    async def send_part(self, client, payload, part, index, total):
+        await asyncio.to_thread(self._send_sync, payload, part)
+
+
+# --- Registry ---
+_channels: Dict[str, Channel] = {}
+
+
+def register_channel(channel: Channel) -> None:
+    """Add (or replace) a delivery channel by name."""
+    _channels[channel.name] = channel
+
+
+def get_channel(name: str) -> Optional[Channel]:
+    return _channels.get(name)
+
+
+def configured_channels() -> List[str]:
+    return list(_channels)
+
+
+# Channels enabled by configuration
+if DISCORD_WEBHOOK_URL:
+    register_channel(DiscordChannel(DISCORD_WEBHOOK_URL))
+if DELIVERY_WEBHOOK_URL:
+    register_channel(WebhookChannel(DELIVERY_WEBHOOK_URL))
+if SMTP_HOST and REPORT_EMAIL_TO:
+    register_channel(EmailChannel(
+        SMTP_HOST, SMTP_PORT, REPORT_EMAIL_FROM, [r.strip() for r in REPORT_EMAIL_TO.split(",") if r.strip()],
+        SMTP_USER, SMTP_PASSWORD,
+    ))
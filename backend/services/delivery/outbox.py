@@ -0,0 +1,136 @@
+# backend/services/delivery/outbox.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from backend.config import DELIVERY_OUTBOX_DB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,              -- channel name, e.g. "discord"
+    alert_date TEXT NOT NULL,
+    log_channel TEXT NOT NULL,          -- alerts_log label, e.g. "discord:delta"
+    dedupe_key TEXT UNIQUE,             -- a report is queued at most once per key
+    payload TEXT NOT NULL,              -- JSON: title, summary, file, built_at
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending | sending | sent | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    parts_sent INTEGER NOT NULL DEFAULT 0,   -- chunks already delivered (resume point)
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due_idx ON outbox (status, next_attempt_at);
+"""
+
+
+class Outbox:
+    """
+    Persistent local queue of outbound messages (SQLite). The reporter enqueues
+    and returns immediately; a delivery worker drains due messages, so a slow
+    or failing channel never blocks the workflow and nothing is lost on crash.
+    """
+
+    def __init__(self, path: str = DELIVERY_OUTBOX_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, channel: str, alert_date: str, log_channel: str, payload: Dict,
+                dedupe_key: Optional[str] = None) -> Optional[int]:
+        """Queue a message. Returns its id, or None if dedupe_key was already queued."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO outbox "
+                "(channel, alert_date, log_channel, dedupe_key, payload, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (channel, alert_date, log_channel, dedupe_key, json.dumps(payload), now, now, now),
+            )
+            return cur.lastrowid if cur.rowcount else None
+
+    def claim_due(self, limit: int = 100) -> List[Dict]:
+        """Mark due pending messages as 'sending' and return them (oldest first)."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            ids = [row["id"] for row in rows]
+            conn.executemany(
+                "UPDATE outbox SET status = 'sending', updated_at = ? WHERE id = ?",
+                [(now, i) for i in ids],
+            )
+        return [{**dict(row), "payload": json.loads(row["payload"])} for row in rows]
+
+    def release_stale(self, older_than: float = 600) -> int:
+        """Put messages stuck in 'sending' (worker died mid-send) back in the queue."""
+        cutoff = time.time() - older_than
+        with self._lock, self._connect() as conn:
+            return conn.execute(
+                "UPDATE outbox SET status = 'pending' WHERE status = 'sending' AND updated_at < ?",
+                (cutoff,),
+            ).rowcount
+
+    def progress(self, message_id: int, parts_sent: int) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET parts_sent = ?, updated_at = ? WHERE id = ?",
+                (parts_sent, time.time(), message_id),
+            )
+
+    def mark_sent(self, message_id: int) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'sent', last_error = NULL, updated_at = ? WHERE id = ?",
+                (time.time(), message_id),
+            )
+
+    def mark_retry(self, message_id: int, delay: float, error: str, count_attempt: bool = True) -> None:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'pending', attempts = attempts + ?, next_attempt_at = ?, "
+                "last_error = ?, updated_at = ? WHERE id = ?",
+                (int(count_attempt), now + delay, error, now, message_id),
+            )
+
+    def mark_failed(self, message_id: int, error: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'failed', attempts = attempts + 1, last_error = ?, updated_at = ? "
+                "WHERE id = ?",
+                (error, time.time(), message_id),
+            )
+
+    def pending_count(self) -> int:
+        with self._lock, self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox WHERE status IN ('pending', 'sending')").fetchone()[0]
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next pending message is due (None if the queue is empty)."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'").fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def latest_built_at(self, alert_date: str) -> Optional[str]:
+        """Build time of the newest report queued for alert_date (delivered or not)."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM outbox WHERE alert_date = ? AND status != 'failed'", (alert_date,)
+            ).fetchall()
+        built = [json.loads(r["payload"]).get("built_at") for r in rows]
+        built = [b for b in built if b]
+        return max(built) if built else None
@@ -0,0 +1,190 @@
+# backend/services/delivery/worker.py
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+import httpx
+from backend.config import (
+    DELIVERY_MAX_ATTEMPTS, DELIVERY_BACKOFF_SECONDS, DELIVERY_MAX_BACKOFF_SECONDS, DELIVERY_SEND_TIMEOUT,
+)
+from backend.db.alerts_repo import already_reported, last_report_at, log_report
+from backend.services.delivery.channels import (
+    RateLimited, RetryableError, PermanentError, get_channel, configured_channels,
+)
+from backend.services.delivery.outbox import Outbox
+
+_outbox: Optional[Outbox] = None
+
+
+def get_outbox() -> Outbox:
+    """Shared outbox (created on first use so importing this module touches no files)."""
+    global _outbox
+    if _outbox is None:
+        _outbox = Outbox()
+    return _outbox
+
+
+def backoff(attempts: int) -> float:
+    """Exponential backoff with jitter: base * 2^(attempts-1), capped, ±50%."""
+    delay = min(DELIVERY_MAX_BACKOFF_SECONDS, DELIVERY_BACKOFF_SECONDS * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+# --- Producer side ---
+def enqueue_report(path: str, title: str, summary: str, target_date: str, built_at: str, delta: bool = False) -> int:
+    """
+    Queue a rendered report for every configured channel and return how many
+    messages were queued. Full reports are queued once per date and channel
+    (skipped if alerts_log already has them); every delta is a new message.
+    """
+    channels = configured_channels()
+    if not channels:
+        print("⚠️ No delivery channel configured (DISCORD_WEBHOOK_URL, DELIVERY_WEBHOOK_URL or SMTP_HOST)")
+        return 0
+
+    outbox = get_outbox()
+    payload = {"file": path, "title": title, "summary": summary, "date": target_date, "built_at": built_at}
+    queued = 0
+    for name in channels:
+        log_channel = f"{name}:delta" if delta else name
+        if not delta and already_reported(target_date, name):
+            print(f"⏩ Report for {target_date} already sent to {name}")
+            continue
+        dedupe_key = f"{target_date}:{log_channel}" + (f":{built_at}" if delta else "")
+        if outbox.enqueue(name, target_date, log_channel, payload, dedupe_key) is None:
+            print(f"⏩ Report for {target_date} already queued for {name}")
+            continue
+        queued += 1
+    if queued:
+        print(f"📬 Queued report for {queued} channel(s)")
+    return queued
+
+
+def last_delivery_at(target_date: str) -> Optional[str]:
+    """Build time of the latest report for the date, delivered (alerts_log) or still queued."""
+    channels = configured_channels()
+    if not channels:
+        return None
+    marks = [last_report_at(target_date, channels), get_outbox().latest_built_at(target_date)]
+    marks = [m for m in marks if m]
+    return max(marks) if marks else None
+
+
+# --- Consumer side ---
+async def deliver(client: httpx.AsyncClient, outbox: Outbox, message: Dict) -> str:
+    """Send one queued message. Returns 'sent', 'retry' or 'failed'."""
+    message_id = message["id"]
+    payload = message["payload"]
+    log_channel = message["log_channel"]
+
+    channel = get_channel(message["channel"])
+    try:
+        if channel is None:
+            raise PermanentError(f"channel '{message['channel']}' is not configured")
+        with open(payload["file"], "r", encoding="utf-8") as f:
+            content = f.read()
+        await asyncio.wait_for(
+            channel.send(client, payload, content, message["parts_sent"], lambda n: outbox.progress(message_id, n)),
+            timeout=DELIVERY_SEND_TIMEOUT,
+        )
+    except RateLimited as e:
+        # The remote told us exactly when to come back; doesn't burn an attempt
+        outbox.mark_retry(message_id, e.retry_after, str(e), count_attempt=False)
+        print(f"⏳ {log_channel} rate limited, retrying in {e.retry_after:.1f}s")
+        return "retry"
+    except (RetryableError, httpx.TransportError, asyncio.TimeoutError) as e:
+        return _retry(outbox, message, str(e) or type(e).__name__)
+    except (PermanentError, OSError) as e:
+        return _fail(outbox, message, str(e))
+    except Exception as e:
+        # A bug or an unexpected library error: retry (bounded by attempts) instead
+        # of leaving the row in 'sending' until release_stale()
+        return _retry(outbox, message, f"{type(e).__name__}: {e}")
+
+    outbox.mark_sent(message_id)
+    print(f"✅ Report for {message['alert_date']} delivered to {log_channel}")
+    try:
+        log_report(message["alert_date"], log_channel, created_at=payload.get("built_at"), message=payload["summary"])
+    except Exception as e:
+        print(f"⚠️ Delivered but failed to log to alerts_log: {e}")
+    return "sent"
+
+
+def _retry(outbox: Outbox, message: Dict, error: str) -> str:
+    attempts = message["attempts"] + 1
+    if attempts < DELIVERY_MAX_ATTEMPTS:
+        delay = backoff(attempts)
+        outbox.mark_retry(message["id"], delay, error)
+        print(f"🔁 {message['log_channel']} delivery failed ({error}), attempt {attempts}/{DELIVERY_MAX_ATTEMPTS}, retry in {delay:.1f}s")
+        return "retry"
+    return _fail(outbox, message, f"gave up after {attempts} attempts: {error}")
+
+
+def _fail(outbox: Outbox, message: Dict, error: str) -> str:
+    outbox.mark_failed(message["id"], error)
+    print(f"❌ {message['log_channel']} delivery failed permanently: {error}")
+    try:
+        log_report(message["alert_date"], f"{message['log_channel']}:failed", message=error[:500])
+    except Exception as e:
+        print(f"⚠️ Failed to log delivery failure to alerts_log: {e}")
+    return "failed"
+
+
+async def drain(timeout: Optional[float] = None, forever: bool = False, poll_seconds: float = 5.0,
+                outbox: Optional[Outbox] = None) -> Dict[str, int]:
+    """
+    Deliver due messages until the queue is empty (waiting out retries), the
+    timeout expires, or forever. Channels are drained concurrently; messages
+    on one channel go in order, one at a time, to respect its rate limits.
+    """
+    outbox = outbox or get_outbox()
+    outbox.release_stale()
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    stats = {"sent": 0, "retry": 0, "failed": 0}
+
+    async def run_channel(messages: List[Dict]) -> None:
+        for message in messages:
+            try:
+                result = await deliver(client, outbox, message)
+            except Exception as e:  # outbox bookkeeping failed; release_stale() requeues it
+                print(f"💥 {message['log_channel']} delivery bookkeeping failed: {e}")
+                result = "retry"
+            stats[result] += 1
+
+    async with httpx.AsyncClient(timeout=DELIVERY_SEND_TIMEOUT) as client:
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+            due = outbox.claim_due()
+            if due:
+                by_channel: Dict[str, List[Dict]] = {}
+                for message in due:
+                    by_channel.setdefault(message["channel"], []).append(message)
+                await asyncio.gather(*(run_channel(msgs) for msgs in by_channel.values()))
+                continue
+
+            wait = outbox.next_due_in()
+            if wait is None:
+                if not forever:
+                    break
+                wait = poll_seconds
+            if deadline is not None:
+                wait = min(wait, max(0.0, deadline - time.monotonic()))
+            await asyncio.sleep(max(wait, 0.05))
+
+    left = outbox.pending_count()
+    if left:
+        print(f"📮 {left} message(s) left in the outbox for the delivery worker")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drain the outbound delivery queue")
+    parser.add_argument("--forever", action="store_true", help="keep polling for new messages")
+    parser.add_argument("--timeout", type=float, default=None, help="stop after this many seconds")
+    args = parser.parse_args()
+    print(f"📤 Delivery worker: channels={configured_channels() or 'none'}")
+    result = asyncio.run(drain(timeout=args.timeout, forever=args.forever))
+    print(f"✅ Delivery finished: {result}")
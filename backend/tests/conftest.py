@@ -0,0 +1,8 @@
+# backend/tests/conftest.py
+import os
+
+# backend.db.supabase_client / lib.openai_client build their clients at import;
+# tests never reach the network (Supabase / HTTP boundaries are replaced per test)
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,40 @@
+# backend/tests/fakes.py
+
+
+class FakeResponse:
+    def __init__(self, data=None, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """
+    Stand-in for a supabase-py query builder: every builder method is recorded
+    and returns self; execute() returns what the test's handler computes from
+    the recorded calls.
+    """
+
+    def __init__(self, table: str, handler):
+        self.table = table
+        self.calls = []
+        self._handler = handler
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return method
+
+    def execute(self):
+        return self._handler(self)
+
+
+class FakeSupabase:
+    def __init__(self, handler):
+        self.handler = handler
+        self.queries = []
+
+    def table(self, name):
+        query = FakeQuery(name, self.handler)
+        self.queries.append(query)
+        return query
@@ -0,0 +1,61 @@
+# backend/tests/test_agent_planner.py
+import time
+import pytest
+from fastapi.testclient import TestClient
+import backend.main as main
+from backend.mcp_server import mcp
+
+
+def planned(query: str) -> list:
+    return [intent.name for intent in main.plan_intents(query)]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("price and volume for SOFI", ["price", "volume"]),
+    ("show unusual volume spikes in SOFI stock", ["volume", "anomalies"]),
+    ("latest 8-K filings and price of DNA", ["price", "filings"]),
+    ("SOFI stock", ["price"]),
+    ("list all tickers", ["list"]),
+])
+def test_multi_intent_queries(query, expected):
+    assert planned(query) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "what do analysts think about SOFI",   # "list" inside "analysts"
+    "is SOFI listed on the NYSE",          # "list" inside "listed"
+    "evaluate the SOFI merger terms",      # "value" inside "evaluate"
+    "who is reporting on SOFI",            # "report" inside "reporting"
+    "how does stockholder approval work",  # "stock" inside "stockholder"
+])
+def test_substrings_do_not_trigger_tools(query):
+    assert planned(query) == []
+
+
+def test_multi_intent_tools_run_concurrently(monkeypatch):
+    def slow_tool(name):
+        def tool(ticker, **kwargs):
+            time.sleep(0.3)
+            return {"ticker": ticker, "tool": name}
+        return tool
+
+    for name in ("get_stock_price", "get_volume_history"):
+        monkeypatch.setitem(mcp.tools, name, slow_tool(name))
+    summaries = []
+
+    async def fake_achat(messages, **kwargs):
+        summaries.append(messages[0]["content"])
+        return "summary"
+
+    monkeypatch.setattr(main, "achat", fake_achat)
+    monkeypatch.setattr(main.ticker_index, "resolve", lambda query: "SOFI")
+
+    started = time.perf_counter()
+    body = TestClient(main.app).post("/mcp/agent", json={"query": "price and volume for SOFI"}).json()
+    elapsed = time.perf_counter() - started
+
+    assert body["answer"] == "summary"
+    assert set(body["data"]) == {"price", "volume"}
+    assert len(summaries) == 1  # one LLM call for both results
+    assert "stock price and trading volume" in summaries[0]
+    assert elapsed < 0.55  # sequential would be >= 0.6s
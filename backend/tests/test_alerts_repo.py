@@ -0,0 +1,89 @@
+# backend/tests/test_alerts_repo.py
+from datetime import date
+import pytest
+from backend.db import alerts_repo
+from backend.db.alerts_repo import AnomalySink, anomaly_key
+from backend.tests.fakes import FakeResponse, FakeSupabase
+
+
+@pytest.fixture
+def table(monkeypatch):
+    """anomaly_reports with unique_anomaly_idx: upsert(ignore_duplicates) returns only new rows."""
+    existing = set()
+    batches = []
+
+    def handler(query):
+        name, args, kwargs = query.calls[0]
+        assert name == "upsert" and kwargs == {"on_conflict": "ticker,trade_date,anomaly_type,description",
+                                               "ignore_duplicates": True}
+        rows = args[0]
+        batches.append(rows)
+        new = [r for r in rows if anomaly_key(r) not in existing]
+        existing.update(anomaly_key(r) for r in new)
+        return FakeResponse(new)
+
+    monkeypatch.setattr(alerts_repo, "supabase", FakeSupabase(handler))
+    invalidated = []
+    monkeypatch.setattr(alerts_repo.report_cache, "invalidate", invalidated.append)
+    return {"existing": existing, "batches": batches, "invalidated": invalidated}
+
+
+def alert(ticker, description="Volume spike"):
+    return {"ticker": ticker, "description": description, "trade_date": "1999-01-01"}
+
+
+def test_batches_by_size(table):
+    sink = AnomalySink(batch_size=2)
+    for t in ("A", "B", "C", "D", "E"):
+        sink.add(alert(t), "volume")
+    inserted, skipped = sink.flush()
+    assert [len(b) for b in table["batches"]] == [2, 2, 1]
+    assert [r["ticker"] for r in inserted] == ["A", "B", "C", "D", "E"]
+    assert skipped == []
+    assert len(sink) == 0
+
+
+def test_trade_date_is_today(table):
+    sink = AnomalySink()
+    sink.add(alert("A"), "volume")
+    inserted, _ = sink.flush()
+    assert inserted[0]["trade_date"] == date.today().isoformat()
+
+
+def test_duplicates_in_buffer_are_sent_once(table):
+    sink = AnomalySink()
+    sink.add(alert("A"), "volume")
+    sink.add(alert("A"), "volume")
+    sink.add(alert("A"), "price")  # another anomaly type is another row
+    inserted, skipped = sink.flush()
+    assert len(table["batches"][0]) == 2
+    assert len(inserted) == 2 and len(skipped) == 1
+
+
+def test_rows_already_in_the_table_are_skipped(table):
+    first = AnomalySink()
+    first.add(alert("A"), "volume")
+    first.flush()
+
+    second = AnomalySink()  # e.g. an overlapping run
+    second.add(alert("A"), "volume")
+    second.add(alert("B"), "volume")
+    inserted, skipped = second.flush()
+    assert [r["ticker"] for r in inserted] == ["B"]
+    assert [r["ticker"] for r in skipped] == ["A"]
+
+
+def test_invalidates_report_only_when_rows_were_inserted(table):
+    sink = AnomalySink()
+    sink.add(alert("A"), "volume")
+    sink.flush()
+    assert table["invalidated"] == [date.today().isoformat()]
+
+    sink.add(alert("A"), "volume")
+    sink.flush()
+    assert len(table["invalidated"]) == 1
+
+
+def test_empty_flush_makes_no_request(table):
+    assert AnomalySink().flush() == ([], [])
+    assert table["batches"] == []
@@ -0,0 +1,173 @@
+# backend/tests/test_delivery.py
+import asyncio
+import time
+import httpx
+import pytest
+from backend.services.delivery import worker
+from backend.services.delivery.channels import (
+    Channel, PermanentError, RateLimited, RetryableError, check_response, split_markdown,
+)
+from backend.services.delivery.outbox import Outbox
+
+
+# --- split_markdown ---
+def test_split_keeps_lines_together():
+    content = "a" * 6 + "\n" + "b" * 6 + "\n"
+    assert split_markdown(content, 10) == ["aaaaaa\n", "bbbbbb\n"]
+    assert "".join(split_markdown(content * 5, 10)) == content * 5
+
+
+def test_split_cuts_oversized_lines_on_character_boundaries():
+    parts = split_markdown("é" * 10, 5)  # 2 bytes per character
+    assert all(len(p.encode("utf-8")) <= 5 for p in parts)
+    assert "".join(parts) == "é" * 10
+
+
+def test_split_terminates_below_one_character():
+    # max_bytes smaller than a UTF-8 character used to loop forever
+    assert split_markdown("📈📉", 2) == ["📈", "📉"]
+    with pytest.raises(ValueError):
+        split_markdown("abc", 0)
+
+
+# --- check_response ---
+def test_check_response_maps_status_codes():
+    check_response(httpx.Response(204))
+    with pytest.raises(RateLimited) as e:
+        check_response(httpx.Response(429, headers={"retry-after": "2.5"}))
+    assert e.value.retry_after == 2.5
+    with pytest.raises(RetryableError):
+        check_response(httpx.Response(503))
+    with pytest.raises(PermanentError):
+        check_response(httpx.Response(404, text="unknown webhook"))
+
+
+# --- Outbox state machine ---
+@pytest.fixture
+def outbox(tmp_path):
+    return Outbox(str(tmp_path / "outbox.sqlite"))
+
+
+def test_dedupe_key_queues_once(outbox):
+    assert outbox.enqueue("discord", "2025-01-02", "discord", {"built_at": "t1"}, "2025-01-02:discord") is not None
+    assert outbox.enqueue("discord", "2025-01-02", "discord", {"built_at": "t2"}, "2025-01-02:discord") is None
+    assert outbox.enqueue("webhook", "2025-01-02", "webhook", {}, "2025-01-02:webhook") is not None
+    assert outbox.pending_count() == 2
+
+
+def test_claim_retry_and_backoff_window(outbox):
+    outbox.enqueue("discord", "2025-01-02", "discord", {}, "k")
+    [message] = outbox.claim_due()
+    assert outbox.claim_due() == []  # 'sending' is not claimed twice
+
+    outbox.mark_retry(message["id"], 60, "HTTP 503")
+    assert outbox.claim_due() == []  # not due yet
+    assert 55 < outbox.next_due_in() <= 60
+
+    outbox.mark_retry(message["id"], 0, "HTTP 503")
+    [again] = outbox.claim_due()
+    assert again["attempts"] == 2 and again["last_error"] == "HTTP 503"
+
+
+def test_retry_after_does_not_count_an_attempt(outbox):
+    outbox.enqueue("discord", "2025-01-02", "discord", {}, "k")
+    [message] = outbox.claim_due()
+    outbox.mark_retry(message["id"], 0, "rate limited", count_attempt=False)
+    assert outbox.claim_due()[0]["attempts"] == 0
+
+
+def test_release_stale_requeues_stuck_sends(outbox):
+    outbox.enqueue("discord", "2025-01-02", "discord", {}, "k")
+    outbox.claim_due()
+    assert outbox.release_stale(older_than=60) == 0
+    assert outbox.release_stale(older_than=-1) == 1
+    assert len(outbox.claim_due()) == 1
+
+
+def test_latest_built_at_ignores_failed(outbox):
+    outbox.enqueue("discord", "2025-01-02", "discord", {"built_at": "2025-01-02T10:00:00"}, "a")
+    failed = outbox.enqueue("discord", "2025-01-02", "discord:delta", {"built_at": "2025-01-02T12:00:00"}, "b")
+    outbox.mark_failed(failed, "HTTP 404")
+    assert outbox.latest_built_at("2025-01-02") == "2025-01-02T10:00:00"
+
+
+# --- Worker ---
+class ScriptedChannel(Channel):
+    """Sends two parts; raises the scripted errors first (one per send_part call)."""
+
+    name = "scripted"
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.sent = []
+
+    def parts(self, content):
+        return ["part1", "part2"]
+
+    async def send_part(self, client, payload, part, index, total):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(part)
+
+
+@pytest.fixture
+def queued(outbox, tmp_path, monkeypatch):
+    report = tmp_path / "report.md"
+    report.write_text("# report")
+    logged = []
+    monkeypatch.setattr(worker, "log_report", lambda *args, **kwargs: logged.append(args))
+    monkeypatch.setattr(worker, "backoff", lambda attempts: 0.0)
+    payload = {"file": str(report), "title": "t", "summary": "s", "built_at": "2025-01-02T10:00:00"}
+    outbox.enqueue("scripted", "2025-01-02", "scripted", payload, "k")
+    return logged
+
+
+def run_drain(outbox, monkeypatch, channel, **kwargs):
+    monkeypatch.setattr(worker, "get_channel", lambda name: channel)
+    return asyncio.run(worker.drain(outbox=outbox, **kwargs))
+
+
+def test_delivers_and_logs(outbox, queued, monkeypatch):
+    channel = ScriptedChannel([])
+    assert run_drain(outbox, monkeypatch, channel) == {"sent": 1, "retry": 0, "failed": 0}
+    assert channel.sent == ["part1", "part2"]
+    assert queued == [("2025-01-02", "scripted")]
+    assert outbox.pending_count() == 0
+
+
+def test_retry_resumes_after_the_last_sent_part(outbox, queued, monkeypatch):
+    class FailSecondPart(ScriptedChannel):
+        async def send_part(self, client, payload, part, index, total):
+            if index == 1 and self.errors:
+                raise self.errors.pop(0)
+            self.sent.append(part)
+
+    channel = FailSecondPart([RetryableError("HTTP 502")])
+    assert run_drain(outbox, monkeypatch, channel) == {"sent": 1, "retry": 1, "failed": 0}
+    assert channel.sent == ["part1", "part2"]  # part1 not sent twice
+
+
+def test_rate_limit_waits_without_burning_attempts(outbox, queued, monkeypatch):
+    monkeypatch.setattr(worker, "DELIVERY_MAX_ATTEMPTS", 1)
+    channel = ScriptedChannel([RateLimited(0.05), RateLimited(0.05)])
+    started = time.monotonic()
+    assert run_drain(outbox, monkeypatch, channel)["sent"] == 1
+    assert time.monotonic() - started >= 0.1
+
+
+def test_gives_up_after_max_attempts(outbox, queued, monkeypatch):
+    monkeypatch.setattr(worker, "DELIVERY_MAX_ATTEMPTS", 3)
+    channel = ScriptedChannel([RetryableError("HTTP 503")] * 5)
+    assert run_drain(outbox, monkeypatch, channel) == {"sent": 0, "retry": 2, "failed": 1}
+    assert queued == [("2025-01-02", "scripted:failed")]
+
+
+def test_permanent_error_fails_at_once(outbox, queued, monkeypatch):
+    channel = ScriptedChannel([PermanentError("HTTP 404")])
+    assert run_drain(outbox, monkeypatch, channel) == {"sent": 0, "retry": 0, "failed": 1}
+
+
+def test_unexpected_error_is_retried_not_left_sending(outbox, queued, monkeypatch):
+    channel = ScriptedChannel([KeyError("boom")])
+    assert run_drain(outbox, monkeypatch, channel) == {"sent": 1, "retry": 1, "failed": 0}
+    assert outbox.pending_count() == 0
@@ -0,0 +1,234 @@
+# backend/tests/test_dispatch.py
+import asyncio
+import threading
+import time
+import pytest
+from backend.mcp_server import dispatch, mcp
+
+
+@pytest.fixture(autouse=True)
+def fresh_dispatch(monkeypatch):
+    # Semaphores / in-flight tasks are per event loop; each test runs its own loop
+    monkeypatch.setattr(dispatch, "_semaphores", {})
+    monkeypatch.setattr(dispatch, "_inflight", {})
+    monkeypatch.setattr(dispatch, "_stats", {})
+
+
+def register(monkeypatch, name, func, concurrency=8, timeout=5.0):
+    monkeypatch.setitem(mcp.tools, name, func)
+    monkeypatch.setitem(dispatch.LIMITS, name, (concurrency, timeout))
+
+
+def test_parse_limits():
+    assert dispatch.parse_limits("get_filings=2:120, plot_volume_chart=1") == {
+        "get_filings": (2, 120.0),
+        "plot_volume_chart": (1, dispatch.TOOL_TIMEOUT),
+    }
+
+
+def test_unknown_tool():
+    with pytest.raises(dispatch.ToolNotFound):
+        asyncio.run(dispatch.call_tool("no_such_tool"))
+
+
+def test_concurrency_limit_per_tool(monkeypatch):
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def tool(n: int):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return n
+
+    register(monkeypatch, "t_limited", tool, concurrency=2)
+
+    async def main():
+        return await asyncio.gather(*(dispatch.call_tool("t_limited", {"n": i}) for i in range(6)))
+
+    assert asyncio.run(main()) == list(range(6))
+    assert peak[0] == 2
+
+
+def test_timeout_while_running(monkeypatch):
+    release = threading.Event()
+    register(monkeypatch, "t_hang", lambda: release.wait(5), timeout=0.1)
+
+    async def main():
+        with pytest.raises(dispatch.ToolTimeout):
+            await dispatch.call_tool("t_hang")
+
+    try:
+        asyncio.run(main())
+    finally:
+        release.set()
+    assert dispatch.stats()["tools"]["t_hang"]["timeouts"] == 1
+
+
+def test_timeout_covers_waiting_for_a_slot(monkeypatch):
+    # One hung call holds the only slot: the next caller must time out, not wait forever
+    release = threading.Event()
+    register(monkeypatch, "t_chart", lambda n: release.wait(5), concurrency=1, timeout=0.2)
+
+    async def main():
+        first = asyncio.ensure_future(dispatch.call_tool("t_chart", {"n": 1}))
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        with pytest.raises(dispatch.ToolTimeout, match="free slot"):
+            await dispatch.call_tool("t_chart", {"n": 2})
+        assert time.perf_counter() - started < 0.5
+        with pytest.raises(dispatch.ToolTimeout):
+            await first
+
+    try:
+        asyncio.run(main())
+    finally:
+        release.set()
+
+
+def test_tool_exception_propagates(monkeypatch):
+    def broken():
+        raise ValueError("bad ticker")
+
+    register(monkeypatch, "t_broken", broken)
+    with pytest.raises(ValueError, match="bad ticker"):
+        asyncio.run(dispatch.call_tool("t_broken"))
+    assert dispatch.tool_error("t_broken", ValueError("x")) == {"error": "x", "type": "ValueError"}
+
+
+# --- Single flight ---
+def test_identical_concurrent_calls_share_one_execution(monkeypatch):
+    executions = []
+
+    def tool(ticker: str, days: int = 30):
+        executions.append((ticker, days))
+        time.sleep(0.1)
+        return {"ticker": ticker, "days": days}
+
+    register(monkeypatch, "t_single", tool)
+
+    async def main():
+        # same call spelled three ways (case, whitespace, default filled in)
+        return await asyncio.gather(
+            dispatch.call_tool("t_single", {"ticker": "SOFI"}),
+            dispatch.call_tool("t_single", {"ticker": " sofi "}),
+            dispatch.call_tool("t_single", {"ticker": "SOFI", "days": 30}),
+            dispatch.call_tool("t_single", {"ticker": "SOFI", "days": 5}),
+        )
+
+    results = asyncio.run(main())
+    assert sorted(executions) == [("SOFI", 5), ("SOFI", 30)]
+    assert results[0] is results[1] is results[2]
+    stats = dispatch.stats()
+    assert stats["saved_calls"] == 2
+    assert stats["tools"]["t_single"] == {"calls": 4, "executed": 2, "coalesced": 2, "timeouts": 0}
+
+
+def test_coalesced_callers_all_see_the_error(monkeypatch):
+    def tool(ticker: str):
+        time.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    register(monkeypatch, "t_fail", tool)
+
+    async def main():
+        return await asyncio.gather(
+            *(dispatch.call_tool("t_fail", {"ticker": "SOFI"}) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert dispatch.stats()["tools"]["t_fail"]["executed"] == 1
+    assert dispatch._inflight == {}  # a failed call doesn't stick around
+
+
+def test_cancelled_caller_does_not_cancel_the_others(monkeypatch):
+    register(monkeypatch, "t_shared", lambda ticker: time.sleep(0.1) or ticker)
+
+    async def main():
+        first = asyncio.ensure_future(dispatch.call_tool("t_shared", {"ticker": "SOFI"}))
+        second = asyncio.ensure_future(dispatch.call_tool("t_shared", {"ticker": "SOFI"}))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "SOFI"
+
+
+def test_sequential_calls_run_again(monkeypatch):
+    executions = []
+    register(monkeypatch, "t_again", lambda ticker: executions.append(ticker) or ticker)
+
+    async def main():
+        await dispatch.call_tool("t_again", {"ticker": "SOFI"})
+        await dispatch.call_tool("t_again", {"ticker": "SOFI"})
+
+    asyncio.run(main())
+    assert executions == ["SOFI", "SOFI"]  # single flight is not a cache
+
+
+# --- Native batches ---
+def register_batch(monkeypatch, name, batches, ttl=None):
+    def tool(ticker: str):
+        return {"ticker": ticker, "via": "single"}
+
+    def handler(arg_list):
+        batches.append([a["ticker"] for a in arg_list])
+        time.sleep(0.1)
+        return [{"ticker": a["ticker"], "via": "batch"} for a in arg_list]
+
+    tool.cache_ttl = ttl
+    register(monkeypatch, name, tool)
+    monkeypatch.setitem(mcp.batch_handlers, name, handler)
+
+
+def test_batch_counts_cache_hits_once(monkeypatch):
+    from backend.lib.tool_cache import ToolCache
+    cache = ToolCache()
+    monkeypatch.setattr(dispatch, "tool_cache", cache)
+    batches = []
+    register_batch(monkeypatch, "t_batch", batches, ttl=60)
+    cache.store(dispatch.call_key("t_batch", mcp.tools["t_batch"], {"ticker": "AAA"}), {"ticker": "AAA", "via": "cache"})
+
+    results = asyncio.run(dispatch._call_native_batch(
+        "t_batch", [{"ticker": "AAA"}, {"ticker": "BBB"}, {"ticker": "bbb"}]
+    ))
+    assert [r["via"] for r in results] == ["cache", "batch", "batch"]
+    assert batches == [["BBB"]]
+    assert dispatch.stats()["tools"]["t_batch"]["coalesced"] == 1  # the repeated BBB, not the cache hit
+    assert cache.stats()["tools"]["t_batch"]["hits"] == 1
+
+
+def test_batch_and_single_calls_share_in_flight_executions(monkeypatch):
+    batches = []
+    register_batch(monkeypatch, "t_batch", batches)
+
+    async def main():
+        single = asyncio.ensure_future(dispatch.call_tool("t_batch", {"ticker": "AAA"}))
+        await asyncio.sleep(0)  # AAA is now in flight
+        batch = asyncio.ensure_future(dispatch._call_native_batch("t_batch", [{"ticker": "AAA"}, {"ticker": "BBB"}]))
+        await asyncio.sleep(0.02)  # BBB is in flight as part of the batch
+        late = await dispatch.call_tool("t_batch", {"ticker": "BBB"})
+        return await single, await batch, late
+
+    single, batch, late = asyncio.run(main())
+    assert batches == [["BBB"]]  # AAA joined the single call instead of running again
+    assert batch[0] is single and batch[1] is late
+    assert dispatch.stats()["tools"]["t_batch"] == {"calls": 4, "executed": 2, "coalesced": 2, "timeouts": 0}
+
+
+def test_failed_batch_handler_falls_back_to_single_calls(monkeypatch):
+    batches = []
+    register_batch(monkeypatch, "t_batch", batches)
+
+    def broken(arg_list):
+        raise RuntimeError("upstream batch endpoint down")
+
+    monkeypatch.setitem(mcp.batch_handlers, "t_batch", broken)
+    results = asyncio.run(dispatch._call_native_batch("t_batch", [{"ticker": "AAA"}, {"ticker": "BBB"}]))
+    assert [(r["ticker"], r["via"]) for r in results] == [("AAA", "single"), ("BBB", "single")]
+    assert dispatch.stats()["tools"]["t_batch"]["calls"] == 2
+    assert not dispatch._inflight
@@ -0,0 +1,29 @@
+# backend/tests/test_metadata_agent.py
+from datetime import datetime, timedelta, timezone
+from backend.agents.metadata_agent import is_stale
+
+NOW = datetime(2026, 10, 3, 12, 0, tzinfo=timezone.utc)
+
+
+def row(refreshed_at):
+    return {"country": "United States", "exchange": "NMS", "metadata_updated_at": refreshed_at}
+
+
+def test_trimmed_fraction_timestamptz_is_fresh():
+    # Postgres trims trailing zeros of the fraction: 4 digits, not 6
+    assert not is_stale(row("2026-10-01T12:00:00.1234+00:00"), NOW, ttl_days=7)
+    assert not is_stale(row("2026-10-01 12:00:00.1+00"), NOW, ttl_days=7)
+
+
+def test_old_timestamp_is_stale():
+    assert is_stale(row("2026-09-01T12:00:00.1234+00:00"), NOW, ttl_days=7)
+
+
+def test_naive_timestamp_is_utc():
+    assert not is_stale(row((NOW - timedelta(hours=1)).replace(tzinfo=None).isoformat()), NOW, ttl_days=1)
+
+
+def test_missing_or_garbage_is_stale():
+    assert is_stale(row(None), NOW)
+    assert is_stale(row("yesterday"), NOW)
+    assert is_stale({"metadata_updated_at": "2026-10-01T12:00:00+00:00"}, NOW)
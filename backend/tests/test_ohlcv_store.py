@@ -0,0 +1,111 @@
+# backend/tests/test_ohlcv_store.py
+import multiprocessing
+import os
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from backend.lib.ohlcv_store import OHLCVStore, COL, history_to_rows
+
+
+def row(day: date, close: float = 1.0) -> dict:
+    return {"trade_date": day.isoformat(), "open": close, "high": close, "low": close, "close": close, "volume": 100}
+
+
+def weekdays(start: date, end: date) -> list:
+    days = np.arange(np.datetime64(start), np.datetime64(end), dtype="datetime64[D]")
+    return [d.astype(date) for d in days[np.is_busday(days)]]
+
+
+def stored_dates(store: OHLCVStore, ticker: str) -> list:
+    return [np.datetime64(int(d), "D").astype(date) for d in store.load(ticker)[:, COL["date"]]]
+
+
+def test_append_merges_and_newer_rows_win(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    d = date(2025, 3, 3)
+    store.append("sofi", [row(d, 1.0), row(d + timedelta(days=1), 2.0)])
+    store.append("SOFI", [row(d, 5.0)])
+    arr = store.load("SOFI")
+    assert len(arr) == 2
+    assert arr[0, COL["close"]] == 5.0
+    assert not [f for f in os.listdir(tmp_path) if ".tmp." in f]  # temp files are always replaced
+
+
+def _append_many(root: str, worker: int) -> None:
+    store = OHLCVStore(root)
+    base = date(2020, 1, 1)
+    for i in range(25):
+        store.append("SOFI", [row(base + timedelta(days=worker * 1000 + i))])
+
+
+def test_concurrent_processes_lose_no_rows(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_append_many, args=(str(tmp_path), w)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert len(OHLCVStore(str(tmp_path)).load("SOFI")) == 100
+
+
+def _add_closed_days(root: str, worker: int) -> None:
+    store = OHLCVStore(root)
+    base = date(2020, 1, 1)
+    for i in range(25):
+        store.add_closed_days("SOFI", [base + timedelta(days=worker * 1000 + i)])
+
+
+def test_concurrent_closed_days_are_all_kept(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_add_closed_days, args=(str(tmp_path), w)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    store = OHLCVStore(str(tmp_path))
+    store.set_covered_from("SOFI", date(2020, 1, 1))  # other metadata keys survive
+    assert len(store.closed_days("SOFI")) == 100
+
+
+def test_history_to_rows_drops_empty_candles():
+    nan = float("nan")
+    hist = pd.DataFrame(
+        {"Open": [1.0, nan, 2.0], "High": [1.0, nan, 2.0], "Low": [1.0, nan, 2.0],
+         "Close": [1.0, nan, 2.0], "Volume": [100.0, nan, nan]},
+        index=pd.to_datetime(["2025-03-03", "2025-03-04", "2025-03-05"]),
+    )
+    assert [(r["trade_date"], r["volume"]) for r in history_to_rows(hist)] == [("2025-03-03", 100), ("2025-03-05", 0)]
+
+
+def test_missing_sessions_finds_interior_holes(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    days = weekdays(date(2025, 3, 3), date(2025, 3, 15))  # Mon 3rd .. Fri 14th
+    store.append("SOFI", [row(d) for d in days if d not in (date(2025, 3, 6), date(2025, 3, 11))])
+    assert store.missing_sessions("SOFI", date(2025, 3, 1)) == [date(2025, 3, 6), date(2025, 3, 11)]
+    assert store.missing_sessions("SOFI", date(2025, 3, 7)) == [date(2025, 3, 11)]
+
+
+def test_read_through_fills_holes_and_remembers_closed_days(tmp_path):
+    store = OHLCVStore(str(tmp_path))
+    today = date.today()
+    start = today - timedelta(days=40)
+    days = [d for d in weekdays(start, today)]
+    hole, holiday = days[5], days[10]
+    store.append("SOFI", [row(d) for d in days if d not in (hole, holiday)])
+    store.set_covered_from("SOFI", start)
+
+    fetches = []
+
+    def fetcher(ticker, from_day, to_day=None):
+        fetches.append((from_day, to_day))
+        # the source has the hole but not the holiday (market closed)
+        return [row(d) for d in days if from_day <= d and (to_day is None or d < to_day) and d != holiday]
+
+    store.read_through("SOFI", start, fetcher)
+    assert fetches == [(hole, holiday + timedelta(days=1))]
+    assert hole in stored_dates(store, "SOFI")
+    assert store.closed_days("SOFI") == [holiday.isoformat()]
+
+    fetches.clear()
+    store.read_through("SOFI", start, fetcher)
+    assert fetches == []  # nothing left to fetch: the holiday is known
@@ -0,0 +1,80 @@
+# backend/tests/test_report_cache.py
+from datetime import date, timedelta
+from backend.lib.report_cache import ReportCache, built_after_close
+
+MODEL = {"count": 1, "rows": ["SOFI"]}
+
+
+def fingerprint_of(value):
+    calls = []
+
+    def fingerprint():
+        calls.append(1)
+        return value
+    return fingerprint, calls
+
+
+def test_hit_while_fingerprint_matches(tmp_path):
+    cache = ReportCache(str(tmp_path))
+    today = date.today().isoformat()
+    cache.put(today, "h1", MODEL, (1, 10))
+    fingerprint, calls = fingerprint_of((1, 10))
+    assert cache.get(today, fingerprint) == ("h1", MODEL)
+    assert calls == [1]
+
+
+def test_new_rows_elsewhere_make_a_miss(tmp_path):
+    # Rows written by the workflow on another machine: no invalidate() here
+    cache = ReportCache(str(tmp_path))
+    today = date.today().isoformat()
+    cache.put(today, "h1", MODEL, (1, 10))
+    assert cache.get(today, lambda: (2, 11)) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_past_date_cached_while_still_open_is_checked(tmp_path):
+    cache = ReportCache(str(tmp_path))
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    cache.put(yesterday, "h1", MODEL, (1, 10), built_at=f"{yesterday}T12:00:00")
+    assert cache.get(yesterday, lambda: (3, 12)) is None
+
+
+def test_closed_date_served_without_fingerprint(tmp_path):
+    cache = ReportCache(str(tmp_path))
+    day = "2025-01-02"
+    cache.put(day, "h1", MODEL, (1, 10), built_at="2025-01-05T08:00:00")
+    fingerprint, calls = fingerprint_of((9, 99))
+    assert cache.get(day, fingerprint) == ("h1", MODEL)
+    assert calls == []
+
+
+def test_disk_entry_is_checked_too(tmp_path):
+    ReportCache(str(tmp_path)).put("2025-01-02", "h1", MODEL, (1, 10), built_at="2025-01-02T20:00:00")
+    other_process = ReportCache(str(tmp_path))
+    assert other_process.get("2025-01-02", lambda: (1, 10)) == ("h1", MODEL)
+    assert other_process.get("2025-01-02", lambda: (2, 11)) is None
+
+
+def test_legacy_file_without_fingerprint_is_a_miss(tmp_path):
+    (tmp_path / "2025-01-02.json").write_text('{"date": "2025-01-02", "hash": "h", "model": {}}')
+    assert ReportCache(str(tmp_path)).get("2025-01-02", lambda: (0, 0)) is None
+
+
+def test_built_after_close():
+    assert not built_after_close("2025-01-02", "2025-01-03T10:00:00")  # next day: time zones may still differ
+    assert built_after_close("2025-01-02", "2025-01-04T00:00:00")
+    assert not built_after_close("2025-01-02", "garbage")
+
+
+def test_anomaly_fingerprint_query(monkeypatch):
+    from backend.db import alerts_repo
+    from backend.tests.fakes import FakeResponse, FakeSupabase
+
+    fake = FakeSupabase(lambda q: FakeResponse([{"id": 42}], count=7))
+    monkeypatch.setattr(alerts_repo, "supabase", fake)
+    assert alerts_repo.anomaly_fingerprint("2025-01-02") == (7, 42)
+    calls = [name for name, _, _ in fake.queries[0].calls]
+    assert calls == ["select", "eq", "order", "limit"]
+
+    monkeypatch.setattr(alerts_repo, "supabase", FakeSupabase(lambda q: FakeResponse([], count=0)))
+    assert alerts_repo.anomaly_fingerprint("2025-01-02") == (0, 0)
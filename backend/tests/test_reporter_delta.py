@@ -0,0 +1,43 @@
+# backend/tests/test_reporter_delta.py
+import pytest
+from backend.agents import reporter_agent
+from backend.tests.fakes import FakeResponse, FakeSupabase
+
+STARTED = "2026-10-16T14:00:00.000000"
+DAY = "2026-10-16"
+
+
+def row(ticker: str) -> dict:
+    return {"ticker": ticker, "trade_date": DAY, "anomaly_type": "Volume", "description": "spike"}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """anomaly_reports holds an older row (OLD) and the one this run inserted (NEW)."""
+    created = {"OLD": "2026-10-16T13:00:00", "NEW": "2026-10-16T14:05:00"}
+
+    def handler(query):
+        window = {name: args[1] for name, args, _ in query.calls if name in ("gt", "lt")}
+        after, before = window.get("gt"), window.get("lt")
+        return FakeResponse([row(t) for t, at in created.items()
+                             if (after is None or at > after) and (before is None or at < before)])
+
+    fake = FakeSupabase(handler)
+    monkeypatch.setattr(reporter_agent, "supabase", fake)
+    return fake
+
+
+def tickers(anomalies: list) -> list:
+    return sorted(a["ticker"] for a in anomalies)
+
+
+def test_delta_before_run_keeps_state_anomalies(db):
+    state = {"run_started_at": STARTED, "anomalies": [row("NEW")]}
+    assert tickers(reporter_agent.collect_anomalies(state, DAY, since="2026-10-16T13:30:00")) == ["NEW"]
+
+
+def test_delta_after_run_start_does_not_repeat_state_anomalies(db):
+    # A delta went out at 14:10 (after NEW was written): NEW is not new any more
+    state = {"run_started_at": STARTED, "anomalies": [row("NEW")]}
+    assert reporter_agent.collect_anomalies(state, DAY, since="2026-10-16T14:10:00.5") == []
+    assert tickers(reporter_agent.collect_anomalies(state, DAY, since="2026-10-16T14:01:00")) == ["NEW"]
@@ -0,0 +1,87 @@
+# backend/tests/test_session_pool.py
+import asyncio
+from types import SimpleNamespace
+import pytest
+from backend.mcp_clients import openai_client
+from backend.mcp_clients.session_pool import MCPSessionPool
+
+
+class FakeSession:
+    def __init__(self, alive: bool):
+        self.alive = alive
+
+    async def send_ping(self):
+        if not self.alive:
+            raise ConnectionError("stdio pipe closed")
+
+
+class FakeAgent:
+    def __init__(self, error=None, answer="ok"):
+        self.error = error
+        self.answer = answer
+
+    async def ainvoke(self, inputs):
+        if self.error:
+            raise self.error
+        return {"messages": [SimpleNamespace(content=self.answer)]}
+
+
+def ready_pool(session_alive: bool, agent, tools=("get_stock_price",)) -> MCPSessionPool:
+    """A pool with one connected slot, without spawning a server."""
+    pool = MCPSessionPool(build_agent=lambda tools: agent, size=1)
+    pool.loop = asyncio.get_running_loop()
+    pool._idle = asyncio.Queue()
+    slot = pool.slots[0]
+    slot.session, slot.tools, slot.agent, slot.generation = FakeSession(session_alive), list(tools), agent, 1
+    pool._idle.put_nowait((slot, 1))
+    return pool
+
+
+def run_agent_with(monkeypatch, session_alive: bool, agent, tools=("get_stock_price",)):
+    async def main():
+        pool = ready_pool(session_alive, agent, tools)
+
+        async def start():
+            return pool
+        monkeypatch.setattr(openai_client, "start_agent_pool", start)
+        answer = await openai_client.run_agent("price of SOFI")
+        return answer, pool
+    return asyncio.run(main())
+
+
+def test_answer_and_slot_returned(monkeypatch):
+    answer, pool = run_agent_with(monkeypatch, True, FakeAgent(answer="SOFI is $7"))
+    assert answer == "SOFI is $7"
+    assert pool.stats()["idle"] == 1
+
+
+def test_dead_transport_retires_the_session(monkeypatch):
+    answer, pool = run_agent_with(monkeypatch, False, FakeAgent(error=BrokenPipeError("closed")))
+    assert answer["type"] == "error" and "closed" in answer["content"]
+    slot = pool.slots[0]
+    assert slot.broken.is_set()
+    assert pool.stats()["idle"] == 0  # not handed out again
+
+
+def test_tool_error_on_a_live_session_keeps_it(monkeypatch):
+    answer, pool = run_agent_with(monkeypatch, True, FakeAgent(error=ValueError("bad tool args")))
+    assert answer["type"] == "error"
+    assert not pool.slots[0].broken.is_set()
+    assert pool.stats()["idle"] == 1
+
+
+def test_session_without_tools_is_reconnected(monkeypatch):
+    answer, pool = run_agent_with(monkeypatch, True, FakeAgent(), tools=())
+    assert answer["type"] == "error"
+    assert pool.slots[0].broken.is_set()
+
+
+def test_acquire_times_out_when_no_session_is_idle():
+    async def main():
+        pool = ready_pool(True, FakeAgent())
+        async with pool.acquire():
+            with pytest.raises(asyncio.TimeoutError):
+                async with pool.acquire(timeout=0.05):
+                    pass
+
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+# backend/tests/test_sharded.py
+from backend.workflows import sharded
+
+
+class InlinePool:
+    """ProcessPoolExecutor stand-in that runs map() in the test process."""
+
+    calls = []
+
+    def __init__(self, max_workers, mp_context=None):
+        self.max_workers = max_workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, fn, *iterables):
+        args = list(zip(*iterables))
+        InlinePool.calls.append((self.max_workers, args))
+        return [fn(*a) for a in args]
+
+
+def test_shards_split_the_paged_universe_and_the_metadata_budget(monkeypatch):
+    universe = [f"T{i:04d}" for i in range(2500)]  # more than one PostgREST page
+    monkeypatch.setattr(sharded, "load_spac_list", lambda columns: [{"ticker": t} for t in universe])
+    monkeypatch.setattr(sharded, "ProcessPoolExecutor", InlinePool)
+    monkeypatch.setattr(sharded, "METADATA_RATE_LIMIT", 2.0)
+    monkeypatch.setattr(sharded.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(sharded, "run_shard", lambda tickers, rate: {
+        "tickers": tickers, "anomalies": [], "metadata_refreshed": [], "nodes": {}, "rate": rate,
+    })
+    InlinePool.calls = []
+
+    result = sharded.shards_node({"shards": 8})
+
+    assert sorted(result["tickers"]) == universe
+    workers, args = InlinePool.calls[0]
+    assert workers == 4 and len(args) == 8
+    assert {rate for _, rate in args} == {0.5}  # 4 concurrent shards share 2 req/s
@@ -0,0 +1,132 @@
+# backend/tests/test_tool_cache.py
+import threading
+import pytest
+from backend.lib import tool_cache as tc
+from backend.lib.tool_cache import ToolCache, cached_tool
+
+
+class Clock:
+    """Controls time.monotonic() inside tool_cache."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tc.time, "monotonic", clock)
+    return clock
+
+
+def counting(value="v"):
+    calls = []
+
+    def call():
+        calls.append(1)
+        return value
+    return call, calls
+
+
+def test_fresh_hit_then_miss_after_expiry(clock):
+    cache = ToolCache()
+    call, calls = counting()
+    assert cache.get_or_call("t", "k", 10, 0, call) == "v"
+    clock.now += 5
+    assert cache.get_or_call("t", "k", 10, 0, call) == "v"
+    assert len(calls) == 1
+    clock.now += 6  # past ttl, no stale window
+    cache.get_or_call("t", "k", 10, 0, call)
+    assert len(calls) == 2
+    assert cache.stats()["tools"]["t"] == {"hits": 1, "stale_hits": 0, "misses": 2, "refreshes": 0}
+
+
+def test_stale_value_served_while_refreshing(clock):
+    cache = ToolCache()
+    cache.get_or_call("t", "k", 10, 60, lambda: "old")
+    clock.now += 30  # stale, inside the stale window
+    refreshed = threading.Event()
+
+    def refresh():
+        refreshed.set()
+        return "new"
+
+    assert cache.get_or_call("t", "k", 10, 60, refresh) == "old"
+    assert refreshed.wait(2)
+    cache._refresher.shutdown(wait=True)
+    assert cache.get_or_call("t", "k", 10, 60, lambda: "unused") == "new"
+    stats = cache.stats()["tools"]["t"]
+    assert stats["stale_hits"] == 1 and stats["refreshes"] == 1
+
+
+def test_one_refresh_per_stale_key(clock):
+    cache = ToolCache()
+    cache.get_or_call("t", "k", 10, 60, lambda: "old")
+    clock.now += 30
+    gate = threading.Event()
+    calls = []
+
+    def slow_refresh():
+        calls.append(1)
+        gate.wait(2)
+        return "new"
+
+    for _ in range(5):
+        assert cache.get_or_call("t", "k", 10, 60, slow_refresh) == "old"
+    gate.set()
+    cache._refresher.shutdown(wait=True)
+    assert len(calls) == 1
+
+
+def test_past_stale_window_waits_for_a_fresh_call(clock):
+    cache = ToolCache()
+    cache.get_or_call("t", "k", 10, 60, lambda: "old")
+    clock.now += 71
+    assert cache.get_or_call("t", "k", 10, 60, lambda: "new") == "new"
+
+
+def test_errors_are_not_cached(clock):
+    cache = ToolCache()
+    call, calls = counting({"error": "No data"})
+    cache.get_or_call("t", "k", 10, 0, call)
+    cache.get_or_call("t", "k", 10, 0, call)
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_size_eviction_drops_least_recently_used(clock):
+    value = "x" * 100  # ~102 bytes as JSON
+    cache = ToolCache(max_bytes=250)
+    cache.store("a", value)
+    cache.store("b", value)
+    cache.get_or_call("t", "a", 10, 0, lambda: "unused")  # a is now most recent
+    cache.store("c", value)
+    assert cache.peek("t", "a", 10) == value
+    assert cache.peek("t", "b", 10) is None
+    assert cache.stats()["bytes"] <= 250
+
+
+def test_oversized_value_is_not_stored(clock):
+    cache = ToolCache(max_bytes=10)
+    cache.store("a", "x" * 100)
+    assert cache.stats()["entries"] == 0
+
+
+def test_cached_tool_canonical_arguments(clock):
+    cache = ToolCache()
+    calls = []
+
+    @cached_tool("get_price", ttl=60, cache=cache)
+    def get_price(ticker: str, period: str = "1mo"):
+        calls.append((ticker, period))
+        return {"ticker": ticker.strip().upper()}
+
+    get_price("SOFI")
+    get_price(" sofi ")
+    get_price(ticker="SOFI", period="1mo")
+    get_price("SOFI", "1y")
+    assert calls == [("SOFI", "1mo"), ("SOFI", "1y")]
+    assert get_price.cache_ttl == 60
@@ -0,0 +1,80 @@
+# backend/tests/test_volume_baselines.py
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from backend.agents import analyzer_agent
+from backend.lib.ohlcv_store import OHLCVStore
+from backend.lib.volume_baselines import baselines_from_history, compute_baselines, window_mean
+
+
+def sessions(n: int, end: date) -> list:
+    days = np.busday_offset(np.datetime64(end), np.arange(-n + 1, 1), roll="backward")
+    return [d.astype(date) for d in days]
+
+
+def test_window_excludes_the_as_of_session():
+    volumes = np.array([100.0] * 10 + [10_000.0])  # today's spike is last
+    assert window_mean(volumes, 10) == 100.0
+    assert window_mean(np.array([100.0] * 4 + [10_000.0]), 10) is None  # 4 < half a window
+    assert window_mean(np.array([5.0]), 10) is None
+
+
+def test_spike_does_not_inflate_its_own_baseline():
+    volumes = np.array([100_000.0] * 63 + [350_000.0])
+    avg10, avg3m = baselines_from_history(volumes)
+    assert avg10 == avg3m == 100_000.0  # 3.5× the baseline is still a spike
+
+
+def test_vectorized_matches_reference():
+    rng = np.random.default_rng(7)
+    today = date(2025, 6, 27)
+    frames = []
+    for ticker, n in (("AAA", 70), ("BBB", 12), ("CCC", 3)):
+        days = sessions(n, today)
+        frames.append(pd.DataFrame({
+            "ticker": ticker,
+            "trade_date": [d.isoformat() for d in days],
+            "volume": rng.integers(1_000, 100_000, n).astype(float),
+        }))
+    rows = pd.concat(frames).sample(frac=1, random_state=1)  # order must not matter
+
+    out = {r["ticker"]: r for r in compute_baselines(rows)}
+    for ticker, frame in rows.groupby("ticker"):
+        volumes = frame.sort_values("trade_date")["volume"].to_numpy()
+        avg10, avg3m = baselines_from_history(volumes)
+        assert out[ticker]["as_of"] == frame["trade_date"].max()
+        assert out[ticker]["avg_volume_10d"] == (None if avg10 is None else pytest.approx(avg10))
+        assert out[ticker]["avg_volume_3m"] == (None if avg3m is None else pytest.approx(avg3m))
+
+
+def test_analyzer_modes_agree(tmp_path, monkeypatch):
+    today = date.today()
+    days = sessions(15, today - timedelta(days=1))
+    candles = {
+        "SPIK": [10_000] * 14 + [90_000],
+        "QUIET": [50_000] * 14 + [60_000],
+        "LOW": [20_000] * 14 + [5_000],
+    }
+    rows = [
+        {"ticker": t, "trade_date": d.isoformat(), "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": v}
+        for t, volumes in candles.items() for d, v in zip(days, volumes)
+    ]
+    store = OHLCVStore(str(tmp_path))
+    for ticker in candles:
+        store.append(ticker, [r for r in rows if r["ticker"] == ticker])
+        store.set_covered_from(ticker, today - timedelta(days=analyzer_agent.RECENT_WINDOW_DAYS))
+
+    # spac_volume_baselines as the data agent computed them
+    baselines = {r["ticker"]: (r["avg_volume_10d"], r["avg_volume_3m"]) for r in compute_baselines(pd.DataFrame(rows))}
+    monkeypatch.setattr(analyzer_agent, "store", store)
+    monkeypatch.setattr(analyzer_agent, "fetch_from_spac_data", lambda *args: [])
+    monkeypatch.setattr(analyzer_agent, "load_volume_baselines", lambda tickers: baselines)
+    monkeypatch.setattr(analyzer_agent, "load_window", lambda tickers, days: pd.DataFrame(rows))
+
+    tickers = list(candles)
+    per_ticker = analyzer_agent.detect_volume_alerts(tickers, mode="per_ticker")
+    vectorized = analyzer_agent.detect_volume_alerts(tickers, mode="vectorized")
+    assert per_ticker == vectorized
+    assert [a["ticker"] for a in per_ticker] == ["SPIK", "LOW"]
+    assert "10-day avg (10,000)" in per_ticker[0]["description"]
@@ -0,0 +1,65 @@
+# backend/tests/test_workflow.py
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import StateGraph, START, END
+from backend.workflows.spac_workflow import State, pick_thread
+
+
+def build_app(found: list, fail: dict):
+    def check(state):
+        return {"anomalies": list(found)}
+
+    def report(state):
+        if fail.get("report"):
+            raise RuntimeError("reporter crashed")
+        return {}
+
+    graph = StateGraph(State)
+    graph.add_node("check", check)
+    graph.add_node("report", report)
+    graph.add_edge(START, "check")
+    graph.add_edge("check", "report")
+    graph.add_edge("report", END)
+    return graph.compile(checkpointer=InMemorySaver())
+
+
+def anomaly(ticker: str) -> dict:
+    return {"ticker": ticker, "trade_date": "2026-10-16", "anomaly_type": "volume", "description": "spike"}
+
+
+def run(app, restart: bool = False):
+    thread_id, resume = pick_thread(app, "2026-10-16", restart=restart)
+    config = {"configurable": {"thread_id": thread_id}}
+    return thread_id, resume, app.invoke(None if resume else {"tickers": [], "anomalies": []}, config)
+
+
+def test_second_run_of_the_day_starts_clean():
+    found, fail = [anomaly("AAA")], {}
+    app = build_app(found, fail)
+    assert run(app)[:2] == ("2026-10-16", False)
+
+    found[:] = [anomaly("BBB")]
+    thread_id, resume, result = run(app)
+    assert (thread_id, resume) == ("2026-10-16-2", False)
+    assert [a["ticker"] for a in result["anomalies"]] == ["BBB"]  # AAA belonged to the first run
+
+
+def test_crashed_run_resumes_and_restart_starts_over():
+    found, fail = [anomaly("AAA")], {"report": True}
+    app = build_app(found, fail)
+    with pytest.raises(RuntimeError):
+        run(app)
+
+    fail["report"] = False
+    thread_id, resume, result = run(app)
+    assert (thread_id, resume) == ("2026-10-16", True)
+    assert [a["ticker"] for a in result["anomalies"]] == ["AAA"]
+
+    fail["report"] = True
+    with pytest.raises(RuntimeError):
+        run(app)
+    fail["report"] = False
+    found[:] = [anomaly("BBB")]
+    thread_id, resume, result = run(app, restart=True)
+    assert (thread_id, resume) == ("2026-10-16-3", False)
+    assert [a["ticker"] for a in result["anomalies"]] == ["BBB"]
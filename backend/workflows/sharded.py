@@ -0,0 +1,89 @@
+# backend/workflows/sharded.py
+import logging
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Dict, List
+from langgraph.graph import StateGraph, END, START
+
+from backend.db.spac_data_reader import load_spac_list
+from backend.lib import metrics
+from backend.workflows.spac_workflow import State, build_workflow, merge_anomalies, reporter_node
+from backend.config import METADATA_RATE_LIMIT
+
+
+# ---- Sharding ----
+def shard_of(ticker: str, shards: int) -> int:
+    """Stable shard index for a ticker (crc32, so it's the same in every process and run)."""
+    return zlib.crc32(ticker.upper().encode("utf-8")) % shards
+
+
+def split_shards(tickers: List[str], shards: int) -> List[List[str]]:
+    """Split the universe into `shards` disjoint lists (empty shards are dropped)."""
+    buckets: List[List[str]] = [[] for _ in range(max(1, shards))]
+    for ticker in tickers:
+        buckets[shard_of(ticker, len(buckets))].append(ticker)
+    return [b for b in buckets if b]
+
+
+def run_shard(tickers: List[str], metadata_rate: float = METADATA_RATE_LIMIT) -> Dict[str, Any]:
+    """
+    Worker entrypoint: data → metadata → {analyzer, lifecycle, risk} for one shard,
+    in its own process. Returns the shard's anomalies and node metrics.
+    metadata_rate is this process's share of the Yahoo info budget.
+    """
+    run = metrics.start_run("shard")  # reported back to the parent, not logged here
+    result = build_workflow(report=False).compile().invoke(
+        {"tickers": tickers, "anomalies": [], "metadata_rate": metadata_rate}
+    )
+    nodes = run.to_dict()["nodes"]
+    return {
+        "tickers": result.get("tickers", tickers),
+        "anomalies": result.get("anomalies", []),
+        "metadata_refreshed": result.get("metadata_refreshed", []),
+        "nodes": nodes,
+    }
+
+
+# ---- Nodes ----
+def shards_node(state: State) -> Dict[str, Any]:
+    shards = state.get("shards") or 1
+    universe = state.get("tickers") or [row["ticker"] for row in load_spac_list("ticker")]
+    parts = split_shards(universe, shards)
+    workers = min(len(parts), os.cpu_count() or 1) or 1
+    # Rate limiters can't be shared across processes: split METADATA_RATE_LIMIT
+    # between the shards that run at the same time
+    metadata_rate = METADATA_RATE_LIMIT / workers
+    logging.info(f"🧩 Running {len(universe)} tickers in {len(parts)} shards on {workers} processes...")
+
+    # spawn: fresh interpreters, no forked Supabase/yfinance connections or locks
+    ctx = multiprocessing.get_context("spawn")
+    anomalies: List[Dict[str, Any]] = []
+    tickers: List[str] = []
+    refreshed: List[str] = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        for i, shard in enumerate(pool.map(run_shard, parts, repeat(metadata_rate)), start=1):
+            anomalies = merge_anomalies(anomalies, shard["anomalies"])
+            tickers += shard["tickers"]
+            refreshed += shard["metadata_refreshed"]
+            metrics.merge_nodes(shard["nodes"])
+            logging.info(f"✅ Shard {i}/{len(parts)}: {len(shard['tickers'])} tickers, {len(shard['anomalies'])} new anomalies")
+
+    return {"tickers": tickers, "anomalies": anomalies, "metadata_refreshed": refreshed}
+
+
+# ---- LangGraph Workflow ----
+def build_sharded_workflow() -> StateGraph:
+    """shards (process pool over the ticker universe) → reporter (one pass over the merged anomalies)."""
+    graph = StateGraph(State)
+    graph.add_node("shards", metrics.instrument("shards", shards_node))
+    graph.add_node("reporter", metrics.instrument("reporter", reporter_node))
+    graph.add_edge(START, "shards")
+    graph.add_edge("shards", "reporter")
+    graph.add_edge("reporter", END)
+    return graph
+
+
+sharded_workflow = build_sharded_workflow()
@@ -1,14 +1,17 @@
 # backend/workflows/spac_workflow.py
 import logging
 from datetime import date
-from typing import List, Dict, Any
+from typing import Annotated, Any, Dict, List, TypedDict
 from langgraph.graph import StateGraph, END, START
 
 from backend.agents.data_agent import fetch_and_store_daily_data
+from backend.agents.metadata_agent import run_metadata_agent
 from backend.agents.analyzer_agent import run_analyzer_agent
 from backend.agents.lifecycle_agent import run_lifecycle_agent
 from backend.agents.risk_agent import run_risk_agent
 from backend.agents.reporter_agent import run_reporter_agent
+from backend.lib.metrics import instrument
+from backend.config import REPORT_MODE
 
 # ---- Configure Logging ----
 logging.basicConfig(
@@ -17,67 +20,133 @@ logging.basicConfig(
 )
 
 # ---- Define Workflow State ----
-class State(dict):
+def anomaly_key(a: Dict[str, Any]) -> tuple:
+    return (a.get("ticker"), a.get("trade_date"), a.get("anomaly_type"), a.get("description"))
+
+
+def merge_anomalies(left: List[Dict[str, Any]], right: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reducer for parallel branches: concatenate anomaly lists, dropping exact duplicates."""
+    merged, seen = [], set()
+    for a in (left or []) + (right or []):
+        key = anomaly_key(a)
+        if key not in seen:
+            seen.add(key)
+            merged.append(a)
+    return merged
+
+
+class State(TypedDict, total=False):
     tickers: List[str]
-    anomalies: List[Dict[str, Any]]
+    anomalies: Annotated[List[Dict[str, Any]], merge_anomalies]
+    metadata_refreshed: List[str]
+    shards: int  # sharded mode only (see workflows/sharded)
+    run_started_at: str  # UTC; reporter only queries anomalies created before this
+    report_mode: str  # "full" | "delta"
+    metadata_rate: float  # Yahoo info requests/s for this process (a shard's share of METADATA_RATE_LIMIT)
 
-# ---- LangGraph Workflow ----
-workflow = StateGraph(State)
+# ---- Nodes ----
+# Nodes return only the keys they produce; parallel branches never write the
+# same plain key, and their anomalies are combined by merge_anomalies.
 
 # Data Agent Node
-def data_node(state: State) -> State:
+def data_node(state: State) -> Dict[str, Any]:
     logging.info("📥 Running Data Agent...")
-    tickers_state = fetch_and_store_daily_data()
-    state["tickers"] = tickers_state.get("tickers", [])
-    logging.info(f"✅ Data Agent finished: {len(state['tickers'])} tickers updated")
-    return state
+    # Empty tickers → whole spac_list; a shard passes its own slice
+    tickers_state = fetch_and_store_daily_data({"tickers": state.get("tickers", [])})
+    tickers = tickers_state.get("tickers", [])
+    logging.info(f"✅ Data Agent finished: {len(tickers)} tickers updated")
+    return {"tickers": tickers}
+
+# Metadata Node
+def metadata_node(state: State) -> Dict[str, Any]:
+    logging.info("🏷️ Running Metadata Agent...")
+    result = run_metadata_agent({"tickers": state.get("tickers", []), "metadata_rate": state.get("metadata_rate")})
+    logging.info(f"✅ Metadata finished: {len(result.get('metadata_refreshed', []))} tickers refreshed")
+    return {"metadata_refreshed": result.get("metadata_refreshed", [])}
 
 # Analyzer Node
-def analyzer_node(state: State) -> State:
+def analyzer_node(state: State) -> Dict[str, Any]:
     logging.info("🔍 Running Analyzer Agent...")
-    state = run_analyzer_agent(state)
-    logging.info(f"✅ Analyzer finished: {len(state.get('anomalies', []))} anomalies found so far")
-    return state
+    found = run_analyzer_agent({"tickers": state.get("tickers", []), "anomalies": []})["anomalies"]
+    logging.info(f"✅ Analyzer finished: {len(found)} new anomalies")
+    return {"anomalies": found}
 
 # Lifecycle Node
-def lifecycle_node(state: State) -> State:
+def lifecycle_node(state: State) -> Dict[str, Any]:
     logging.info("📆 Running Lifecycle Agent...")
-    state = run_lifecycle_agent(state)
-    logging.info(f"✅ Lifecycle finished: {len(state.get('anomalies', []))} anomalies found so far")
-    return state
+    found = run_lifecycle_agent({"tickers": state.get("tickers", []), "anomalies": []})["anomalies"]
+    logging.info(f"✅ Lifecycle finished: {len(found)} new anomalies")
+    return {"anomalies": found}
 
 # Risk Node
-def risk_node(state: State) -> State:
+def risk_node(state: State) -> Dict[str, Any]:
     logging.info("⚠️ Running Risk Agent...")
-    state = run_risk_agent(state)
-    logging.info(f"✅ Risk finished: {len(state.get('anomalies', []))} anomalies found so far")
-    return state
+    found = run_risk_agent({"tickers": state.get("tickers", []), "anomalies": []})["anomalies"]
+    logging.info(f"✅ Risk finished: {len(found)} new anomalies")
+    return {"anomalies": found}
 
 # Reporter Node
-def reporter_node(state: State) -> State:
+def reporter_node(state: State) -> Dict[str, Any]:
     logging.info("📝 Running Reporter Agent...")
-    state = run_reporter_agent(state)  # ✅ always queries Supabase for today's anomalies
+    # Reports state anomalies + one query for rows written before this run started
+    result = run_reporter_agent(dict(state), mode=state.get("report_mode") or REPORT_MODE)
     logging.info("✅ Reporter finished: Report saved, sent to Discord, and logged")
-    return state
-
-# ---- Register Nodes ----
-workflow.add_node("data", data_node)
-workflow.add_node("analyzer", analyzer_node)
-workflow.add_node("lifecycle", lifecycle_node)
-workflow.add_node("risk", risk_node)
-workflow.add_node("reporter", reporter_node)
-
-# ---- Define Edges ----
-workflow.add_edge(START, "data")
-workflow.add_edge("data", "analyzer")
-workflow.add_edge("analyzer", "lifecycle")
-workflow.add_edge("lifecycle", "risk")
-workflow.add_edge("risk", "reporter")
-workflow.add_edge("reporter", END)
+    return {"anomalies": result.get("anomalies", [])}
+
+# ---- LangGraph Workflow ----
+def build_workflow(report: bool = True) -> StateGraph:
+    """
+    data → metadata → {analyzer, lifecycle, risk} → reporter.
+    report=False stops after the checks (used per shard by workflows/sharded).
+    """
+    graph = StateGraph(State)
+
+    # Each node is timed and its Yahoo / Supabase / LLM calls and rows are counted (lib/metrics)
+    graph.add_node("data", instrument("data", data_node))
+    graph.add_node("metadata", instrument("metadata", metadata_node))
+    graph.add_node("analyzer", instrument("analyzer", analyzer_node))
+    graph.add_node("lifecycle", instrument("lifecycle", lifecycle_node))
+    graph.add_node("risk", instrument("risk", risk_node))
+
+    graph.add_edge(START, "data")
+    graph.add_edge("data", "metadata")
+    # Fan out once data + metadata are fresh: the three checks are independent and
+    # run in the same step, so reporter waits only for the slowest of them.
+    graph.add_edge("metadata", "analyzer")
+    graph.add_edge("metadata", "lifecycle")
+    graph.add_edge("metadata", "risk")
+
+    if report:
+        graph.add_node("reporter", instrument("reporter", reporter_node))
+        graph.add_edge(["analyzer", "lifecycle", "risk"], "reporter")
+        graph.add_edge("reporter", END)
+    else:
+        graph.add_edge(["analyzer", "lifecycle", "risk"], END)
+    return graph
+
+
+def pick_thread(app, base: str, restart: bool = False) -> tuple:
+    """
+    Checkpoint thread for today's run: (thread_id, resume).
+    Runs of a day are threads base, base-2, base-3, …; the latest one is
+    resumed only while it still has pending nodes. A finished (or --restart)
+    day gets a fresh thread, so merge_anomalies never folds in an earlier run.
+    """
+    def thread(n: int) -> str:
+        return base if n == 1 else f"{base}-{n}"
+
+    n = 1
+    while app.get_state({"configurable": {"thread_id": thread(n + 1)}}).created_at:
+        n += 1
+    latest = app.get_state({"configurable": {"thread_id": thread(n)}})
+    if latest.created_at is None:
+        return thread(n), False
+    if latest.next and not restart:
+        return thread(n), True
+    return thread(n + 1), False
+
+
+workflow = build_workflow()
 
 # ---- Compile App ----
 app = workflow.compile()
-
-
-
-
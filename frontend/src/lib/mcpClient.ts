@@ -31,6 +31,40 @@ async function callMCP<T = any>(
   }
 }
 
+// --- Batch call: many tools in one round trip (POST /tools/batch) ---
+export interface BatchCall {
+  tool: string;
+  args?: Record<string, any>;
+}
+
+export interface BatchResult<T = any> {
+  tool: string;
+  ok: boolean;
+  result?: T;
+  error?: string;
+}
+
+export async function callMCPBatch<T = any>(calls: BatchCall[]): Promise<BatchResult<T>[]> {
+  try {
+    const resp = await fetch(`${MCP_BASE_URL}/tools/batch`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ calls }),
+    });
+
+    if (!resp.ok) {
+      console.error("❌ MCP batch failed:", await resp.text());
+      return calls.map((c) => ({ tool: c.tool, ok: false, error: `HTTP ${resp.status}` }));
+    }
+
+    const data = await resp.json();
+    return (data.results as BatchResult<T>[]) ?? calls.map((c) => ({ tool: c.tool, ok: false, error: data.error }));
+  } catch (err) {
+    console.error("⚠️ MCP batch error:", err);
+    return calls.map((c) => ({ tool: c.tool, ok: false, error: String(err) }));
+  }
+}
+
 // --- Tool wrappers ---
 
 // ✅ List all tickers
@@ -48,6 +82,15 @@ export async function getStockPrice(
   return callMCP("get_stock_price", { ticker, period, interval });
 }
 
+// ✅ Prices for many tickers in one request (one grouped Yahoo download server-side)
+export async function getStockPrices(
+  tickers: string[],
+  period: string = "1mo",
+  interval: string = "1d"
+) {
+  return callMCPBatch(tickers.map((ticker) => ({ tool: "get_stock_price", args: { ticker, period, interval } })));
+}
+
 // ✅ Volume history
 export async function getVolumeHistory(ticker: string, days: number) {
   return callMCP("get_volume_history", { ticker, days });
@@ -82,10 +125,85 @@ export async function getAlertsMarkdown(startDate?: string, endDate?: string) {
   return callMCP("get_alerts_markdown", { start_date: startDate, end_date: endDate });
 }
 
+// --- Structured alerts report (same cached model as the Markdown) ---
+export interface AlertItem {
+  ticker: string;
+  trade_date: string;
+  anomaly_type: string;
+  description: string;
+}
 
+export interface VolumeRow {
+  ticker: string;
+  trade_date: string;
+  reasons: string[];
+}
 
+export interface AlertsReport {
+  count: number;
+  alerts: AlertItem[];
+  priority: { ticker: string; categories: string[]; alerts: AlertItem[] }[];
+  volume: { lows: VolumeRow[]; spikes: VolumeRow[]; zeros: VolumeRow[] } | null;
+  categories: { name: string; alerts: AlertItem[] }[];
+}
 
+export interface AlertsReportResponse {
+  date: string;
+  count: number;
+  format: "markdown" | "json" | "html";
+  hash: string;
+  cached: boolean;
+  markdown?: string;
+  html?: string;
+  report?: AlertsReport;
+}
 
+// ✅ Alerts report in a given format ("json" → structured, no Markdown parsing needed)
+export async function getAlertsReport(
+  date?: string,
+  format: "markdown" | "json" | "html" = "json"
+) {
+  return callMCP<AlertsReportResponse>("get_alerts_markdown", { start_date: date, format });
+}
 
-
-
+// --- Streaming agent (POST /mcp/agent/stream, Server-Sent Events) ---
+export type AgentEvent =
+  | { event: "tool_start"; tool: string; input: any }
+  | { event: "tool_end"; tool: string; output: string }
+  | { event: "token"; content: string }
+  | { event: "done"; answer: string }
+  | { event: "error"; content: string };
+
+export async function streamAgent(
+  query: string,
+  onEvent: (e: AgentEvent) => void,
+  structured: boolean = false
+): Promise<void> {
+  const resp = await fetch(`${MCP_BASE_URL}/mcp/agent/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ query, structured }),
+  });
+  if (!resp.ok || !resp.body) throw new Error(await resp.text());
+
+  const reader = resp.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line; keep the unfinished tail
+    const frames = buffer.split("\n\n");
+    buffer = frames.pop() ?? "";
+    for (const frame of frames) {
+      const data = frame
+        .split("\n")
+        .filter((line) => line.startsWith("data: "))
+        .map((line) => line.slice(6))
+        .join("\n");
+      if (data) onEvent(JSON.parse(data) as AgentEvent);
+    }
+  }
+}
@@ -1,8 +1,6 @@
 import React, { useState, useRef, useEffect } from "react";
 import { LineChart, Line, XAxis, YAxis, Tooltip, ResponsiveContainer } from "recharts";
-
-const MCP_BASE_URL =
-  import.meta.env.VITE_MCP_BASE_URL || "http://localhost:8000";
+import { streamAgent } from "@/lib/mcpClient";
 
 const MyChartComponent = ({ data, ticker }: { data: any[]; ticker: string }) => (
   <div className="bg-white dark:bg-gray-800 p-4 rounded-lg shadow-md mb-4">
@@ -36,40 +34,28 @@ const AgentPage: React.FC = () => {
     setMessages((prev) => [...prev, newMsg]);
     setLoading(true);
 
-    try {
-      const payload = { query: input };
+    // Streamed answer: tokens are appended to the last assistant message as they arrive
+    setMessages((prev) => [...prev, { role: "assistant", type: "text", content: "" }]);
+    const updateLast = (fn: (m: any) => any) =>
+      setMessages((prev) => [...prev.slice(0, -1), fn(prev[prev.length - 1])]);
 
-      const res = await fetch(`${MCP_BASE_URL}/mcp/agent`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify(payload),
+    try {
+      await streamAgent(input, (e) => {
+        if (e.event === "token") {
+          updateLast((m) => ({ ...m, content: m.content + e.content, status: undefined }));
+        } else if (e.event === "tool_start") {
+          updateLast((m) => ({ ...m, status: `🛠️ ${e.tool}…` }));
+        } else if (e.event === "tool_end") {
+          updateLast((m) => ({ ...m, status: `✅ ${e.tool}` }));
+        } else if (e.event === "done") {
+          updateLast((m) => ({ ...m, content: e.answer || m.content, status: undefined }));
+        } else if (e.event === "error") {
+          updateLast(() => ({ role: "assistant", type: "error", content: e.content }));
+        }
       });
-
-      if (!res.ok) throw new Error(await res.text());
-      const data = await res.json();
-
-      let msg;
-      const answer = data.answer;
-
-      if (typeof answer === "string") {
-        msg = { role: "assistant", type: "text", content: answer };
-      } else if (answer?.type === "chart") {
-        msg = { role: "assistant", ...answer };
-      } else if (answer?.type === "filings") {
-        msg = { role: "assistant", ...answer };
-      } else if (answer?.type === "anomalies") {
-        msg = { role: "assistant", ...answer };
-      } else {
-        msg = { role: "assistant", type: "text", content: JSON.stringify(answer) };
-      }
-
-      setMessages((prev) => [...prev, msg]);
     } catch (err) {
       console.error("⚠️ MCP Agent error:", err);
-      setMessages((prev) => [
-        ...prev,
-        { role: "assistant", type: "error", content: "⚠️ Error talking to agent" },
-      ]);
+      updateLast(() => ({ role: "assistant", type: "error", content: "⚠️ Error talking to agent" }));
     } finally {
       setInput("");
       setLoading(false);
@@ -115,6 +101,7 @@ const AgentPage: React.FC = () => {
                 }
               >
                 <b>{m.role === "user" ? "You" : "Agent"}:</b> {m.content}
+                {m.status && <span className="ml-2 italic text-gray-400">{m.status}</span>}
               </div>
             )}
           </div>
@@ -5,6 +5,7 @@ import {
   detectAnomalies,
   getFilings,
   getAlertsMarkdown, // ✅ MCP client for alerts
+  getAlertsReport,
 } from "@/lib/mcpClient";
 
 import TickerSelector from "@/components/TickerSelector";
@@ -112,20 +113,16 @@ const Dashboard: React.FC = () => {
     downloadFile(`spac_alerts_${today}.md`, md, "text/markdown");
   };
 
-  const exportCSV = () => {
+  const exportCSV = async () => {
     const today = new Date().toISOString().split("T")[0];
-    const lines = alertsMarkdown.split("\n").filter((l) => l.startsWith("- "));
-    const header = "Ticker,Trade Date,Details\n";
-    const rows = lines
-      .map((l) => {
-        const match = l.match(/\*\*(.*?)\*\* \((.*?)\) → (.*)/);
-        if (match) {
-          const [, ticker, date, details] = match;
-          return `${ticker},${date},"${details.replace(/"/g, '""')}"`;
-        }
-        return "";
-      })
-      .filter(Boolean)
+    // Structured report from the backend (cached), no Markdown parsing
+    const res = await getAlertsReport(startDate || undefined, "json");
+    const header = "Ticker,Trade Date,Type,Details\n";
+    const rows = (res?.report?.alerts || [])
+      .map(
+        (a) =>
+          `${a.ticker},${a.trade_date},${a.anomaly_type},"${a.description.replace(/"/g, '""')}"`
+      )
       .join("\n");
 
     downloadFile(`spac_alerts_${today}.csv`, header + rows, "text/csv");
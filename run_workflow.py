@@ -1,16 +1,59 @@
-from backend.workflows.spac_workflow import app, State
+import argparse
+import asyncio
+import os
+from datetime import date, datetime, timezone
+from langgraph.checkpoint.sqlite import SqliteSaver
+from backend.workflows.spac_workflow import workflow, State, pick_thread
+from backend.workflows.sharded import sharded_workflow
+from backend.lib import metrics
+from backend.services.delivery import drain
+from backend.config import WORKFLOW_CHECKPOINT_DB, WORKFLOW_SHARDS, REPORT_MODE, DELIVERY_DRAIN_TIMEOUT
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the daily SPAC monitoring workflow")
+    parser.add_argument("--restart", action="store_true", help="ignore an unfinished run for today and start over")
+    parser.add_argument("--shards", type=int, default=WORKFLOW_SHARDS, help="split the universe across N worker processes")
+    parser.add_argument("--report", choices=["full", "delta"], default=REPORT_MODE, help="full daily report or only what is new")
+    args = parser.parse_args()
+    sharded = args.shards > 1
+
     print("🚀 Starting SPAC Monitoring Workflow...")
-    
+
     # Initialize with correct structure
     initial_state = State({
         "tickers": [],
-        "anomalies": []
+        "anomalies": [],
+        # anomaly_reports.created_at is a naive UTC timestamp
+        "run_started_at": datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+        "report_mode": args.report,
+        **({"shards": args.shards} if sharded else {}),
     })
-    
-    # Run workflow
-    result = app.invoke(initial_state)
-    
-    print("✅ Workflow finished:", result)
 
+    # Every node's output is checkpointed under today's date; a crashed run
+    # picks up at the first node that did not finish, a finished one is not
+    # reopened (the next run of the day gets its own thread).
+    os.makedirs(os.path.dirname(WORKFLOW_CHECKPOINT_DB) or ".", exist_ok=True)
+    with SqliteSaver.from_conn_string(WORKFLOW_CHECKPOINT_DB) as checkpointer:
+        app = (sharded_workflow if sharded else workflow).compile(checkpointer=checkpointer)
+        base = date.today().isoformat() + ("-sharded" if sharded else "")
+        thread_id, resume = pick_thread(app, base, restart=args.restart)
+        config = {"configurable": {"thread_id": thread_id}}
+
+        if resume:
+            print(f"⏯️ Resuming today's run at: {', '.join(app.get_state(config).next)}")
+            run_input = None
+        else:
+            run_input = initial_state
+
+        # Run workflow (node timings + call counts go to the run log)
+        metrics.start_run("sharded" if sharded else "daily")
+        try:
+            result = app.invoke(run_input, config)
+        finally:
+            metrics.finish_run()
+
+    # Deliver the queued report; whatever is still retrying stays in the outbox
+    # for the delivery worker (python -m backend.services.delivery.worker --forever)
+    asyncio.run(drain(timeout=DELIVERY_DRAIN_TIMEOUT))
+
+    print("✅ Workflow finished:", result)